@@ -0,0 +1,307 @@
+"""
+감성 분석 상주 서버
+
+임베딩 모델과 기준 샘플 인덱스를 한 번만 로드해 메모리에 유지하고,
+로컬 HTTP로 받은 리포트 생성 작업을 제한된 동시 실행 수로 처리합니다.
+(도서마다 모델을 다시 로드하지 않으므로 작업 시간은 리뷰 인코딩 시간에 좌우됨)
+임베딩 캐시도 서버가 하나만 열어 모든 작업이 공유합니다. (작업의 --cache-dir, --cache-max-entries는 무시)
+
+엔드포인트:
+    POST /jobs          작업 등록 {"file": "...", "title": "...", "output": "...", "args": ["--chunksize", "5000"]}
+    GET  /jobs          작업 목록
+    GET  /jobs/<id>     작업 상태와 결과 (리포트 경로, 실행 지표)
+    GET  /health        서버 상태
+    GET  /stats         처리 통계
+
+사용 예:
+    python analysis_server.py --port 8765 --workers 2
+    curl -X POST localhost:8765/jobs -d '{"file": "data/reviews.csv", "title": "세이노의 가르침"}'
+"""
+
+import argparse
+import json
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import sentiment_analysis_txtai as analysis
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_WORKERS = 2
+DEFAULT_MAX_PENDING = 100
+
+# 완료된 작업을 메모리에 보관할 최대 개수 (초과 시 오래된 작업부터 삭제)
+MAX_FINISHED_JOBS = 1000
+
+
+class JobRejected(Exception):
+    """작업 요청이 잘못되었거나 대기열이 가득 찬 경우 (HTTP 상태 코드 포함)"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+class AnalysisJobManager:
+    """
+    로드한 모델을 공유하며 리포트 생성 작업을 스레드 풀에서 실행
+    """
+
+    def __init__(self, txtai_index, prototypes, workers=DEFAULT_WORKERS, max_pending=DEFAULT_MAX_PENDING, model=None,
+                 cache=None):
+        self.txtai_index = txtai_index
+        self.prototypes = prototypes
+        self.model = model or analysis.EncoderModel()
+        # 모든 작업이 함께 쓰는 임베딩 캐시 (작업마다 따로 열면 같은 슬롯을 덮어쓰게 됨)
+        self.cache = cache
+        self.workers = workers
+        self.max_pending = max_pending
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="analysis")
+        self.lock = threading.Lock()
+        self.jobs = {}
+        self.started_at = time.time()
+        self.completed = 0
+        self.failed = 0
+        self.reviews = 0
+        self.busy_seconds = 0.0
+        self.stage_seconds = {}
+
+    def _active_count(self):
+        return sum(1 for job in self.jobs.values() if job["status"] in ("queued", "running"))
+
+    def submit(self, request):
+        """작업 등록 후 작업 정보 반환"""
+        if not isinstance(request, dict) or not request.get("file") or not request.get("title"):
+            raise JobRejected("file과 title은 필수입니다")
+
+        argv = ["-t", str(request["title"]), "-f", str(request["file"])]
+        if request.get("output"):
+            argv += ["-o", str(request["output"])]
+        extra = request.get("args", [])
+        if not isinstance(extra, list):
+            raise JobRejected("args는 명령행 인자 목록이어야 합니다")
+        argv += [str(arg) for arg in extra]
+
+        try:
+            args = analysis.parse_arguments(argv)
+        except SystemExit:
+            raise JobRejected(f"잘못된 작업 인자입니다: {' '.join(argv)}")
+        if args.check:
+            raise JobRejected("--check는 분석 서버에서 사용할 수 없습니다")
+        # 여러 작업이 함께 쓰는 상태를 바꾸는 옵션 (캐시 삭제, 프로세스당 하나뿐인 프로파일러, 작업마다 모델을 다시 로드하는 워커 풀)
+        for flag, value in (("--clear-cache", args.clear_cache), ("--cprofile", args.cprofile),
+                            ("--encode-workers", args.encode_workers)):
+            if value:
+                raise JobRejected(f"{flag}는 분석 서버에서 사용할 수 없습니다")
+        # 서버가 로드한 모델과 같은 백엔드로 캐시/벡터 저장소를 사용하도록 작업 인자를 맞춤
+        args.encoder_backend = self.model.backend
+        args.model_dir = self.model.model_dir
+        if self.cache is None:
+            args.no_cache = True
+
+        with self.lock:
+            if self._active_count() >= self.max_pending:
+                raise JobRejected("대기 중인 작업이 너무 많습니다", status=503)
+
+            job_id = uuid.uuid4().hex[:12]
+            job = {
+                "id": job_id,
+                "status": "queued",
+                "title": args.title,
+                "file": args.file,
+                "submitted_at": datetime.now().isoformat(timespec="seconds"),
+                "started_at": None,
+                "finished_at": None,
+                "seconds": None,
+                "result": None,
+                "error": None
+            }
+            self.jobs[job_id] = job
+            self._prune()
+
+        self.executor.submit(self._run, job_id, args)
+        return dict(job)
+
+    def _prune(self):
+        """완료된 작업이 너무 많으면 오래된 것부터 삭제"""
+        finished = [job_id for job_id, job in self.jobs.items() if job["status"] in ("done", "failed")]
+        for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self.jobs[job_id]
+
+    def _run(self, job_id, args):
+        with self.lock:
+            job = self.jobs[job_id]
+            job["status"] = "running"
+            job["started_at"] = datetime.now().isoformat(timespec="seconds")
+
+        start = time.perf_counter()
+        try:
+            result = analysis.run_analysis(args, self.txtai_index, self.prototypes, self.cache)
+            error = None
+        except Exception as e:
+            result = None
+            error = str(e)
+        elapsed = time.perf_counter() - start
+
+        with self.lock:
+            job["finished_at"] = datetime.now().isoformat(timespec="seconds")
+            job["seconds"] = round(elapsed, 3)
+            self.busy_seconds += elapsed
+            if error is not None:
+                job["status"] = "failed"
+                job["error"] = error
+                self.failed += 1
+                return
+
+            metrics = result.pop("metrics").to_dict()
+            result["metrics"] = metrics
+            job["status"] = "done"
+            job["result"] = result
+            self.completed += 1
+            self.reviews += metrics["reviews"]
+            for name, stage in metrics["stages"].items():
+                self.stage_seconds[name] = self.stage_seconds.get(name, 0.0) + stage["seconds"]
+
+    def get(self, job_id):
+        with self.lock:
+            job = self.jobs.get(job_id)
+            return dict(job) if job else None
+
+    def list_jobs(self):
+        with self.lock:
+            return [
+                {key: job[key] for key in ("id", "status", "title", "submitted_at", "seconds")}
+                for job in self.jobs.values()
+            ]
+
+    def stats(self):
+        """처리 통계"""
+        with self.lock:
+            statuses = [job["status"] for job in self.jobs.values()]
+            finished = self.completed + self.failed
+            return {
+                "uptime_seconds": round(time.time() - self.started_at, 1),
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "queued": statuses.count("queued"),
+                "running": statuses.count("running"),
+                "completed": self.completed,
+                "failed": self.failed,
+                "reviews": self.reviews,
+                "avg_job_seconds": round(self.busy_seconds / finished, 3) if finished else None,
+                "reviews_per_sec": round(self.reviews / self.busy_seconds, 1) if self.busy_seconds else None,
+                "stage_seconds": {name: round(seconds, 3) for name, seconds in self.stage_seconds.items()}
+            }
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True)
+        if self.cache is not None:
+            self.cache.close()
+
+
+class AnalysisRequestHandler(BaseHTTPRequestHandler):
+    """분석 서버 HTTP 요청 처리"""
+
+    manager = None
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0].rstrip("/")
+        if path == "/health":
+            self._send_json(200, {"status": "ok", "model": self.manager.model.id})
+        elif path == "/stats":
+            self._send_json(200, self.manager.stats())
+        elif path == "/jobs":
+            self._send_json(200, {"jobs": self.manager.list_jobs()})
+        elif path.startswith("/jobs/"):
+            job = self.manager.get(path[len("/jobs/"):])
+            if job:
+                self._send_json(200, job)
+            else:
+                self._send_json(404, {"error": "작업을 찾을 수 없습니다"})
+        else:
+            self._send_json(404, {"error": "알 수 없는 경로입니다"})
+
+    def do_POST(self):
+        if self.path.split("?", 1)[0].rstrip("/") != "/jobs":
+            self._send_json(404, {"error": "알 수 없는 경로입니다"})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length).decode("utf-8") or "{}")
+        except (ValueError, UnicodeDecodeError):
+            self._send_json(400, {"error": "요청 본문이 올바른 JSON이 아닙니다"})
+            return
+
+        try:
+            self._send_json(202, self.manager.submit(request))
+        except JobRejected as e:
+            self._send_json(e.status, {"error": str(e)})
+
+    def log_message(self, format, *args):
+        print(f"[{self.log_date_time_string()}] {self.address_string()} {format % args}")
+
+
+def parse_arguments():
+    """명령행 인자 파싱"""
+    parser = argparse.ArgumentParser(description="감성 분석 상주 서버 (모델을 메모리에 유지)")
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"바인딩 주소 (기본값: {DEFAULT_HOST})")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"포트 (기본값: {DEFAULT_PORT})")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"동시에 실행할 분석 작업 수 (기본값: {DEFAULT_WORKERS})")
+    parser.add_argument("--max-pending", type=int, default=DEFAULT_MAX_PENDING,
+                        help=f"대기+실행 중인 작업 최대 개수, 초과 시 503 응답 (기본값: {DEFAULT_MAX_PENDING})")
+    parser.add_argument("--index-dir", default=analysis.DEFAULT_INDEX_DIR,
+                        help=f"기준 샘플 인덱스 저장 경로 (기본값: {analysis.DEFAULT_INDEX_DIR})")
+    parser.add_argument("--rebuild-index", action="store_true", help="저장된 기준 샘플 인덱스를 무시하고 새로 생성")
+    parser.add_argument("--encoder-backend", choices=analysis.BACKENDS, default=analysis.DEFAULT_BACKEND,
+                        help="임베딩 모델 실행 방식 (기본값: pytorch, 모든 작업에 적용)")
+    parser.add_argument("--model-dir", default=analysis.DEFAULT_MODEL_DIR,
+                        help=f"로컬 모델 디렉토리 (기본값: {analysis.DEFAULT_MODEL_DIR})")
+    parser.add_argument("--cache-dir", default=analysis.DEFAULT_CACHE_DIR,
+                        help=f"모든 작업이 공유하는 리뷰 임베딩 캐시 디렉토리 (기본값: {analysis.DEFAULT_CACHE_DIR})")
+    parser.add_argument("--cache-max-entries", type=int, default=analysis.DEFAULT_MAX_ENTRIES,
+                        help=f"임베딩 캐시 최대 항목 수 (기본값: {analysis.DEFAULT_MAX_ENTRIES})")
+    parser.add_argument("--no-cache", action="store_true", help="임베딩 캐시를 사용하지 않음 (모든 작업에 적용)")
+    return parser.parse_args()
+
+
+def main():
+    """메인 함수"""
+    args = parse_arguments()
+
+    print("🧠 모델 및 기준 샘플 인덱스 로드 중...")
+    start = time.perf_counter()
+    model = analysis.EncoderModel(args.encoder_backend, args.model_dir)
+    txtai_index, prototypes = analysis.load_or_build_txtai_index(args.index_dir, args.rebuild_index, model)
+    print(f"🧠 로드 완료: {model.id} ({time.perf_counter() - start:.1f}초)")
+
+    cache = None if args.no_cache else analysis.EmbeddingCache(model.id, args.cache_dir, args.cache_max_entries)
+    manager = AnalysisJobManager(txtai_index, prototypes, args.workers, args.max_pending, model, cache)
+    AnalysisRequestHandler.manager = manager
+    server = ThreadingHTTPServer((args.host, args.port), AnalysisRequestHandler)
+
+    print(f"🚀 분석 서버 시작: http://{args.host}:{args.port} (동시 작업 {args.workers}개)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n서버를 종료합니다...")
+    finally:
+        server.server_close()
+        manager.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+"""
+토큰 길이 기반 리뷰 배치 스케줄러
+
+리뷰 길이는 두 단어부터 여러 문단까지 다양합니다. 고정 개수 배치는 짧은 리뷰를 배치 안의 가장 긴 리뷰 길이까지
+패딩하고, 모델 최대 길이(all-MiniLM-L6-v2: 256 토큰)를 넘는 리뷰는 인코더가 뒷부분을 잘라 버립니다.
+BatchScheduler는
+    1. 최대 길이를 넘는 리뷰를 문장(필요하면 단어) 경계에서 여러 조각으로 나누고
+    2. 조각을 토큰 길이순으로 정렬해 (배치 크기 × 배치 안 최대 길이)가 토큰 예산을 넘지 않도록 배치를 만들며
+    3. 조각 임베딩을 토큰 수 가중 평균으로 합쳐 리뷰 하나의 임베딩으로 되돌립니다.
+프로토타입 유사도는 임베딩에 대해 선형이므로, 합친 임베딩의 레이블은 조각별 유사도 점수를 가중 평균한 레이블과 같습니다.
+
+토큰 수는 모델 토크나이저(transformers)로 세고, 토크나이저를 쓸 수 없으면 보수적인 추정치를 사용합니다.
+패딩 통계는 measure()로 감싼 인코더가 실제로 모델에 넘긴 텍스트(캐시 적중 제외)를 기준으로 셉니다.
+(txtai는 encodebatch개씩 다시 나눠 인코딩하므로 EncoderModel(encodebatch=배치 크기)로 스케줄한 배치를 그대로 넘겨야 함)
+정렬은 window개 리뷰 단위로 수행하므로 메모리 사용량은 리뷰 수와 관계없이 일정합니다.
+"""
+
+import re
+
+import numpy as np
+
+from run_metrics import timed
+
+# 배치 하나의 최대 토큰 수 (배치 크기 × 배치 안 최대 토큰 길이)
+DEFAULT_TOKEN_BUDGET = 16384
+# 모델 최대 입력 길이 (특수 토큰 포함, sentence-transformers max_seq_length)
+DEFAULT_MAX_SEQ_TOKENS = 256
+# 한 번에 정렬해 배치로 나누는 리뷰 수
+DEFAULT_WINDOW = 16384
+# txtai가 모델에 한 번에 넣는 텍스트 수 기본값 (설정의 encodebatch)
+TXTAI_ENCODEBATCH = 32
+
+# 토크나이저가 없을 때 사용하는 추정 규칙: 영문/숫자는 4글자당 1토큰, 그 밖의 글자와 문장부호는 글자당 1토큰
+_ESTIMATE_PATTERN = re.compile(r"[A-Za-z0-9]+|\w|[^\w\s]")
+_ESTIMATE_SPECIAL_TOKENS = 2
+
+# 문장 경계 (문장부호 뒤 공백, 줄바꿈)
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?。…~])\s+|\n+")
+
+
+def estimate_tokens(text):
+    """토크나이저 없이 추정한 토큰 수 (특수 토큰 제외)"""
+    return sum(-(-len(piece) // 4) if piece.isascii() else 1 for piece in _ESTIMATE_PATTERN.findall(text))
+
+
+class BatchScheduler:
+    """
+    토큰 예산 기반 배치 구성과 긴 리뷰 분할
+
+    Args:
+        token_budget (int): 배치 하나의 최대 토큰 수 (배치 크기 × 배치 안 최대 토큰 길이)
+        max_seq_tokens (int): 모델 최대 입력 길이 (특수 토큰 포함). 이보다 긴 리뷰는 조각으로 나눕니다.
+        max_batch (int, optional): 배치 하나의 최대 조각 수
+        tokenizer (optional): Hugging Face 토크나이저 (EncoderModel.tokenizer()). 없으면 추정치 사용
+        window (int): 한 번에 정렬해 배치로 나누는 리뷰 수
+    """
+
+    def __init__(self, token_budget=DEFAULT_TOKEN_BUDGET, max_seq_tokens=DEFAULT_MAX_SEQ_TOKENS, max_batch=None,
+                 tokenizer=None, window=DEFAULT_WINDOW):
+        self.tokenizer = tokenizer
+        self.special_tokens = tokenizer.num_special_tokens_to_add() if tokenizer is not None else _ESTIMATE_SPECIAL_TOKENS
+        self.max_seq_tokens = max_seq_tokens
+        self.token_budget = max(token_budget, max_seq_tokens)
+        self.max_batch = max_batch
+        self.window = window
+        # 최근 plan()의 조각별 토큰 수 (인코딩한 텍스트의 길이를 다시 세지 않도록 함)
+        self._lengths = {}
+
+        # 누적 통계 (실제 토큰 수, 패딩 포함 토큰 수, 같은 리뷰를 고정 개수 배치로 인코딩했을 때의 값)
+        self.reviews = 0
+        self.pieces = 0
+        self.batches = 0
+        self.tokens = 0
+        self.padded_tokens = 0
+        self.fixed_tokens = 0
+        self.fixed_padded_tokens = 0
+        self.chunked_reviews = 0
+        self.truncated_tokens = 0
+
+    def _count(self, texts, special=True):
+        """텍스트별 토큰 수"""
+        if self.tokenizer is None:
+            extra = self.special_tokens if special else 0
+            return np.array([estimate_tokens(text) + extra for text in texts], dtype=np.int64)
+        if not texts:
+            return np.zeros(0, dtype=np.int64)
+        ids = self.tokenizer(list(texts), add_special_tokens=special, verbose=False)["input_ids"]
+        return np.array([len(row) for row in ids], dtype=np.int64)
+
+    def count_tokens(self, texts):
+        """텍스트별 토큰 수 (특수 토큰 포함)"""
+        return self._count(texts)
+
+    def split(self, text):
+        """
+        최대 길이를 넘는 리뷰를 조각으로 나눔 (문장 단위로 채우고, 한 문장이 너무 길면 단어 단위로 나눔)
+
+        Returns:
+            list: (조각 텍스트, 특수 토큰 포함 토큰 수) 목록
+        """
+        limit = self.max_seq_tokens - self.special_tokens
+        sentences = [sentence.split() for sentence in _SENTENCE_BOUNDARY.split(text)]
+        sentences = [words for words in sentences if words]
+        counts = iter(self._count([word for words in sentences for word in words], special=False))
+
+        # 문장 단위 조각 후보 (최대 길이를 넘는 문장은 단어 하나하나가 후보,
+        # 띄어쓰기 없이 이어진 긴 단어는 글자 수로 균등하게 나눔)
+        units = []
+        for words in sentences:
+            word_tokens = [int(next(counts)) for _ in words]
+            if sum(word_tokens) <= limit:
+                units.append((" ".join(words), sum(word_tokens)))
+                continue
+            for word, tokens in zip(words, word_tokens):
+                parts = -(-tokens // limit)
+                size = -(-len(word) // parts)
+                units.extend((word[i:i + size], -(-tokens // parts)) for i in range(0, len(word), size))
+
+        chunks, current, current_tokens = [], [], 0
+        for unit, tokens in units:
+            if current and current_tokens + tokens > limit:
+                chunks.append((" ".join(current), current_tokens + self.special_tokens))
+                current, current_tokens = [], 0
+            current.append(unit)
+            current_tokens += tokens
+        if current:
+            chunks.append((" ".join(current), current_tokens + self.special_tokens))
+        return chunks
+
+    def plan(self, texts):
+        """
+        리뷰 목록을 조각과 배치로 나눔
+
+        Returns:
+            tuple: (조각 텍스트 목록, 조각별 리뷰 위치, 조각별 가중치, 배치별 조각 위치 배열 목록)
+        """
+        lengths = self.count_tokens(texts)
+        pieces, owners, weights, piece_lengths = [], [], [], []
+        for i, (text, length) in enumerate(zip(texts, lengths)):
+            if length <= self.max_seq_tokens:
+                pieces.append(text)
+                owners.append(i)
+                weights.append(1.0)
+                piece_lengths.append(length)
+                continue
+
+            chunks = self.split(text)
+            total = sum(tokens - self.special_tokens for _, tokens in chunks) or 1
+            self.chunked_reviews += 1
+            for chunk, tokens in chunks:
+                pieces.append(chunk)
+                owners.append(i)
+                weights.append((tokens - self.special_tokens) / total)
+                piece_lengths.append(tokens)
+
+        piece_lengths = np.minimum(np.array(piece_lengths, dtype=np.int64), self.max_seq_tokens)
+
+        # 긴 조각부터 배치를 채움 (첫 배치가 가장 큰 메모리를 쓰므로 메모리 부족을 바로 알 수 있음)
+        order = np.argsort(-piece_lengths, kind="stable")
+        batches, current = [], []
+        for index in order:
+            size = len(current) + 1
+            if current and (size * piece_lengths[current[0]] > self.token_budget
+                            or (self.max_batch and size > self.max_batch)):
+                batches.append(np.array(current))
+                current = []
+            current.append(index)
+        if current:
+            batches.append(np.array(current))
+
+        # 통계: 같은 리뷰를 원래 순서대로 max_batch개씩 (잘라서) 인코딩했을 때와 비교
+        # (스케줄한 배치의 토큰/패딩은 실제로 인코딩할 때 record_encoded()에서 셈)
+        self._lengths = dict(zip(pieces, piece_lengths.tolist()))
+        self.reviews += len(texts)
+        self.pieces += len(pieces)
+        capped = np.minimum(lengths, self.max_seq_tokens)
+        step = self.max_batch or len(capped) or 1
+        self.fixed_tokens += int(capped.sum())
+        self.fixed_padded_tokens += sum(len(capped[i:i + step]) * int(capped[i:i + step].max())
+                                        for i in range(0, len(capped), step))
+        self.truncated_tokens += int(np.maximum(lengths - self.max_seq_tokens, 0).sum())
+
+        return pieces, np.array(owners, dtype=np.int64), np.array(weights, dtype=np.float32), batches
+
+    def measure(self, encoder):
+        """batchtransform()에 넘긴 텍스트의 토큰/패딩 통계를 기록하는 인코더 래퍼"""
+        return _MeasuredEncoder(self, encoder)
+
+    def record_encoded(self, texts, encodebatch=TXTAI_ENCODEBATCH):
+        """
+        모델에 넘긴 텍스트 한 묶음의 토큰/패딩 통계 기록
+        (sentence-transformers처럼 길이순으로 정렬해 encodebatch개씩 나눈 배치마다 가장 긴 텍스트까지 패딩)
+        """
+        if not texts:
+            return
+        lengths = [self._lengths.get(text) for text in texts]
+        if None in lengths:
+            lengths = np.minimum(self.count_tokens(texts), self.max_seq_tokens).tolist()
+        lengths.sort(reverse=True)
+        for start in range(0, len(lengths), encodebatch):
+            self.batches += 1
+            self.tokens += sum(lengths[start:start + encodebatch])
+            self.padded_tokens += len(lengths[start:start + encodebatch]) * lengths[start]
+
+    def encode(self, encode, texts, metrics=None):
+        """
+        리뷰 목록을 스케줄한 배치로 인코딩하고 리뷰별 임베딩으로 합쳐 반환
+        (encode: 텍스트 목록을 받아 임베딩 행렬을 반환하는 함수, 반환값은 texts 순서)
+        """
+        with timed(metrics, "encode"):
+            pieces, owners, weights, batches = self.plan(texts)
+
+        pooled = None
+        for batch in batches:
+            embeddings = encode([pieces[i] for i in batch])
+            if pooled is None:
+                pooled = np.zeros((len(texts), embeddings.shape[1]), dtype=np.float32)
+            # 조각이 하나인 리뷰는 가중치가 1이므로 임베딩이 그대로 들어감
+            np.add.at(pooled, owners[batch], embeddings * weights[batch, None])
+
+        if pooled is None:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        # 여러 조각을 합친 리뷰만 단위 벡터로 정규화
+        chunked = np.flatnonzero(np.bincount(owners, minlength=len(texts)) > 1)
+        if len(chunked):
+            norms = np.linalg.norm(pooled[chunked], axis=1, keepdims=True)
+            pooled[chunked] /= np.where(norms == 0, 1, norms)
+        return pooled
+
+    def padding_efficiency(self):
+        """실제 토큰 수 ÷ 패딩 포함 토큰 수 (스케줄한 배치, 고정 개수 배치)"""
+        scheduled = self.tokens / self.padded_tokens if self.padded_tokens else 1.0
+        fixed = self.fixed_tokens / self.fixed_padded_tokens if self.fixed_padded_tokens else 1.0
+        return scheduled, fixed
+
+    def to_dict(self):
+        """실행 지표에 기록할 스케줄 통계"""
+        scheduled, fixed = self.padding_efficiency()
+        return {
+            "token_budget": self.token_budget,
+            "max_seq_tokens": self.max_seq_tokens,
+            "tokenizer": self.tokenizer is not None,
+            "reviews": self.reviews,
+            "pieces": self.pieces,
+            "batches": self.batches,
+            "tokens": self.tokens,
+            "padded_tokens": self.padded_tokens,
+            "padding_efficiency": round(scheduled, 4),
+            "fixed_padding_efficiency": round(fixed, 4),
+            "chunked_reviews": self.chunked_reviews,
+            "truncated_tokens_avoided": self.truncated_tokens
+        }
+
+    def summary(self):
+        """이번 실행의 스케줄 현황 문자열"""
+        scheduled, fixed = self.padding_efficiency()
+        text = (f"토큰 배치: {self.batches:,}회, 패딩 효율 {scheduled:.1%} (고정 개수 배치 {fixed:.1%}), "
+                f"패딩 포함 토큰 {self.padded_tokens:,} (고정 개수 배치 {self.fixed_padded_tokens:,})")
+        if self.chunked_reviews:
+            text += (f", 긴 리뷰 {self.chunked_reviews:,}건을 조각 {self.pieces - self.reviews + self.chunked_reviews:,}개로 "
+                     f"나눠 분석 (잘렸을 토큰 {self.truncated_tokens:,})")
+        if self.tokenizer is None:
+            text += " [토크나이저 없음: 추정 토큰 수]"
+        return text
+
+
+class _MeasuredEncoder:
+    """
+    txtai Embeddings/ParallelEncoder를 감싸 실제로 인코딩한 텍스트를 스케줄러 통계에 기록
+    (ParallelEncoder는 워커별 샤드, 각 샤드는 설정의 encodebatch개씩 인코딩됨)
+    """
+
+    def __init__(self, scheduler, encoder):
+        self.scheduler = scheduler
+        self.encoder = encoder
+        config = getattr(encoder, "model_config", None) or getattr(encoder, "config", None)
+        self.encodebatch = (config.get("encodebatch") if isinstance(config, dict) else None) or TXTAI_ENCODEBATCH
+
+    def batchtransform(self, documents, category=None, index=None):
+        documents = list(documents)
+        shards = self.encoder.shards(documents) if hasattr(self.encoder, "shards") else [documents]
+        for shard in shards:
+            self.scheduler.record_encoded(shard, self.encodebatch)
+        return self.encoder.batchtransform(documents, category, index)
+
+    def __getattr__(self, name):
+        return getattr(self.encoder, name)
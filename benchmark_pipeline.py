@@ -0,0 +1,230 @@
+"""
+감성 분석 파이프라인 오프라인 벤치마크
+
+스크래퍼와 같은 스키마의 합성 한국어 리뷰 CSV를 생성하고, 결정적인 해시 기반 임베딩으로
+모델 다운로드나 네트워크 없이 sentiment_analysis_txtai.py의 단계별 비용을 측정합니다.
+단계별 실행 시간, 처리량(건/초), 최대 메모리(RSS)를 JSON으로 저장하여 커밋 간 비교에 사용합니다.
+
+사용 예:
+    python benchmark_pipeline.py --sizes 1000 100000
+    python benchmark_pipeline.py --sizes 1000 --compare output/benchmarks/pipeline_abc1234.json
+"""
+
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
+from datetime import datetime, timedelta
+
+import numpy as np
+
+DEFAULT_SIZES = [1000, 100000, 1000000]
+DEFAULT_OUTPUT_DIR = "output/benchmarks"
+
+# 해시 임베딩 차원 (all-MiniLM-L6-v2와 동일)
+STUB_DIMENSIONS = 384
+
+# 합성 리뷰 문장 재료
+REVIEW_PHRASES = [
+    "정말 유익하고 감동적인 책이었어요", "내용이 흥미롭고 유용했어요", "재미있어서 단숨에 읽었어요",
+    "다시 읽고 싶은 책입니다", "주변에 추천하고 싶어요", "문장이 아름답고 여운이 남아요",
+    "별로 도움이 안 됐어요", "기대보다 실망스러웠어요", "지루해서 끝까지 읽기 힘들었어요",
+    "번역이 매끄럽지 않아요", "배송이 빨라서 좋았어요", "선물용으로 구매했어요",
+    "좋아요", "추천합니다", "최고예요", "그저 그래요", "생각할 거리를 많이 주는 책",
+    "아이와 함께 읽기 좋아요", "어려웠지만 배울 점이 많았어요", "표지가 예뻐요"
+]
+EMOTION_KEYWORDS = [
+    "추천해요", "최고예요", "쉬웠어요", "재밌어요", "유익해요",
+    "감동이에요", "집중돼요", "힐링돼요", "어려웠어요", "별로예요"
+]
+RATING_WEIGHTS = [0.03, 0.04, 0.08, 0.25, 0.60]
+
+
+class HashingEncoder:
+    """
+    txtai Embeddings.batchtransform과 같은 인터페이스의 결정적 해시 임베딩
+    (문자 bigram을 crc32로 해싱하여 L2 정규화한 벡터, 모델 다운로드 불필요)
+    """
+
+    def __init__(self, dimensions=STUB_DIMENSIONS):
+        self.dimensions = dimensions
+
+    def batchtransform(self, documents, category=None, index=None):
+        vectors = np.zeros((len(documents), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(documents):
+            text = str(text)
+            for i in range(max(len(text) - 1, 1)):
+                vectors[row, zlib.crc32(text[i:i + 2].encode("utf-8")) % self.dimensions] += 1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+
+def generate_reviews_csv(path, rows, seed=42):
+    """스크래퍼 CSV와 같은 컬럼의 합성 한국어 리뷰 데이터 생성"""
+    rng = random.Random(seed)
+    start = datetime(2020, 1, 1)
+
+    with open(path, "w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.writer(f)
+        writer.writerow(["리뷰번호", "회원ID", "작성일시", "리뷰내용", "감정키워드", "평점"])
+        for i in range(rows):
+            created = start + timedelta(seconds=rng.randrange(5 * 365 * 24 * 3600))
+            text = " ".join(rng.choices(REVIEW_PHRASES, k=rng.randint(1, 6)))
+            keywords = ",".join(rng.sample(EMOTION_KEYWORDS, k=rng.randint(0, 3)))
+            rating = rng.choices(range(1, 6), weights=RATING_WEIGHTS)[0]
+            writer.writerow([rows - i, f"user{rng.randrange(rows)}", created.strftime("%Y-%m-%d %H:%M:%S"),
+                             text, keywords, rating])
+
+
+def peak_rss_mb():
+    """현재 프로세스의 최대 RSS (MB)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux는 KB, macOS는 바이트 단위
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def run_pipeline(csv_path, rows, font_path, batch_size):
+    """한 데이터 크기에 대해 파이프라인 단계별 시간/처리량/최대 RSS 측정"""
+    import sentiment_analysis_txtai as pipeline
+    from report_aggregates import ReportAccumulator
+
+    encoder = HashingEncoder()
+    stages = {}
+    state = {}
+
+    def measure(name, func):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        stages[name] = {
+            "seconds": round(elapsed, 4),
+            "rows_per_sec": round(rows / elapsed, 1) if elapsed > 0 else None,
+            "peak_rss_mb": round(peak_rss_mb(), 1)
+        }
+        return result
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        # 감성 분석/집계/워드클라우드/HTML 리포트 단계만 측정 (CSV 읽기와 프로토타입 준비는 측정하지 않음)
+        state["df"] = pipeline.load_reviews(csv_path)
+        prototypes = pipeline.build_prototype_vectors(encoder)
+        state["df"] = measure("analyze_sentiments", lambda: pipeline.analyze_sentiments(
+            state["df"], encoder, batch_size, prototypes=prototypes, verbose=False))
+
+        accumulator = ReportAccumulator()
+        measure("aggregate", lambda: accumulator.update(state["df"]))
+
+        wordcloud_path = os.path.join(output_dir, "wordcloud.png")
+        measure("generate_wordcloud", lambda: pipeline.generate_wordcloud(
+            accumulator.term_frequencies(), font_path, wordcloud_path))
+        measure("generate_html_report", lambda: pipeline.generate_html_report(
+            accumulator.keyword_distribution(), accumulator.rating_summary(), wordcloud_path,
+            os.path.join(output_dir, "report.html"), "벤치마크"))
+
+    return {
+        "rows": rows,
+        "total_seconds": round(sum(stage["seconds"] for stage in stages.values()), 4),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "stages": stages
+    }
+
+
+def git_commit():
+    """현재 커밋 해시 (git 저장소가 아니면 None)"""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)), stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_comparison(results, baseline_path):
+    """이전 벤치마크 결과 대비 단계별 실행 시간 비율 출력"""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {result["rows"]: result for result in json.load(f)["results"]}
+
+    print(f"\n📊 비교 기준: {baseline_path}")
+    for result in results:
+        base = baseline.get(result["rows"])
+        if not base:
+            continue
+        print(f"- {result['rows']:,}건")
+        for name, stage in result["stages"].items():
+            base_stage = base["stages"].get(name)
+            if base_stage and base_stage["seconds"]:
+                ratio = stage["seconds"] / base_stage["seconds"]
+                print(f"  {name:<26} {base_stage['seconds']:>9.3f}초 → {stage['seconds']:>9.3f}초 (x{ratio:.2f})")
+
+
+def parse_arguments():
+    """명령행 인자 파싱"""
+    parser = argparse.ArgumentParser(description="감성 분석 파이프라인 오프라인 벤치마크")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help=f"측정할 리뷰 수 목록 (기본값: {' '.join(map(str, DEFAULT_SIZES))})")
+    parser.add_argument("--output", help=f"결과 JSON 경로 (기본값: {DEFAULT_OUTPUT_DIR}/pipeline_<커밋>.json)")
+    parser.add_argument("--data-dir", help="합성 CSV 저장 디렉토리 (지정하면 다음 실행에서 재사용)")
+    parser.add_argument("--font-path", default="data/NanumGothic.ttf",
+                        help="워드클라우드 폰트 (없으면 wordcloud 기본 폰트 사용)")
+    parser.add_argument("--batch-size", type=int, default=256, help="감성 분석 배치 크기 (기본값: 256)")
+    parser.add_argument("--compare", help="비교할 이전 벤치마크 결과 JSON")
+    return parser.parse_args()
+
+
+def main():
+    """메인 함수"""
+    args = parse_arguments()
+    font_path = args.font_path if os.path.exists(args.font_path) else None
+    commit = git_commit()
+
+    data_dir = args.data_dir or tempfile.mkdtemp(prefix="review_benchmark_")
+    os.makedirs(data_dir, exist_ok=True)
+
+    results = []
+    # 크기별로 새 프로세스에서 실행하여 최대 RSS가 이전 측정의 영향을 받지 않도록 함
+    context = multiprocessing.get_context("spawn")
+    for rows in args.sizes:
+        csv_path = os.path.join(data_dir, f"synthetic_reviews_{rows}.csv")
+        if not os.path.exists(csv_path):
+            print(f"📝 합성 리뷰 {rows:,}건 생성 중...")
+            generate_reviews_csv(csv_path, rows)
+
+        print(f"⏱ {rows:,}건 측정 중...")
+        with context.Pool(1) as pool:
+            result = pool.apply(run_pipeline, (csv_path, rows, font_path, args.batch_size))
+        results.append(result)
+
+        for name, stage in result["stages"].items():
+            print(f"  {name:<26} {stage['seconds']:>9.3f}초 {stage['rows_per_sec'] or 0:>14,.1f}건/초 "
+                  f"RSS {stage['peak_rss_mb']:>8.1f}MB")
+
+    report = {
+        "commit": commit,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results
+    }
+
+    output = args.output or os.path.join(DEFAULT_OUTPUT_DIR, f"pipeline_{commit or 'unknown'}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n✨ 벤치마크 결과 저장: {output}")
+
+    if args.compare:
+        print_comparison(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""
+교보문고 스크래퍼 처리량 벤치마크
+
+mock_kyobo_server.py 목업 API를 별도 프로세스로 띄우고 scraper_kyobo.py의 scrap_review(도서 리뷰)와
+scrap_category_book_list(카테고리 도서 목록)를 데이터 크기/동시 요청 수별로 실행하여
+페이지/초, 바이트/초, 파일 저장까지의 전체 시간, 재시도 횟수를 JSON으로 저장합니다. (실제 사이트에는 요청하지 않음)
+서버 응답 지연과 오류/429 비율을 바꿔 재시도와 속도 제한의 영향도 측정할 수 있습니다.
+
+사용 예:
+    python benchmark_scraper.py --sizes 1000 10000 --concurrency 1 4
+    python benchmark_scraper.py --latency 0.05 --error-rate 0.02 --throttle-rate 0.02
+    python benchmark_scraper.py --sizes 1000 --compare output/benchmarks/scraper_abc1234.json
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import shutil
+import tempfile
+import time
+from datetime import datetime
+
+from benchmark_pipeline import git_commit
+
+DEFAULT_SIZES = [1000, 10000, 50000]
+DEFAULT_CONCURRENCY = [1, 4]
+DEFAULT_LATENCY = 0.02
+DEFAULT_OUTPUT_DIR = "output/benchmarks"
+
+# 목업 서버에 요청할 도서/카테고리 코드
+BENCHMARK_BOOK_CODE = "S000000000001"
+BENCHMARK_CATEGORY = "0101"
+
+
+def _serve(options, ready):
+    """목업 서버 프로세스 (바인딩한 주소를 ready로 전달한 뒤 계속 실행)"""
+    from mock_kyobo_server import MockKyoboServer
+
+    server = MockKyoboServer(port=0, **options)
+    ready.put(server.url)
+    server.serve_forever()
+
+
+def start_mock_server(context, options):
+    """
+    목업 서버를 별도 프로세스로 시작 (스크래퍼와 GIL을 나눠 쓰지 않도록 함)
+
+    Returns:
+        tuple: (프로세스, 서버 주소)
+    """
+    ready = context.Queue()
+    process = context.Process(target=_serve, args=(options, ready), daemon=True)
+    process.start()
+    return process, ready.get(timeout=30)
+
+
+def run_scraper(target, size, concurrency, args):
+    """
+    목업 서버를 띄우고 스크래퍼 한 번 실행
+
+    Returns:
+        dict: 측정 결과
+    """
+    import scraper_kyobo as scraper
+    from fetch_engine import FetchStats
+
+    options = {
+        "reviews": size if target == "review" else 0,
+        "books": size if target == "category" else 0,
+        "latency": args.latency,
+        "jitter": args.jitter,
+        "error_rate": args.error_rate,
+        "throttle_rate": args.throttle_rate,
+        "retry_after": args.retry_after,
+        "seed": args.seed
+    }
+    context = multiprocessing.get_context("spawn")
+    process, api_host = start_mock_server(context, options)
+
+    output_dir = tempfile.mkdtemp(prefix="scraper_benchmark_")
+    stats = FetchStats()
+    fetch_options = {"stats": stats, "backoff_base": args.backoff_base}
+    try:
+        start = time.perf_counter()
+        if target == "review":
+            message = scraper.scrap_review(BENCHMARK_BOOK_CODE, output_dir, concurrency, api_host,
+                                           rate_limit=args.rate, fetch_options=fetch_options)
+        else:
+            message = scraper.scrap_category_book_list(BENCHMARK_CATEGORY, output_dir, api_host,
+                                                       rate_limit=args.rate, fetch_options=fetch_options)
+        seconds = time.perf_counter() - start
+        file_bytes = sum(os.path.getsize(os.path.join(output_dir, name)) for name in os.listdir(output_dir))
+    finally:
+        process.terminate()
+        process.join()
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+    fetch = stats.to_dict()
+    pages = int(fetch["statuses"].get("200", 0))
+    return {
+        "target": target,
+        "size": size,
+        "concurrency": concurrency,
+        "message": message,
+        "seconds": round(seconds, 4),
+        "pages": pages,
+        "pages_per_sec": round(pages / seconds, 2) if seconds else None,
+        "bytes": fetch["bytes"],
+        "bytes_per_sec": round(fetch["bytes"] / seconds, 1) if seconds else None,
+        "rows_per_sec": round(size / seconds, 1) if seconds else None,
+        "file_bytes": file_bytes,
+        "fetch": fetch
+    }
+
+
+def print_comparison(results, baseline_path):
+    """이전 벤치마크 결과 대비 전체 시간/페이지 처리량 비율 출력"""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {(result["target"], result["size"], result["concurrency"]): result
+                    for result in json.load(f)["results"]}
+
+    print(f"\n📊 비교 기준: {baseline_path}")
+    for result in results:
+        base = baseline.get((result["target"], result["size"], result["concurrency"]))
+        if not base or not base["seconds"]:
+            continue
+        ratio = result["seconds"] / base["seconds"]
+        print(f"- {result['target']:<8} {result['size']:>9,}건 동시 {result['concurrency']}  "
+              f"{base['seconds']:>8.3f}초 → {result['seconds']:>8.3f}초 (x{ratio:.2f}), "
+              f"{base['pages_per_sec'] or 0:,.1f} → {result['pages_per_sec'] or 0:,.1f}페이지/초")
+
+
+def parse_arguments():
+    """명령행 인자 파싱"""
+    parser = argparse.ArgumentParser(description="교보문고 스크래퍼 처리량 벤치마크 (로컬 목업 API)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help=f"측정할 데이터 크기 목록: 도서별 리뷰 수/카테고리별 도서 수 "
+                             f"(기본값: {' '.join(map(str, DEFAULT_SIZES))})")
+    parser.add_argument("--targets", nargs="+", choices=["review", "category"], default=["review", "category"],
+                        help="측정할 스크래퍼 (기본값: review category)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=DEFAULT_CONCURRENCY,
+                        help=f"리뷰 수집 동시 요청 수 목록, 카테고리 목록은 항상 순차 요청 "
+                             f"(기본값: {' '.join(map(str, DEFAULT_CONCURRENCY))})")
+    parser.add_argument("--rate", type=float, default=0,
+                        help="스크래퍼 초당 요청 수 (기본값: 0, 제한 없이 처리량 측정)")
+    parser.add_argument("--backoff-base", type=float, default=0.05,
+                        help="스크래퍼 재시도 대기 시간 상한(초) (기본값: 0.05)")
+    parser.add_argument("--latency", type=float, default=DEFAULT_LATENCY,
+                        help=f"목업 서버 응답 지연(초) (기본값: {DEFAULT_LATENCY})")
+    parser.add_argument("--jitter", type=float, default=0.0, help="목업 서버 응답 지연에 더할 무작위 시간 상한(초)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="목업 서버 무작위 500 응답 비율")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="목업 서버 무작위 429 응답 비율")
+    parser.add_argument("--retry-after", type=float, default=0.0,
+                        help="목업 서버 429 응답의 Retry-After(초) (기본값: 0, 헤더 없음)")
+    parser.add_argument("--seed", type=int, default=0, help="목업 데이터/오류 생성 시드 (기본값: 0)")
+    parser.add_argument("--output", help=f"결과 JSON 경로 (기본값: {DEFAULT_OUTPUT_DIR}/scraper_<커밋>.json)")
+    parser.add_argument("--compare", help="비교할 이전 벤치마크 결과 JSON")
+    return parser.parse_args()
+
+
+def main():
+    """메인 함수"""
+    args = parse_arguments()
+    commit = git_commit()
+
+    runs = []
+    for size in args.sizes:
+        if "review" in args.targets:
+            runs.extend(("review", size, concurrency) for concurrency in args.concurrency)
+        if "category" in args.targets:
+            runs.append(("category", size, 1))
+
+    results = []
+    for target, size, concurrency in runs:
+        print(f"⏱ {target} {size:,}건 (동시 요청 {concurrency}) 측정 중...")
+        result = run_scraper(target, size, concurrency, args)
+        results.append(result)
+        fetch = result["fetch"]
+        print(f"  {result['seconds']:>8.3f}초 {result['pages']:>6,}페이지 {result['pages_per_sec'] or 0:>9,.1f}페이지/초 "
+              f"{(result['bytes_per_sec'] or 0) / 1024 / 1024:>7.2f}MB/초 {result['rows_per_sec'] or 0:>11,.1f}건/초 "
+              f"재시도 {fetch['retries']}건")
+        print(f"  {result['message']}")
+
+    report = {
+        "commit": commit,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "server": {
+            "latency": args.latency,
+            "jitter": args.jitter,
+            "error_rate": args.error_rate,
+            "throttle_rate": args.throttle_rate,
+            "retry_after": args.retry_after,
+            "seed": args.seed
+        },
+        "rate_limit": args.rate,
+        "results": results
+    }
+
+    output = args.output or os.path.join(DEFAULT_OUTPUT_DIR, f"scraper_{commit or 'unknown'}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n✨ 벤치마크 결과 저장: {output}")
+
+    if args.compare:
+        print_comparison(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
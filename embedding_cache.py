@@ -0,0 +1,293 @@
+"""
+리뷰 텍스트 임베딩 디스크 캐시
+
+정규화한 리뷰 텍스트와 모델 ID의 해시를 키로 임베딩 벡터를 저장합니다.
+벡터는 memory-mapped 파일(vectors.f32)에, 키와 슬롯 위치는 SQLite 인덱스(index.db)에 보관하며
+최대 항목 수를 넘으면 가장 오래 사용하지 않은 항목부터 제거(LRU)하고, 비운 슬롯은 빈 슬롯 목록에 넣어 재사용합니다.
+
+여러 프로세스가 같은 캐시를 함께 써도 되도록(CLI 실행 중 분석 서버, 동시에 실행된 cron 작업 등)
+조회/저장은 모두 SQLite 쓰기 트랜잭션(BEGIN IMMEDIATE) 안에서 수행하며, 슬롯 할당 상태는 매번 인덱스에서 다시 읽고
+다른 프로세스가 늘린 벡터 파일은 다시 memory-map합니다.
+한 프로세스 안에서는 인스턴스 하나를 여러 스레드가 공유하고(내부 잠금으로 직렬화),
+작업별 적중/인코딩 건수는 session()으로 따로 셉니다. (분석 서버)
+"""
+
+import hashlib
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+DEFAULT_CACHE_DIR = "cache/embeddings"
+DEFAULT_MAX_ENTRIES = 200000
+
+# SQLite IN 절에 한 번에 넣을 키 수
+_QUERY_CHUNK = 500
+
+# 다른 프로세스의 쓰기 트랜잭션을 기다릴 최대 시간(초)
+_LOCK_TIMEOUT = 60.0
+
+
+def normalize_text(text):
+    """
+    캐시 키 생성을 위해 리뷰 텍스트의 공백을 정리
+    (토크나이저 결과가 달라지지 않는 범위의 정규화만 수행)
+    """
+    return " ".join(str(text).split())
+
+
+def cache_key(text, model_id):
+    """정규화한 리뷰 텍스트와 모델 ID로 캐시 키 생성"""
+    return hashlib.sha1(f"{model_id}\0{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+
+def clear_cache(cache_dir=DEFAULT_CACHE_DIR):
+    """캐시 디렉토리 전체 삭제"""
+    if os.path.exists(cache_dir):
+        shutil.rmtree(cache_dir)
+
+
+class EmbeddingCache:
+    """
+    모델별 임베딩 캐시 (cache_dir/<모델 해시>/ 아래에 저장)
+    """
+
+    def __init__(self, model_id, cache_dir=DEFAULT_CACHE_DIR, max_entries=DEFAULT_MAX_ENTRIES):
+        self.model_id = model_id
+        self.max_entries = max_entries
+        self.path = os.path.join(cache_dir, hashlib.sha1(model_id.encode("utf-8")).hexdigest()[:12])
+        os.makedirs(self.path, exist_ok=True)
+
+        self.vectors_path = os.path.join(self.path, "vectors.f32")
+        self.lock = threading.Lock()
+        # 트랜잭션은 직접 관리 (isolation_level=None)
+        self.db = sqlite3.connect(os.path.join(self.path, "index.db"), timeout=_LOCK_TIMEOUT,
+                                  isolation_level=None, check_same_thread=False)
+        with self._transaction():
+            self.db.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)")
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS entries "
+                "(key TEXT PRIMARY KEY, slot INTEGER NOT NULL, last_used INTEGER NOT NULL)"
+            )
+            self.db.execute("CREATE INDEX IF NOT EXISTS entries_last_used ON entries(last_used)")
+            # LRU로 비운 슬롯 (새 슬롯보다 먼저 재사용)
+            self.db.execute("CREATE TABLE IF NOT EXISTS free_slots (slot INTEGER PRIMARY KEY)")
+            self.db.execute("INSERT OR IGNORE INTO meta VALUES ('model_id', ?)", (model_id,))
+        # 저장 중인 기존 키 (연결마다 따로 있는 임시 테이블, LRU 제거 대상에서 제외)
+        self.db.execute("CREATE TEMP TABLE IF NOT EXISTS writing (key TEXT PRIMARY KEY)")
+
+        self.dim = self._meta_int("dim")
+        self.vectors = None
+        self._open_vectors()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @contextmanager
+    def _transaction(self):
+        """쓰기 트랜잭션 (시작할 때 쓰기 잠금을 잡아 다른 스레드/프로세스의 조회/저장과 겹치지 않음)"""
+        with self.lock:
+            self.db.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+            except BaseException:
+                self.db.execute("ROLLBACK")
+                raise
+            self.db.execute("COMMIT")
+
+    def _meta_int(self, name):
+        row = self.db.execute("SELECT value FROM meta WHERE name = ?", (name,)).fetchone()
+        return int(row[0]) if row else None
+
+    def _set_meta(self, name, value):
+        self.db.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (name, str(value)))
+
+    def _open_vectors(self, min_slots=0):
+        """벡터 파일을 memory-map으로 열고, 필요하면 파일 크기를 늘림"""
+        if not self.dim:
+            return
+
+        row_bytes = self.dim * 4
+        size = os.path.getsize(self.vectors_path) if os.path.exists(self.vectors_path) else 0
+        capacity = size // row_bytes
+
+        if capacity < min_slots:
+            # 여유 공간을 두고 두 배씩 확장 (최대 항목 수까지)
+            capacity = max(min_slots, min(max(capacity * 2, 1024), self.max_entries))
+            if self.vectors is not None:
+                self.vectors.flush()
+                self.vectors = None
+            with open(self.vectors_path, "ab") as f:
+                f.truncate(capacity * row_bytes)
+
+        if capacity and (self.vectors is None or self.vectors.shape[0] != capacity):
+            self.vectors = np.memmap(self.vectors_path, dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+
+    def _refresh(self, max_slot):
+        """다른 프로세스가 차원을 정했거나 벡터 파일을 늘렸으면 다시 읽음 (트랜잭션 안에서 호출)"""
+        if not self.dim:
+            self.dim = self._meta_int("dim")
+        if self.dim and (self.vectors is None or max_slot >= self.vectors.shape[0]):
+            self._open_vectors()
+
+    def _lookup(self, keys):
+        """키 목록에 해당하는 {키: 슬롯} 조회"""
+        slots = {}
+        for start in range(0, len(keys), _QUERY_CHUNK):
+            chunk = keys[start:start + _QUERY_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self.db.execute(f"SELECT key, slot FROM entries WHERE key IN ({placeholders})", chunk)
+            slots.update(rows.fetchall())
+        return slots
+
+    def get_many(self, keys):
+        """
+        캐시된 벡터 조회
+
+        Returns:
+            tuple: ({키: 벡터}, 캐시에 없는 키 목록)
+        """
+        found = {}
+        with self._transaction():
+            slots = self._lookup(list(set(keys)))
+            if slots:
+                indices = np.fromiter(slots.values(), dtype=np.int64, count=len(slots))
+                self._refresh(int(indices.max()))
+                # 트랜잭션이 끝나면 다른 프로세스가 슬롯을 재사용할 수 있으므로 복사해 둠
+                found = dict(zip(slots.keys(), np.array(self.vectors[indices])))
+
+                now = time.time_ns()
+                self.db.executemany("UPDATE entries SET last_used = ? WHERE key = ?", [(now, key) for key in found])
+
+            missing = [key for key in keys if key not in found]
+            self.hits += len(keys) - len(missing)
+            self.misses += len(missing)
+        return found, missing
+
+    def _allocate(self, count):
+        """
+        새 항목을 저장할 슬롯 할당 (트랜잭션 안에서 호출)
+
+        최대 항목 수를 넘으면 LRU 항목을 제거해 빈 슬롯 목록에 넣고,
+        빈 슬롯을 먼저 사용한 뒤 부족한 만큼만 파일 끝(next_slot)에 새 슬롯을 만듭니다.
+        지금 저장 중인 키(임시 테이블 writing)는 제거하지 않습니다. (제거하면 그 슬롯이 새 키에 할당되어 두 키가 한 슬롯을 공유함)
+        """
+        total = self.db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        overflow = total + count - self.max_entries
+        if overflow > 0:
+            rows = self.db.execute(
+                "SELECT key, slot FROM entries WHERE key NOT IN (SELECT key FROM temp.writing) "
+                "ORDER BY last_used LIMIT ?", (overflow,)
+            ).fetchall()
+            self.db.executemany("DELETE FROM entries WHERE key = ?", [(key,) for key, _ in rows])
+            self.db.executemany("INSERT OR IGNORE INTO free_slots VALUES (?)", [(slot,) for _, slot in rows])
+            self.evictions += len(rows)
+
+        slots = [row[0] for row in self.db.execute("SELECT slot FROM free_slots ORDER BY slot LIMIT ?", (count,))]
+        self.db.executemany("DELETE FROM free_slots WHERE slot = ?", [(slot,) for slot in slots])
+
+        remaining = count - len(slots)
+        if remaining:
+            # 다른 프로세스가 할당했을 수 있으므로 트랜잭션 안에서 다시 읽음
+            next_slot = self._meta_int("next_slot") or 0
+            slots.extend(range(next_slot, next_slot + remaining))
+            self._set_meta("next_slot", next_slot + remaining)
+
+        return slots
+
+    def put_many(self, keys, vectors):
+        """
+        벡터 저장 (같은 키가 여러 번 있으면 한 번만 저장)
+
+        Returns:
+            int: 공간을 만들기 위해 제거한 항목 수
+        """
+        unique = {}
+        for key, vector in zip(keys, vectors):
+            unique[key] = vector
+        if not unique:
+            return 0
+
+        # 최대 항목 수보다 많으면 마지막 항목만 저장
+        items = list(unique.items())[-self.max_entries:]
+
+        with self._transaction():
+            evictions = self.evictions
+            if not self.dim:
+                self.dim = self._meta_int("dim")
+            if not self.dim:
+                self.dim = len(items[0][1])
+                self._set_meta("dim", self.dim)
+
+            # 다른 프로세스가 먼저 저장한 키는 기존 슬롯을 덮어씀
+            existing = self._lookup([key for key, _ in items])
+            self.db.execute("DELETE FROM temp.writing")
+            self.db.executemany("INSERT OR IGNORE INTO temp.writing VALUES (?)", [(key,) for key in existing])
+            new_slots = iter(self._allocate(sum(key not in existing for key, _ in items)))
+            slots = [existing[key] if key in existing else next(new_slots) for key, _ in items]
+
+            self._refresh(max(slots))
+            self._open_vectors(max(slots) + 1)
+            self.vectors[np.array(slots, dtype=np.int64)] = np.stack([vector for _, vector in items])
+            self.vectors.flush()
+
+            now = time.time_ns()
+            self.db.executemany(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?)",
+                [(key, slot, now) for (key, _), slot in zip(items, slots)]
+            )
+            return self.evictions - evictions
+
+    def hit_rate(self):
+        """이번 실행의 캐시 적중률"""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def session(self):
+        """이 캐시를 공유하는 작업 하나의 적중/인코딩/제거 건수를 따로 세는 세션"""
+        return CacheSession(self)
+
+    def close(self):
+        """벡터 파일과 인덱스를 디스크에 반영하고 닫기"""
+        if self.vectors is not None:
+            self.vectors.flush()
+            self.vectors = None
+        self.db.close()
+
+
+class CacheSession:
+    """
+    공유 EmbeddingCache를 사용하는 작업 하나의 캐시 (EmbeddingCache와 같은 방식으로 사용)
+    적중/인코딩/제거 건수를 작업별로 세며, close()는 공유 캐시를 닫지 않습니다.
+    """
+
+    def __init__(self, cache):
+        self.cache = cache
+        self.model_id = cache.model_id
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_many(self, keys):
+        found, missing = self.cache.get_many(keys)
+        self.hits += len(keys) - len(missing)
+        self.misses += len(missing)
+        return found, missing
+
+    def put_many(self, keys, vectors):
+        evictions = self.cache.put_many(keys, vectors)
+        self.evictions += evictions
+        return evictions
+
+    def hit_rate(self):
+        """이 작업의 캐시 적중률"""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def close(self):
+        pass
@@ -0,0 +1,275 @@
+"""
+감성 분석 임베딩 모델 백엔드
+
+같은 문장 임베딩 모델(sentence-transformers/all-MiniLM-L6-v2)을 세 가지 방식으로 실행합니다.
+    pytorch     기존 PyTorch 모델
+    onnx        ONNX로 내보낸 모델 (onnxruntime, CPU에서 더 빠름)
+    onnx-int8   동적 int8 양자화한 ONNX 모델 (가장 가볍고 빠름)
+
+모델 파일은 export 명령으로 한 번만 내려받아 로컬 모델 디렉토리(models/)에 저장하며,
+이후 실행에서는 네트워크에 접속하지 않고 로컬 파일만 사용합니다.
+ONNX 내보내기와 실행에는 onnx, onnxruntime이 필요합니다. (pip install "txtai[pipeline]")
+
+백엔드마다 임베딩 값이 조금씩 다르므로 임베딩 캐시, 기준 샘플 인덱스, k-NN 인덱스, 벡터 저장소는
+백엔드가 포함된 모델 ID(예: sentence-transformers/all-MiniLM-L6-v2#onnx-int8)로 구분합니다.
+check 명령으로 참조 리뷰에 대한 감정 레이블이 PyTorch 모델과 얼마나 일치하는지 확인한 뒤 백엔드를 바꾸세요.
+
+사용 예:
+    python encoder_backends.py export
+    python encoder_backends.py check --backend onnx-int8 -f data/reviews.csv --limit 2000
+    python sentiment_analysis_txtai.py -t "도서명" -f data/reviews.csv --encoder-backend onnx-int8
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+
+import numpy as np
+
+DEFAULT_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+DEFAULT_MODEL_DIR = "models"
+BACKENDS = ("pytorch", "onnx", "onnx-int8")
+DEFAULT_BACKEND = "pytorch"
+
+# 백엔드별 ONNX 파일명
+ONNX_FILES = {"onnx": "model.onnx", "onnx-int8": "model-int8.onnx"}
+
+# 로컬 모델 디렉토리에 내려받을 파일 (다른 형식의 가중치는 제외)
+SNAPSHOT_PATTERNS = ["*.json", "*.txt", "*.safetensors", "1_Pooling/*"]
+
+# 백엔드를 바꿔도 된다고 판단하는 기본 레이블 일치율
+DEFAULT_MIN_AGREEMENT = 0.98
+
+
+class EncoderModel:
+    """
+    임베딩 모델과 실행 백엔드
+
+    Args:
+        backend (str): 'pytorch', 'onnx', 'onnx-int8'
+        model_dir (str): 로컬 모델 디렉토리 (export로 생성)
+        model (str): Hugging Face 모델 이름
+        encodebatch (int, optional): 모델에 한 번에 넣는 최대 텍스트 수 (지정하지 않으면 txtai 기본값 32).
+            분석 배치 크기와 같게 두면 txtai가 넘겨받은 배치를 다시 나누지 않고 그대로 인코딩합니다.
+    """
+
+    def __init__(self, backend=DEFAULT_BACKEND, model_dir=DEFAULT_MODEL_DIR, model=DEFAULT_MODEL, encodebatch=None):
+        if backend not in BACKENDS:
+            raise ValueError(f"지원하지 않는 인코더 백엔드입니다: {backend}")
+        self.backend = backend
+        self.model_dir = model_dir
+        self.model = model
+        self.encodebatch = encodebatch
+
+    @classmethod
+    def from_id(cls, model_id, model_dir=DEFAULT_MODEL_DIR):
+        """모델 ID(모델 이름#백엔드)로 생성"""
+        model, _, backend = model_id.partition("#")
+        return cls(backend or DEFAULT_BACKEND, model_dir, model)
+
+    @property
+    def id(self):
+        """
+        캐시/인덱스 구분용 모델 ID
+        (pytorch는 기존 캐시와 호환되도록 모델 이름 그대로, ONNX는 '#백엔드'를 붙임)
+        """
+        return self.model if self.backend == "pytorch" else f"{self.model}#{self.backend}"
+
+    @property
+    def local_path(self):
+        """로컬 모델 디렉토리 (models/sentence-transformers__all-MiniLM-L6-v2)"""
+        return os.path.join(self.model_dir, re.sub(r"[^\w.-]", "__", self.model))
+
+    def is_local(self):
+        """로컬 모델 디렉토리가 있으면 Hugging Face 오프라인 모드를 켜고 True 반환"""
+        if not os.path.exists(os.path.join(self.local_path, "config.json")):
+            return False
+        os.environ.setdefault("HF_HUB_OFFLINE", "1")
+        os.environ.setdefault("TRANSFORMERS_OFFLINE", "1")
+        return True
+
+    def config(self):
+        """
+        txtai Embeddings 설정
+
+        로컬 모델이 있으면 로컬 파일만 사용합니다.
+        pytorch는 로컬 모델이 없으면 기존처럼 Hugging Face Hub 모델 이름을 사용하고,
+        ONNX 백엔드는 export로 만든 파일이 없으면 FileNotFoundError를 발생시킵니다.
+        """
+        if self.backend == "pytorch":
+            config = {"path": self.local_path if self.is_local() else self.model}
+        else:
+            onnx_path = os.path.join(self.local_path, ONNX_FILES[self.backend])
+            if not os.path.exists(onnx_path) or not self.is_local():
+                raise FileNotFoundError(
+                    f"{self.backend} 모델이 없습니다: {onnx_path} (python encoder_backends.py export로 먼저 생성하세요)"
+                )
+            config = {"path": onnx_path, "tokenizer": self.local_path}
+
+        if self.encodebatch:
+            config["encodebatch"] = self.encodebatch
+        return config
+
+    def tokenizer(self):
+        """모델 토크나이저 (transformers가 없거나 로드할 수 없으면 None)"""
+        try:
+            from transformers import AutoTokenizer
+        except ImportError:
+            return None
+        try:
+            return AutoTokenizer.from_pretrained(self.local_path if self.is_local() else self.model)
+        except (OSError, ValueError):
+            return None
+
+    def load(self):
+        """모델만 로드한 txtai Embeddings (인덱스 없이 batchtransform만 사용)"""
+        from txtai.embeddings import Embeddings
+        config = self.config()
+        return Embeddings(config)
+
+
+def export_model(model=DEFAULT_MODEL, model_dir=DEFAULT_MODEL_DIR, backends=BACKENDS):
+    """
+    모델을 로컬 디렉토리에 내려받고 ONNX / int8 양자화 ONNX로 내보내기 (네트워크 필요, 한 번만 실행)
+
+    Returns:
+        str: 로컬 모델 디렉토리
+    """
+    encoder = EncoderModel(DEFAULT_BACKEND, model_dir, model)
+    path = encoder.local_path
+
+    if not encoder.is_local():
+        from huggingface_hub import snapshot_download
+        print(f"⬇️ 모델 내려받는 중: {model} → {path}")
+        snapshot_download(model, local_dir=path, allow_patterns=SNAPSHOT_PATTERNS)
+
+    onnx_backends = [backend for backend in backends if backend in ONNX_FILES]
+    if onnx_backends:
+        from txtai.pipeline import HFOnnx
+        onnx = HFOnnx()
+        for backend in onnx_backends:
+            output = os.path.join(path, ONNX_FILES[backend])
+            start = time.perf_counter()
+            # pooling 태스크: 평균 풀링까지 포함한 문장 임베딩 그래프로 내보냄
+            onnx(path, task="pooling", output=output, quantize=backend == "onnx-int8")
+            size = os.path.getsize(output) / 1024 / 1024
+            print(f"📦 {backend}: {output} ({size:.1f}MB, {time.perf_counter() - start:.1f}초)")
+
+    return path
+
+
+def _encode(embeddings, texts, batch_size):
+    """배치 단위 임베딩 (임베딩 행렬, 초당 처리 건수)"""
+    start = time.perf_counter()
+    vectors = np.concatenate([
+        embeddings.batchtransform(texts[i:i + batch_size]) for i in range(0, len(texts), batch_size)
+    ])
+    return vectors, len(texts) / max(time.perf_counter() - start, 1e-9)
+
+
+def check_agreement(backend, paths, limit=2000, model_dir=DEFAULT_MODEL_DIR, batch_size=256):
+    """
+    참조 리뷰에 대해 PyTorch 모델과 대상 백엔드의 감정 레이블 일치율 측정
+
+    참조 리뷰는 기준 샘플 문장과 리뷰 파일에서 뽑은 고유 리뷰(정규화 기준, 최대 limit건)이며,
+    각 백엔드는 자신의 임베딩으로 만든 프로토타입 벡터로 레이블을 정합니다.
+
+    Returns:
+        dict: 일치율, 레이블별 불일치 건수, 임베딩 코사인 유사도, 백엔드별 처리 속도
+    """
+    import sentiment_analysis_txtai as analysis
+
+    texts = [text for _, text in analysis.SENTIMENT_SAMPLES]
+    seen = set(texts)
+    for path in paths:
+        df = analysis.load_reviews(path)
+        for text in df["리뷰내용"].dropna():
+            key = analysis.normalize_review_text(text)
+            if key and key not in seen:
+                seen.add(key)
+                texts.append(text)
+            if len(texts) >= limit:
+                break
+
+    results = {}
+    for name in ("pytorch", backend):
+        embeddings = EncoderModel(name, model_dir).load()
+        prototypes = analysis.build_prototype_vectors(embeddings)
+        vectors, speed = _encode(embeddings, texts, batch_size)
+        labels = analysis.predict_sentiments_batch(embeddings, texts, prototypes, batch_size)
+        results[name] = (vectors, labels, speed)
+
+    reference_vectors, reference_labels, reference_speed = results["pytorch"]
+    vectors, labels, speed = results[backend]
+    agree = reference_labels == labels
+
+    norms = np.linalg.norm(reference_vectors, axis=1) * np.linalg.norm(vectors, axis=1)
+    cosine = (reference_vectors * vectors).sum(axis=1) / np.where(norms == 0, 1, norms)
+
+    mismatches = {}
+    for reference, label in zip(reference_labels[~agree], labels[~agree]):
+        key = f"{reference}→{label}"
+        mismatches[key] = mismatches.get(key, 0) + 1
+
+    return {
+        "backend": backend,
+        "texts": len(texts),
+        "agreement": float(agree.mean()),
+        "mismatches": mismatches,
+        "cosine_mean": float(cosine.mean()),
+        "cosine_min": float(cosine.min()),
+        "pytorch_per_sec": reference_speed,
+        "backend_per_sec": speed
+    }
+
+
+def parse_arguments():
+    """명령행 인자 파싱"""
+    parser = argparse.ArgumentParser(description="임베딩 모델 백엔드 내보내기 및 일치율 검사")
+    parser.add_argument("--model-dir", default=DEFAULT_MODEL_DIR,
+                        help=f"로컬 모델 디렉토리 (기본값: {DEFAULT_MODEL_DIR})")
+    subparsers = parser.add_subparsers(dest="command", metavar="[export|check]", required=True)
+
+    export_parser = subparsers.add_parser("export", help="모델 내려받기 및 ONNX / int8 ONNX 내보내기 (네트워크 필요)")
+    export_parser.add_argument("--model", default=DEFAULT_MODEL, help=f"Hugging Face 모델 이름 (기본값: {DEFAULT_MODEL})")
+
+    check_parser = subparsers.add_parser("check", help="참조 리뷰에 대한 감정 레이블 일치율을 PyTorch 모델과 비교")
+    check_parser.add_argument("--backend", choices=[b for b in BACKENDS if b != "pytorch"], default="onnx-int8",
+                              help="비교할 백엔드 (기본값: onnx-int8)")
+    check_parser.add_argument("-f", "--file", nargs="+", default=[], help="참조 리뷰 CSV/Parquet 파일")
+    check_parser.add_argument("--limit", type=int, default=2000, help="참조 리뷰 최대 건수 (기본값: 2000)")
+    check_parser.add_argument("--batch-size", type=int, default=256, help="인코딩 배치 크기 (기본값: 256)")
+    check_parser.add_argument("--min-agreement", type=float, default=DEFAULT_MIN_AGREEMENT,
+                              help=f"이 일치율보다 낮으면 종료 코드 1 (기본값: {DEFAULT_MIN_AGREEMENT})")
+    return parser.parse_args()
+
+
+def main():
+    """메인 함수"""
+    args = parse_arguments()
+
+    if args.command == "export":
+        path = export_model(args.model, args.model_dir)
+        print(f"✨ 로컬 모델 준비 완료: {path}")
+        return
+
+    result = check_agreement(args.backend, args.file, args.limit, args.model_dir, args.batch_size)
+    print(f"🔍 {result['backend']} vs pytorch: 참조 문장 {result['texts']:,}건")
+    print(f"  레이블 일치율: {result['agreement']:.2%}")
+    for key, count in sorted(result["mismatches"].items()):
+        print(f"  불일치 {key}: {count:,}건")
+    print(f"  임베딩 코사인 유사도: 평균 {result['cosine_mean']:.4f}, 최소 {result['cosine_min']:.4f}")
+    print(f"  인코딩 속도: pytorch {result['pytorch_per_sec']:,.1f}건/초, "
+          f"{result['backend']} {result['backend_per_sec']:,.1f}건/초 "
+          f"({result['backend_per_sec'] / result['pytorch_per_sec']:.2f}배)")
+
+    if result["agreement"] < args.min_agreement:
+        print(f"❌ 일치율이 기준({args.min_agreement:.0%})보다 낮습니다.")
+        sys.exit(1)
+    print(f"✅ 일치율이 기준({args.min_agreement:.0%}) 이상입니다.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+"""
+스크래퍼 공용 요청 엔진
+
+모든 API 요청에 연결/응답 타임아웃을 적용하고, 일시적인 실패(연결 오류, 타임아웃, 429, 5xx,
+잘린 JSON 응답)는 지수 백오프와 지터를 두고 재시도합니다. 재시도를 모두 실패하면 FetchError를 발생시켜
+호출한 쪽이 수집이 불완전하다는 것을 알 수 있게 합니다. (예외를 삼키고 조용히 중단하지 않음)
+
+요청 속도는 여러 스레드가 공유하는 토큰 버킷으로 제한하며, 서버가 429/5xx로 응답하면 속도를 절반으로 낮추고
+(Retry-After가 있으면 그동안 멈춤) 성공이 이어지면 설정한 최대 속도까지 서서히 되돌립니다(AIMD).
+요청 수, 재시도 수, 받은 바이트, 지연 시간 분위수 등 실행 지표를 FetchStats에 모읍니다.
+"""
+
+import json
+import random
+import threading
+import time
+
+import requests
+
+DEFAULT_CONNECT_TIMEOUT = 5.0
+DEFAULT_READ_TIMEOUT = 30.0
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_BACKOFF_BASE = 0.5
+DEFAULT_BACKOFF_MAX = 30.0
+
+# 재시도할 HTTP 상태 코드 (서버 과부하/일시 오류)
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# 적응형 속도 제한: 429/5xx마다 속도를 곱하는 비율과 최저 속도(초당 요청 수)
+THROTTLE_FACTOR = 0.5
+MIN_RATE = 0.2
+# 요청이 성공할 때마다 더하는 속도(초당 요청 수), 현재 속도와 무관한 고정 증가분
+RECOVERY_STEP = 0.1
+
+
+class FetchError(Exception):
+    """재시도해도 응답을 받지 못했거나 재시도할 수 없는 오류 응답을 받은 경우"""
+
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+class RateLimiter:
+    """
+    여러 스레드가 공유하는 토큰 버킷 방식의 적응형 요청 속도 제한기입니다.
+
+    throttle()이 호출되면 현재 속도를 낮추고, recover()가 호출될 때마다
+    RECOVERY_STEP만큼 설정한 최대 속도까지 회복합니다.
+
+    Args:
+        rate (float): 초당 허용 요청 수(최대 속도). 0 이하이면 제한하지 않습니다. (Retry-After 대기는 적용)
+        burst (int, optional): 한 번에 몰아서 보낼 수 있는 최대 요청 수. 기본값은 초당 요청 수입니다.
+        min_rate (float, optional): 429/5xx가 이어져도 낮추지 않을 최저 속도
+    """
+
+    def __init__(self, rate, burst=None, min_rate=MIN_RATE):
+        self.max_rate = rate
+        self.rate = rate
+        self.min_rate = min(min_rate, rate) if rate > 0 else 0
+        self.capacity = burst or max(1, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.throttled = 0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """요청 한 건을 보낼 수 있을 때까지 대기"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    wait = self.paused_until - now
+                elif self.rate <= 0:
+                    return
+                else:
+                    self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                    self.updated = now
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def throttle(self, retry_after=None):
+        """서버가 과부하 응답을 보냈을 때 속도를 낮춤 (retry_after초 동안 모든 요청 중지)"""
+        with self.lock:
+            self.throttled += 1
+            if self.rate > 0:
+                self.rate = max(self.min_rate, self.rate * THROTTLE_FACTOR)
+                self.tokens = min(self.tokens, 0)
+            if retry_after:
+                self.paused_until = max(self.paused_until, time.monotonic() + retry_after)
+
+    def recover(self):
+        """요청 성공 시 속도를 고정 증가분만큼 최대 속도로 되돌림"""
+        with self.lock:
+            if self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate + RECOVERY_STEP)
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    return sorted_values[min(int(q * len(sorted_values)), len(sorted_values) - 1)]
+
+
+class FetchStats:
+    """요청 엔진 1회 실행의 지표 누적기 (여러 스레드에서 공유)"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.monotonic()
+        self.requests = 0
+        self.retries = 0
+        self.failures = 0
+        self.bytes = 0
+        self.latencies = []
+        self.statuses = {}
+        self.errors = {}
+
+    def observe(self, seconds, status=None, size=0, error=None):
+        """네트워크 요청 1회의 결과 기록 (응답을 받았으면 status, 못 받았으면 error 이름)"""
+        with self.lock:
+            self.requests += 1
+            self.latencies.append(seconds)
+            self.bytes += size
+            if status is not None:
+                self.statuses[status] = self.statuses.get(status, 0) + 1
+            if error is not None:
+                self.errors[error] = self.errors.get(error, 0) + 1
+
+    def record_retry(self):
+        with self.lock:
+            self.retries += 1
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+
+    def to_dict(self):
+        """JSON으로 저장할 지표"""
+        with self.lock:
+            latencies = sorted(self.latencies)
+            elapsed = time.monotonic() - self.started
+            return {
+                "requests": self.requests,
+                "retries": self.retries,
+                "failures": self.failures,
+                "bytes": self.bytes,
+                "elapsed_seconds": round(elapsed, 3),
+                "requests_per_sec": round(self.requests / elapsed, 2) if elapsed else None,
+                "bytes_per_sec": round(self.bytes / elapsed, 1) if elapsed else None,
+                "latency_seconds": {
+                    "p50": _percentile(latencies, 0.5),
+                    "p90": _percentile(latencies, 0.9),
+                    "p99": _percentile(latencies, 0.99),
+                    "max": latencies[-1] if latencies else None
+                },
+                "statuses": {str(status): count for status, count in sorted(self.statuses.items())},
+                "errors": dict(self.errors)
+            }
+
+    def write_json(self, path):
+        """지표를 JSON 파일로 저장"""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+
+    def summary(self):
+        """이번 실행의 요청 현황 문자열"""
+        data = self.to_dict()
+        latency = data["latency_seconds"]
+        text = (f"요청 {data['requests']}건 (재시도 {data['retries']}건, 실패 {data['failures']}건), "
+                f"{data['bytes'] / 1024 / 1024:.2f}MB, {data['requests_per_sec'] or 0:.1f}건/초")
+        if latency["p50"] is not None:
+            text += (f", 지연 p50 {latency['p50'] * 1000:.0f}ms / p90 {latency['p90'] * 1000:.0f}ms / "
+                     f"p99 {latency['p99'] * 1000:.0f}ms")
+        return text
+
+
+def _retry_after_seconds(response):
+    """Retry-After 헤더(초 단위)를 읽음 (없거나 날짜 형식이면 None)"""
+    value = response.headers.get("Retry-After")
+    try:
+        return max(0.0, float(value)) if value is not None else None
+    except ValueError:
+        return None
+
+
+class FetchEngine:
+    """
+    타임아웃, 재시도, 적응형 속도 제한, 응답 캐시를 적용하는 JSON API 요청기
+
+    Args:
+        session (requests.Session): 요청에 사용할 세션 (연결 풀 공유)
+        limiter (RateLimiter, optional): 요청 속도 제한기. 캐시 적중 시에는 토큰을 쓰지 않습니다.
+        cache (ResponseCache, optional): API 응답 캐시 (재생 모드에서 캐시에 없으면 CacheMiss)
+        stats (FetchStats, optional): 실행 지표 누적기. 지정하지 않으면 새로 만듭니다.
+        connect_timeout (float): 연결 타임아웃(초)
+        read_timeout (float): 응답 대기 타임아웃(초)
+        max_retries (int): 요청 1건당 최대 재시도 횟수
+        backoff_base (float): 첫 재시도 대기 시간 상한(초). 재시도마다 2배가 되며 0~상한 사이에서 무작위로 대기합니다.
+        backoff_max (float): 재시도 대기 시간 상한의 최댓값(초)
+    """
+
+    def __init__(self, session, limiter=None, cache=None, stats=None,
+                 connect_timeout=DEFAULT_CONNECT_TIMEOUT, read_timeout=DEFAULT_READ_TIMEOUT,
+                 max_retries=DEFAULT_MAX_RETRIES, backoff_base=DEFAULT_BACKOFF_BASE, backoff_max=DEFAULT_BACKOFF_MAX):
+        self.session = session
+        self.limiter = limiter
+        self.cache = cache
+        self.stats = stats if stats is not None else FetchStats()
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max(0, max_retries)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+    def _backoff(self, attempt, retry_after=None):
+        """재시도 전 대기 (full jitter, Retry-After가 더 길면 그만큼 대기)"""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        time.sleep(max(delay, retry_after or 0))
+
+    def get_json(self, url, params=None, headers=None):
+        """
+        API를 GET으로 요청하여 JSON 응답을 반환합니다.
+        응답 캐시가 있으면 캐시를 먼저 확인하고, 새로 받은 응답은 캐시에 저장합니다.
+
+        Returns:
+            dict: JSON 응답
+
+        Raises:
+            FetchError: 재시도를 모두 실패했거나 재시도할 수 없는 오류 응답(4xx)을 받은 경우
+        """
+        if self.cache is not None:
+            data = self.cache.get_json(url, params)
+            if data is not None:
+                return data
+
+        for attempt in range(self.max_retries + 1):
+            if self.limiter is not None:
+                self.limiter.acquire()
+
+            retry_after = None
+            start = time.monotonic()
+            try:
+                response = self.session.get(url, params=params, headers=headers, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                self.stats.observe(time.monotonic() - start, error=type(e).__name__)
+                reason = f"{type(e).__name__}: {e}"
+            else:
+                self.stats.observe(time.monotonic() - start, response.status_code, len(response.content))
+                if response.status_code == 200:
+                    try:
+                        data = response.json()
+                    except ValueError:
+                        # 연결이 끊겨 잘린 응답도 일시적인 오류로 보고 재시도
+                        reason = "JSON 응답을 해석할 수 없습니다"
+                    else:
+                        if self.limiter is not None:
+                            self.limiter.recover()
+                        if self.cache is not None:
+                            self.cache.put(url, params, response.content)
+                        return data
+                elif response.status_code in RETRY_STATUSES:
+                    retry_after = _retry_after_seconds(response)
+                    if self.limiter is not None:
+                        self.limiter.throttle(retry_after)
+                    reason = f"HTTP {response.status_code}"
+                else:
+                    self.stats.record_failure()
+                    raise FetchError(f"HTTP {response.status_code}: {url} {params or ''}", response.status_code)
+
+            if attempt < self.max_retries:
+                self.stats.record_retry()
+                self._backoff(attempt, retry_after)
+
+        self.stats.record_failure()
+        raise FetchError(f"{self.max_retries}회 재시도 후 실패 ({reason}): {url} {params or ''}")
+
+    def close(self):
+        """세션의 연결 풀 종료"""
+        self.session.close()
@@ -0,0 +1,280 @@
+"""
+k-NN 감성 분류기
+
+수집한 리뷰를 평점으로 약한 레이블(4점 이상: positive, 2점 이하: negative, 3점은 제외)을 붙여
+임베딩 인덱스를 만들고, 분석할 리뷰마다 가장 가까운 k개 리뷰의 유사도 가중 투표로 감정을 정합니다.
+레이블은 문서 ID가 아니라 인덱스와 함께 저장한 메타데이터(labels.json)에서 읽습니다.
+
+기본값은 hnswlib의 근사 최근접 이웃(HNSW) 인덱스이며(hnswlib가 없으면 ImportError),
+--backend numpy로 numpy 행렬곱 기반 전수 탐색을 선택할 수 있습니다.
+
+사용 예:
+    python knn_classifier.py data/교보_*_리뷰_전체.csv -o cache/knn_index
+    python sentiment_analysis_txtai.py -t "도서명" -f data/reviews.csv --classifier knn
+"""
+
+import argparse
+import json
+import os
+import time
+from datetime import datetime
+
+import numpy as np
+
+from encoder_backends import BACKENDS, DEFAULT_BACKEND, DEFAULT_MODEL_DIR, EncoderModel
+
+DEFAULT_KNN_INDEX_DIR = "cache/knn_index"
+DEFAULT_K = 15
+KNN_INDEX_VERSION = 1
+
+# 평점 기반 약한 레이블 기준
+POSITIVE_MIN_RATING = 4
+NEGATIVE_MAX_RATING = 2
+
+DEFAULT_KNN_BACKEND = "hnsw"
+
+# HNSW 인덱스 설정
+HNSW_M = 16
+HNSW_EF_CONSTRUCTION = 200
+
+
+def _import_hnswlib():
+    try:
+        import hnswlib
+    except ImportError as e:
+        raise ImportError("hnsw 백엔드를 사용하려면 hnswlib가 필요합니다: pip install hnswlib "
+                          "(또는 --backend numpy)") from e
+    return hnswlib
+
+
+def _normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def rating_to_label(rating):
+    """평점을 약한 감정 레이블로 변환 (중립 평점이거나 평점이 없으면 None)"""
+    try:
+        rating = float(rating)
+    except (TypeError, ValueError):
+        return None
+    if rating >= POSITIVE_MIN_RATING:
+        return "positive"
+    if rating <= NEGATIVE_MAX_RATING:
+        return "negative"
+    return None
+
+
+def collect_labeled_reviews(paths, max_per_label=None, seed=42):
+    """
+    리뷰 파일들에서 (리뷰내용, 레이블) 목록 수집
+    (max_per_label을 지정하면 레이블별로 무작위 추출하여 개수를 제한)
+    """
+    from sentiment_analysis_txtai import load_reviews
+
+    texts, labels = [], []
+    for path in paths:
+        df = load_reviews(path)
+        for text, rating in zip(df["리뷰내용"], df["평점"]):
+            label = rating_to_label(rating)
+            if label is None or not isinstance(text, str) or not text.strip():
+                continue
+            texts.append(text)
+            labels.append(label)
+
+    if max_per_label:
+        rng = np.random.default_rng(seed)
+        labels_array = np.array(labels, dtype=object)
+        keep = []
+        for label in sorted(set(labels)):
+            positions = np.flatnonzero(labels_array == label)
+            if len(positions) > max_per_label:
+                positions = rng.choice(positions, max_per_label, replace=False)
+            keep.extend(positions.tolist())
+        keep.sort()
+        texts = [texts[i] for i in keep]
+        labels = [labels[i] for i in keep]
+
+    return texts, labels
+
+
+class KnnSentimentClassifier:
+    """
+    레이블이 붙은 리뷰 임베딩에 대한 k-NN 가중 투표 분류기
+    """
+
+    def __init__(self, vectors, labels, model_id, k=DEFAULT_K, backend=DEFAULT_KNN_BACKEND, normalized=False):
+        # 이미 정규화된 벡터(저장된 인덱스의 memmap)는 복사하지 않고 그대로 사용하여 필요한 부분만 읽도록 함
+        self.vectors = vectors if normalized else _normalize(vectors)
+        self.classes = np.array(sorted(set(labels)), dtype=object)
+        class_ids = {label: i for i, label in enumerate(self.classes)}
+        self.label_ids = np.array([class_ids[label] for label in labels], dtype=np.int64)
+        self.model_id = model_id
+        self.k = min(k, len(labels))
+        self.index = None
+
+        self.backend = backend or DEFAULT_KNN_BACKEND
+        if self.backend not in ("hnsw", "numpy"):
+            raise ValueError(f"알 수 없는 k-NN 백엔드: {self.backend}")
+        if self.backend == "hnsw":
+            _import_hnswlib()
+
+    def _build_hnsw(self):
+        hnswlib = _import_hnswlib()
+        index = hnswlib.Index(space="ip", dim=self.vectors.shape[1])
+        index.init_index(max_elements=len(self.vectors), ef_construction=HNSW_EF_CONSTRUCTION, M=HNSW_M)
+        index.add_items(self.vectors, np.arange(len(self.vectors)))
+        return index
+
+    def _set_ef(self):
+        self.index.set_ef(max(self.k * 4, 64))
+
+    def neighbors(self, queries):
+        """질의 벡터별 최근접 k개 (인덱스 행렬, 코사인 유사도 행렬)"""
+        queries = _normalize(queries)
+        if self.backend == "hnsw":
+            if self.index is None:
+                self.index = self._build_hnsw()
+                self._set_ef()
+            ids, distances = self.index.knn_query(queries, k=self.k)
+            return ids.astype(np.int64), 1.0 - distances
+
+        # 유사도 행렬이 너무 커지지 않도록 질의를 나누어 계산 (청크당 약 16M 원소)
+        chunk = max(1, (1 << 24) // len(self.vectors))
+        ids = np.empty((len(queries), self.k), dtype=np.int64)
+        similarities = np.empty((len(queries), self.k), dtype=np.float32)
+        for start in range(0, len(queries), chunk):
+            scores = queries[start:start + chunk] @ self.vectors.T
+            if self.k < scores.shape[1]:
+                top = np.argpartition(-scores, self.k - 1, axis=1)[:, :self.k]
+            else:
+                top = np.tile(np.arange(scores.shape[1]), (len(scores), 1))
+            ids[start:start + chunk] = top
+            similarities[start:start + chunk] = np.take_along_axis(scores, top, axis=1)
+        return ids, similarities
+
+    def predict(self, queries):
+        """유사도 가중 투표로 감정 레이블 배열 반환"""
+        ids, similarities = self.neighbors(queries)
+        weights = np.clip(similarities, 0.0, None) + 1e-6
+        neighbor_labels = self.label_ids[ids]
+        votes = np.stack([(weights * (neighbor_labels == c)).sum(axis=1) for c in range(len(self.classes))], axis=1)
+        return self.classes[votes.argmax(axis=1)]
+
+    def save(self, path):
+        """정규화된 벡터, 레이블 메타데이터, (hnsw이면) 그래프 인덱스를 저장"""
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, "vectors.npy"), self.vectors)
+        with open(os.path.join(path, "labels.json"), "w", encoding="utf-8") as f:
+            json.dump(self.classes[self.label_ids].tolist(), f, ensure_ascii=False)
+
+        if self.backend == "hnsw":
+            if self.index is None:
+                self.index = self._build_hnsw()
+                self._set_ef()
+            self.index.save_index(os.path.join(path, "hnsw.bin"))
+
+        # 매니페스트는 마지막에 기록하여 저장 도중 중단되면 불완전한 인덱스로 취급되도록 함
+        counts = {label: int((self.classes[self.label_ids] == label).sum()) for label in self.classes}
+        manifest = {
+            "version": KNN_INDEX_VERSION,
+            "model": self.model_id,
+            "size": len(self.label_ids),
+            "dim": int(self.vectors.shape[1]),
+            "labels": counts,
+            "backend": self.backend,
+            "created_at": datetime.now().isoformat(timespec="seconds")
+        }
+        with open(os.path.join(path, "manifest.json"), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+    @classmethod
+    def load(cls, path, model_id, k=DEFAULT_K):
+        """저장된 분류기 로드 (모델이 다르면 ValueError)"""
+        manifest_path = os.path.join(path, "manifest.json")
+        if not os.path.exists(manifest_path):
+            raise FileNotFoundError(f"k-NN 인덱스가 없습니다: {path} (knn_classifier.py로 먼저 생성하세요)")
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("version") != KNN_INDEX_VERSION:
+            raise ValueError(f"k-NN 인덱스 형식 버전이 다릅니다: {manifest.get('version')}")
+        if manifest["model"] != model_id:
+            raise ValueError(f"k-NN 인덱스의 모델({manifest['model']})이 현재 모델({model_id})과 다릅니다")
+
+        vectors = np.load(os.path.join(path, "vectors.npy"), mmap_mode="r")
+        with open(os.path.join(path, "labels.json"), encoding="utf-8") as f:
+            labels = json.load(f)
+
+        # 생성할 때의 백엔드를 그대로 사용 (numpy로 만든 인덱스를 hnsw로 열면 첫 예측 때 그래프를 새로 만들고 결과도 근사치가 됨)
+        classifier = cls(vectors, labels, model_id, k, backend=manifest.get("backend"), normalized=True)
+        hnsw_path = os.path.join(path, "hnsw.bin")
+        if classifier.backend == "hnsw" and os.path.exists(hnsw_path):
+            index = _import_hnswlib().Index(space="ip", dim=classifier.vectors.shape[1])
+            index.load_index(hnsw_path, max_elements=len(labels))
+            classifier.index = index
+            classifier._set_ef()
+        return classifier
+
+
+def build_knn_classifier(paths, output_dir=DEFAULT_KNN_INDEX_DIR, max_per_label=None, batch_size=256,
+                         use_cache=True, backend=DEFAULT_KNN_BACKEND, model=None):
+    """리뷰 파일들로 k-NN 분류기를 만들어 저장 (model: EncoderModel, 분석할 때와 같은 백엔드를 사용해야 함)"""
+    import sentiment_analysis_txtai as analysis
+    from embedding_cache import EmbeddingCache
+
+    model = model or EncoderModel()
+
+    texts, labels = collect_labeled_reviews(paths, max_per_label)
+    if not texts:
+        raise ValueError("평점으로 레이블을 붙일 수 있는 리뷰가 없습니다")
+    print(f"🏷 레이블 리뷰 {len(texts):,}건 (positive {labels.count('positive'):,}, negative {labels.count('negative'):,})")
+
+    txtai_index, _ = analysis.load_or_build_txtai_index(model=model)
+    cache = EmbeddingCache(model.id) if use_cache else None
+    try:
+        start = time.perf_counter()
+        vectors = np.concatenate([
+            analysis.encode_batch(txtai_index, texts[i:i + batch_size], cache)
+            for i in range(0, len(texts), batch_size)
+        ])
+        print(f"🧠 인코딩 완료: {len(texts) / max(time.perf_counter() - start, 1e-9):,.1f}건/초")
+    finally:
+        if cache is not None:
+            cache.close()
+
+    classifier = KnnSentimentClassifier(vectors, labels, model.id, backend=backend)
+    classifier.save(output_dir)
+    print(f"✨ k-NN 인덱스 저장 ({classifier.backend}): {output_dir}")
+    return classifier
+
+
+def parse_arguments():
+    """명령행 인자 파싱"""
+    parser = argparse.ArgumentParser(description="평점 기반 약한 레이블로 k-NN 감성 분류 인덱스 생성")
+    parser.add_argument("files", nargs="+", help="리뷰 CSV/Parquet 파일 (평점, 리뷰내용 컬럼 필요)")
+    parser.add_argument("-o", "--output", default=DEFAULT_KNN_INDEX_DIR,
+                        help=f"인덱스 저장 경로 (기본값: {DEFAULT_KNN_INDEX_DIR})")
+    parser.add_argument("--max-per-label", type=int, help="레이블별 최대 리뷰 수 (초과 시 무작위 추출)")
+    parser.add_argument("--batch-size", type=int, default=256, help="인코딩 배치 크기 (기본값: 256)")
+    parser.add_argument("--backend", choices=["hnsw", "numpy"], default=DEFAULT_KNN_BACKEND,
+                        help=f"최근접 이웃 탐색 방식 (기본값: {DEFAULT_KNN_BACKEND}, hnswlib 필요)")
+    parser.add_argument("--no-cache", action="store_true", help="임베딩 캐시를 사용하지 않음")
+    parser.add_argument("--encoder-backend", choices=BACKENDS, default=DEFAULT_BACKEND,
+                        help="임베딩 모델 실행 방식 (기본값: pytorch, 분석할 때와 같아야 함)")
+    parser.add_argument("--model-dir", default=DEFAULT_MODEL_DIR,
+                        help=f"로컬 모델 디렉토리 (기본값: {DEFAULT_MODEL_DIR})")
+    return parser.parse_args()
+
+
+def main():
+    """메인 함수"""
+    args = parse_arguments()
+    build_knn_classifier(args.files, args.output, args.max_per_label, args.batch_size,
+                         not args.no_cache, args.backend,
+                         EncoderModel(args.encoder_backend, args.model_dir, encodebatch=args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,321 @@
+"""
+교보문고 API 로컬 목업 서버
+
+실제 사이트에 요청하지 않고 스크래퍼를 실행/측정할 수 있도록 리뷰 목록(/api/review/list)과
+카테고리 도서 목록(/api/gw/pdt/category/all)을 같은 JSON 형태로 응답합니다.
+리뷰와 도서는 요청한 페이지만 시드 기반으로 생성하므로(도서 코드/리뷰 위치가 같으면 항상 같은 데이터)
+데이터 크기와 관계없이 메모리를 거의 쓰지 않습니다.
+
+응답 지연, 최대 페이지 크기, 무작위 500/429 오류, 초당 요청 수 초과 시 429(Retry-After),
+항상 실패하는 페이지, 실제 항목 수와 다른 totalCount를 설정할 수 있습니다.
+요청/응답 현황은 /_mock/stats로 확인합니다.
+
+사용 예:
+    python mock_kyobo_server.py --port 8765 --reviews 5000 --latency 0.05 --error-rate 0.02
+    python scraper_kyobo.py --api-host http://127.0.0.1:8765 review S000000000001
+    python sentiment_analysis_txtai.py -t "목업" --scrape S000000000001 --api-host http://127.0.0.1:8765
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from benchmark_pipeline import EMOTION_KEYWORDS, RATING_WEIGHTS, REVIEW_PHRASES
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_REVIEWS = 1000
+DEFAULT_BOOKS = 1000
+DEFAULT_MAX_PAGE_SIZE = 100
+
+REVIEW_PATH = "/api/review/list"
+CATEGORY_PATH = "/api/gw/pdt/category/all"
+STATS_PATH = "/_mock/stats"
+
+# 첫 리뷰의 작성일시 (이후 리뷰는 평균 1시간 간격)
+FIRST_REVIEW_TIME = datetime(2015, 1, 1, 0, 0, 0)
+# 가장 최근 도서의 출시일 (도서는 최신순으로 이 날짜부터 거슬러 올라감)
+LATEST_RELEASE_DATE = datetime(2024, 12, 31)
+
+
+def _seed(*parts):
+    """문자열/정수 조합의 결정적 시드"""
+    return zlib.crc32("|".join(map(str, parts)).encode("utf-8"))
+
+
+def generate_review(book_code, position, total, seed=0):
+    """
+    도서 리뷰 total건 중 position번째(0 = 가장 최근) 리뷰 API 항목 생성
+
+    리뷰 내용은 작성 순번(total - position, 1 = 가장 오래된 리뷰)으로 정하므로
+    total을 늘려도(신규 리뷰 추가) 기존 리뷰는 그대로이고 페이지 위치만 뒤로 밀립니다. (증분 수집 테스트)
+
+    Returns:
+        dict: 리뷰 API 항목 (revwNum, mmbrId, cretDttm, revwCntt, revwEmtnKywrName, revwRvgr)
+    """
+    number = total - position
+    rng = random.Random(_seed(seed, book_code, number))
+    # 나중에 작성된 리뷰일수록 작성일시가 늦음 (최신순 정렬 유지)
+    created = FIRST_REVIEW_TIME + timedelta(seconds=number * 3600 + rng.randrange(3600))
+    return {
+        "revwNum": _seed(book_code) % 1000000 * 1000000 + number,
+        "mmbrId": f"user{rng.randrange(1000000)}",
+        "cretDttm": created.strftime("%Y-%m-%d %H:%M:%S"),
+        "revwCntt": " ".join(rng.choices(REVIEW_PHRASES, k=rng.randint(1, 6))),
+        "revwEmtnKywrName": ",".join(rng.sample(EMOTION_KEYWORDS, k=rng.randint(0, 3))),
+        "revwRvgr": rng.choices(range(1, 6), weights=RATING_WEIGHTS)[0]
+    }
+
+
+def generate_book(category, position, seed=0):
+    """카테고리의 position번째 도서 API 항목 생성 (스크래퍼가 읽는 필드만 채움)"""
+    rng = random.Random(_seed(seed, category, position))
+    return {
+        "saleCmdtId": f"S{_seed(category) % 10000:04d}{position:08d}",
+        "cmdtName": f"목업 도서 {category}-{position + 1}",
+        "cmdtcode": f"{9791100000000 + position}",
+        "saleCmdtGrpDvsnCode": "SGK",
+        "saleCmdtDvsnCode": "KOR",
+        "saleCmdtClstCode": category,
+        "pbcmName": f"출판사{rng.randrange(50)}",
+        "rlseDate": (LATEST_RELEASE_DATE - timedelta(days=position)).strftime("%Y%m%d"),
+        "inbukCntt": rng.choice(REVIEW_PHRASES),
+        "price": rng.randrange(10, 40) * 1000,
+        "revwRvgrAvg": round(rng.uniform(6, 10), 1),
+        "bestEmtnKywrName": rng.choice(EMOTION_KEYWORDS),
+        "productInfo": {"like": rng.randrange(1000), "buy": True, "shippingText": "내일 도착"}
+    }
+
+
+class MockKyoboServer:
+    """
+    교보문고 리뷰/카테고리 API 목업 서버
+
+    Args:
+        host (str): 바인딩 주소
+        port (int): 포트 (0이면 빈 포트 자동 선택)
+        reviews (int): 도서별 리뷰 수
+        books (int): 카테고리별 도서 수
+        max_page_size (int): 한 페이지 최대 항목 수 (요청한 pageLimit/per가 더 크면 이 값으로 줄임)
+        latency (float): 응답 지연(초)
+        jitter (float): 응답 지연에 더할 무작위 시간 상한(초)
+        error_rate (float): 무작위 500 응답 비율
+        throttle_rate (float): 무작위 429 응답 비율
+        rate_limit (float): 초당 요청 수 한도 (초과 시 429, 0이면 제한 없음)
+        retry_after (float): 429 응답의 Retry-After(초, 0이면 헤더 없음)
+        fail_pages (iterable): 항상 500으로 응답할 페이지 번호
+        total_count (int, optional): 카테고리 응답의 totalCount (기본값: 실제 도서 수)
+        seed (int): 데이터/오류 생성 시드
+    """
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, reviews=DEFAULT_REVIEWS, books=DEFAULT_BOOKS,
+                 max_page_size=DEFAULT_MAX_PAGE_SIZE, latency=0.0, jitter=0.0, error_rate=0.0, throttle_rate=0.0,
+                 rate_limit=0.0, retry_after=1.0, fail_pages=(), total_count=None, seed=0):
+        self.reviews = reviews
+        self.books = books
+        self.max_page_size = max_page_size
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.rate_limit = rate_limit
+        self.retry_after = retry_after
+        self.fail_pages = set(fail_pages)
+        self.total_count = total_count
+        self.seed = seed
+
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.window = []
+        self.requests = 0
+        self.statuses = {}
+        self.bytes = 0
+        self.started = time.monotonic()
+
+        handler = type("Handler", (_MockRequestHandler,), {"mock": self})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """백그라운드 스레드에서 서버 실행"""
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name="mock-kyobo", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """서버 종료"""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def serve_forever(self):
+        self.httpd.serve_forever()
+
+    def _record(self, status, size):
+        with self.lock:
+            self.requests += 1
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+            self.bytes += size
+
+    def _inject_error(self, page):
+        """주입할 오류 응답 상태 코드 (정상이면 None)"""
+        if page in self.fail_pages:
+            return 500
+        with self.lock:
+            if self.rate_limit > 0:
+                now = time.monotonic()
+                self.window = [t for t in self.window if t > now - 1.0]
+                self.window.append(now)
+                if len(self.window) > self.rate_limit:
+                    return 429
+            draw = self.rng.random()
+        if draw < self.throttle_rate:
+            return 429
+        if draw < self.throttle_rate + self.error_rate:
+            return 500
+        return None
+
+    def _page(self, query, size_param):
+        page = max(1, int(query.get("page", ["1"])[0]))
+        size = int(query.get(size_param, [str(self.max_page_size)])[0])
+        return page, max(1, min(size, self.max_page_size))
+
+    def review_page(self, query):
+        """리뷰 목록 응답 본문"""
+        page, size = self._page(query, "pageLimit")
+        book_code = query.get("saleCmdtid", [""])[0]
+        start = (page - 1) * size
+        items = [generate_review(book_code, i, self.reviews, self.seed)
+                 for i in range(start, min(start + size, self.reviews))]
+        return {"data": {"reviewList": items, "totalCount": self.reviews}, "resultCode": "000000"}
+
+    def category_page(self, query):
+        """카테고리 도서 목록 응답 본문"""
+        page, size = self._page(query, "per")
+        category = query.get("saleCmdtClstCode", [""])[0]
+        start = (page - 1) * size
+        items = [generate_book(category, i, self.seed) for i in range(start, min(start + size, self.books))]
+        total = self.books if self.total_count is None else self.total_count
+        return {"data": {"tabContents": items, "totalCount": total}, "resultCode": "000000"}
+
+    def stats(self):
+        """요청/응답 현황"""
+        with self.lock:
+            elapsed = time.monotonic() - self.started
+            return {
+                "requests": self.requests,
+                "statuses": {str(status): count for status, count in sorted(self.statuses.items())},
+                "bytes": self.bytes,
+                "elapsed_seconds": round(elapsed, 3)
+            }
+
+
+class _MockRequestHandler(BaseHTTPRequestHandler):
+    """목업 API 요청 처리기 (mock 속성에 MockKyoboServer가 지정된 하위 클래스로 사용)"""
+
+    protocol_version = "HTTP/1.1"
+    # 헤더와 본문을 따로 보내므로 Nagle 알고리즘을 끄지 않으면 keep-alive 요청마다 수십 ms가 지연됨
+    disable_nagle_algorithm = True
+    mock = None
+
+    def _send(self, status, payload=None, headers=None):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8") if payload is not None else b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+        return len(body)
+
+    def do_GET(self):
+        mock = self.mock
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+
+        if url.path == STATS_PATH:
+            self._send(200, mock.stats())
+            return
+        if url.path not in (REVIEW_PATH, CATEGORY_PATH):
+            mock._record(404, self._send(404, {"error": "not found"}))
+            return
+
+        delay = mock.latency + (random.uniform(0, mock.jitter) if mock.jitter else 0)
+        if delay:
+            time.sleep(delay)
+
+        try:
+            page = int(query.get("page", ["1"])[0])
+        except ValueError:
+            mock._record(400, self._send(400, {"error": "invalid page"}))
+            return
+
+        status = mock._inject_error(page)
+        if status == 429:
+            headers = {"Retry-After": f"{mock.retry_after:g}"} if mock.retry_after else None
+            mock._record(429, self._send(429, {"error": "too many requests"}, headers))
+            return
+        if status is not None:
+            mock._record(status, self._send(status, {"error": "injected error"}))
+            return
+
+        payload = mock.review_page(query) if url.path == REVIEW_PATH else mock.category_page(query)
+        mock._record(200, self._send(200, payload))
+
+    def log_message(self, format, *args):
+        pass
+
+
+def parse_arguments():
+    """명령행 인자 파싱"""
+    parser = argparse.ArgumentParser(description="교보문고 리뷰/카테고리 API 로컬 목업 서버")
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"바인딩 주소 (기본값: {DEFAULT_HOST})")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"포트 (기본값: {DEFAULT_PORT})")
+    parser.add_argument("--reviews", type=int, default=DEFAULT_REVIEWS, help=f"도서별 리뷰 수 (기본값: {DEFAULT_REVIEWS})")
+    parser.add_argument("--books", type=int, default=DEFAULT_BOOKS, help=f"카테고리별 도서 수 (기본값: {DEFAULT_BOOKS})")
+    parser.add_argument("--max-page-size", type=int, default=DEFAULT_MAX_PAGE_SIZE,
+                        help=f"한 페이지 최대 항목 수 (기본값: {DEFAULT_MAX_PAGE_SIZE})")
+    parser.add_argument("--latency", type=float, default=0.0, help="응답 지연(초) (기본값: 0)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="응답 지연에 더할 무작위 시간 상한(초) (기본값: 0)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="무작위 500 응답 비율 (기본값: 0)")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="무작위 429 응답 비율 (기본값: 0)")
+    parser.add_argument("--rate-limit", type=float, default=0.0,
+                        help="초당 요청 수 한도, 초과하면 429 응답 (기본값: 0, 제한 없음)")
+    parser.add_argument("--retry-after", type=float, default=1.0,
+                        help="429 응답의 Retry-After(초), 0이면 헤더 없음 (기본값: 1)")
+    parser.add_argument("--fail-page", type=int, action="append", default=[],
+                        help="항상 500으로 응답할 페이지 번호 (여러 번 지정 가능)")
+    parser.add_argument("--total-count", type=int, help="카테고리 응답의 totalCount (기본값: 실제 도서 수)")
+    parser.add_argument("--seed", type=int, default=0, help="데이터/오류 생성 시드 (기본값: 0)")
+    return parser.parse_args()
+
+
+def main():
+    """메인 함수"""
+    args = parse_arguments()
+    server = MockKyoboServer(args.host, args.port, args.reviews, args.books, args.max_page_size, args.latency,
+                             args.jitter, args.error_rate, args.throttle_rate, args.rate_limit, args.retry_after,
+                             args.fail_page, args.total_count, args.seed)
+    print(f"🧪 목업 교보문고 API: {server.url} (도서별 리뷰 {args.reviews:,}건, 카테고리별 도서 {args.books:,}권)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n서버를 종료합니다...")
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+멀티 프로세스 리뷰 임베딩
+
+CPU 전용 환경에서 리뷰 텍스트를 여러 프로세스로 나누어 인코딩합니다.
+각 워커 프로세스는 자신의 txtai 임베딩 모델을 한 번 로드해 두고, torch 스레드 수를
+명시적으로 제한하여 (워커 수 × 스레드 수 ≤ 코어 수) 과다 구독을 막습니다.
+ParallelEncoder는 Embeddings.batchtransform과 같은 인터페이스를 제공하므로
+analyze_sentiments 등에 txtai 인덱스 대신 그대로 넘길 수 있습니다.
+"""
+
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# 워커 프로세스의 임베딩 모델 (프로세스마다 한 번 로드)
+_worker_embeddings = None
+
+
+def default_workers():
+    """기본 워커 수 (사용 가능한 CPU 코어 수)"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def _init_worker(model_config, threads):
+    """워커 프로세스 초기화: 스레드 수 제한 후 모델 로드"""
+    global _worker_embeddings
+
+    # torch/BLAS가 처음 로드되기 전에 설정해야 적용됨
+    for name in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[name] = str(threads)
+    os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+
+    try:
+        import torch
+        torch.set_num_threads(threads)
+        torch.set_num_interop_threads(1)
+    except (ImportError, RuntimeError):
+        pass
+
+    from txtai.embeddings import Embeddings
+    _worker_embeddings = Embeddings(model_config)
+
+
+def _encode_shard(texts):
+    return _worker_embeddings.batchtransform(texts)
+
+
+class ParallelEncoder:
+    """
+    프로세스 풀 기반 임베딩 인코더
+
+    batchtransform()에 전달된 텍스트를 워커 수만큼 샤드로 나누어 병렬로 인코딩하고,
+    결과를 원래 순서대로 합쳐 반환합니다.
+    model_config는 txtai Embeddings 설정(EncoderModel.config())이며, 모델 이름 문자열도 받습니다.
+    """
+
+    def __init__(self, model_config, workers=None, threads_per_worker=None, min_shard_size=16):
+        if isinstance(model_config, str):
+            model_config = {"path": model_config}
+        self.model_config = model_config
+        self.workers = workers or default_workers()
+        self.threads_per_worker = threads_per_worker or max(1, default_workers() // self.workers)
+        self.min_shard_size = min_shard_size
+
+        # fork는 torch 스레드 풀 상태를 복제해 교착될 수 있으므로 spawn 사용
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(model_config, self.threads_per_worker)
+        )
+
+    def warmup(self):
+        """모든 워커가 모델을 로드하도록 미리 작업을 보냄"""
+        list(self.executor.map(_encode_shard, [["warmup"]] * self.workers))
+
+    def batchtransform(self, documents, category=None, index=None):
+        """텍스트 목록을 병렬로 임베딩 (결과 행 순서는 입력 순서와 같음)"""
+        documents = list(documents)
+        if not documents:
+            return np.empty((0, 0), dtype=np.float32)
+
+        # executor.map은 제출 순서대로 결과를 반환
+        return np.concatenate(list(self.executor.map(_encode_shard, self.shards(documents))))
+
+    def shards(self, documents):
+        """워커별로 나눈 텍스트 목록 (각 워커가 한 번에 인코딩하는 단위)"""
+        shard_size = max(self.min_shard_size, math.ceil(len(documents) / self.workers))
+        return [documents[start:start + shard_size] for start in range(0, len(documents), shard_size)]
+
+    def close(self):
+        """워커 프로세스 종료"""
+        self.executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
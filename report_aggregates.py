@@ -0,0 +1,235 @@
+"""
+리포트 집계용 누적기
+
+리뷰 데이터를 청크 단위로 나누어 처리해도 전체를 한 번에 처리한 것과 같은 리포트를 만들 수 있도록,
+감정키워드 분포 / 월별 평점 / 평점 통계 / 워드클라우드 단어 빈도를 병합 가능한 형태로 누적합니다.
+"""
+
+import re
+from collections import Counter, defaultdict
+from operator import itemgetter
+
+import numpy as np
+import pandas as pd
+
+# 워드클라우드 단어 추출 설정 (generate_wordcloud의 WordCloud 설정과 동일해야 함)
+WORDCLOUD_REGEXP = r"\w[\w']+"
+COLLOCATION_THRESHOLD = 30
+
+# NaT 작성일시를 가장 뒤로 정렬하기 위한 값 (sort_values의 na_position='last'와 동일)
+_NAT_KEY = np.iinfo(np.int64).max
+
+
+def split_keywords(entry):
+    """쉼표로 구분된 감정키워드 문자열을 키워드 목록으로 분해"""
+    return [kw.strip() for kw in entry.split(",")]
+
+
+def _process_token_counts(counts, normalize_plurals=True):
+    """
+    wordcloud.tokenization.process_tokens와 같은 대소문자/복수형 정규화를
+    단어 목록 대신 단어별 빈도(Counter)에 대해 수행
+    """
+    d = defaultdict(dict)
+    for word, count in counts.items():
+        case_dict = d[word.lower()]
+        case_dict[word] = case_dict.get(word, 0) + count
+
+    merged_plurals = {}
+    if normalize_plurals:
+        for key in list(d.keys()):
+            if key.endswith('s') and not key.endswith("ss"):
+                key_singular = key[:-1]
+                if key_singular in d:
+                    dict_plural = d[key]
+                    dict_singular = d[key_singular]
+                    for word, count in dict_plural.items():
+                        singular = word[:-1]
+                        dict_singular[singular] = dict_singular.get(singular, 0) + count
+                    merged_plurals[key] = key_singular
+                    del d[key]
+
+    fused_cases = {}
+    standard_cases = {}
+    item1 = itemgetter(1)
+    for word_lower, case_dict in d.items():
+        first = max(case_dict.items(), key=item1)[0]
+        fused_cases[first] = sum(case_dict.values())
+        standard_cases[word_lower] = first
+
+    for plural, singular in merged_plurals.items():
+        standard_cases[plural] = standard_cases[singular.lower()]
+
+    return fused_cases, standard_cases
+
+
+class TermFrequencyAccumulator:
+    """
+    워드클라우드용 단어/바이그램 빈도 누적기
+
+    WordCloud.process_text와 같은 규칙(정규식 토큰화, 숫자/불용어 제거, 복수형 병합, 연어 판정)을
+    적용하되, 전체 리뷰를 하나의 문자열로 합치지 않고 리뷰 단위로 빈도만 누적합니다.
+    바이그램은 리뷰 안에서만 만들어지므로 결과는 리뷰 처리 순서와 무관합니다.
+    """
+
+    def __init__(self, stopwords=None):
+        if stopwords is None:
+            from wordcloud import STOPWORDS
+            stopwords = STOPWORDS
+        self.stopwords = {word.lower() for word in stopwords}
+        self.unigrams = Counter()
+        self.bigrams = Counter()
+        self.n_words = 0
+
+    def update(self, texts):
+        """리뷰 텍스트 목록의 단어 빈도 누적 (결측값은 건너뜀)"""
+        stopwords = self.stopwords
+        for text in texts:
+            if not isinstance(text, str):
+                continue
+
+            words = re.findall(WORDCLOUD_REGEXP, text)
+            words = [word[:-2] if word.lower().endswith("'s") else word for word in words]
+            words = [word for word in words if not word.isdigit()]
+
+            is_stopword = [word.lower() in stopwords for word in words]
+            unigrams = [word for word, stop in zip(words, is_stopword) if not stop]
+            self.unigrams.update(unigrams)
+            self.n_words += len(unigrams)
+            self.bigrams.update(
+                f"{words[i]} {words[i + 1]}"
+                for i in range(len(words) - 1)
+                if not (is_stopword[i] or is_stopword[i + 1])
+            )
+
+    def merge(self, other):
+        """다른 누적기의 빈도를 병합"""
+        self.unigrams.update(other.unigrams)
+        self.bigrams.update(other.bigrams)
+        self.n_words += other.n_words
+
+    def frequencies(self):
+        """WordCloud.generate_from_frequencies에 전달할 {단어: 빈도} 반환"""
+        from wordcloud.tokenization import score
+
+        counts_unigrams, standard_form = _process_token_counts(self.unigrams)
+        # wordcloud.tokenization.unigrams_and_bigrams는 바이그램에도 단어와 같은 normalize_plurals를 적용함
+        # (WordCloud 기본값 True, 1.4~1.9 동일) - False로 바꾸면 "great books"/"great book"이 따로 집계되어 결과가 달라짐
+        counts_bigrams, _ = _process_token_counts(self.bigrams, normalize_plurals=True)
+        orig_counts = counts_unigrams.copy()
+
+        # 연어(collocation)로 판정된 바이그램은 단어 빈도에서 빼고 바이그램으로 추가
+        for bigram_string, count in counts_bigrams.items():
+            first, second = bigram_string.split(" ")
+            word1 = standard_form[first.lower()]
+            word2 = standard_form[second.lower()]
+
+            if score(count, orig_counts[word1], orig_counts[word2], self.n_words) > COLLOCATION_THRESHOLD:
+                counts_unigrams[word1] -= count
+                counts_unigrams[word2] -= count
+                counts_unigrams[bigram_string] = count
+
+        return {word: count for word, count in counts_unigrams.items() if count > 0}
+
+
+class ReportAccumulator:
+    """
+    HTML 리포트에 필요한 집계값 누적기
+
+    update()에 전달하는 DataFrame은 작성일시, 리뷰내용, 감정키워드, 평점 컬럼을 가져야 하며,
+    인덱스는 원본 파일의 행 번호여야 합니다. (청크 단위로 읽어도 행 번호가 이어짐)
+    """
+
+    def __init__(self, stopwords=None):
+        self.keyword_counts = Counter()
+        self.keyword_first_seen = {}
+        self.monthly_sum = defaultdict(float)
+        self.monthly_count = defaultdict(int)
+        self.rating_sum = 0.0
+        self.rating_count = 0
+        self.rating_min = None
+        self.rating_max = None
+        self.terms = TermFrequencyAccumulator(stopwords)
+
+    def update(self, df):
+        """리뷰 DataFrame(또는 청크)의 집계값 누적"""
+        df = df.sort_index()
+        timestamps = pd.to_datetime(df["작성일시"])
+        ratings = pd.to_numeric(df["평점"], errors="coerce")
+
+        # 감정키워드: 빈도와 함께 (작성일시, 행 번호, 순서) 기준 최초 등장 위치를 기록하여
+        # 작성일시순으로 정렬한 전체 데이터에서 센 것과 같은 순서를 유지
+        ts_keys = np.where(timestamps.isna(), _NAT_KEY, timestamps.to_numpy(dtype="datetime64[ns]").astype("int64"))
+        for row, ts_key, entry in zip(df.index, ts_keys, df["감정키워드"]):
+            # 빈 문자열은 키워드 없음 (CSV에서는 결측값으로 읽히고 Parquet에서는 빈 문자열로 남음)
+            if pd.isna(entry) or not entry.strip():
+                continue
+            for position, keyword in enumerate(split_keywords(entry)):
+                self.keyword_counts[keyword] += 1
+                key = (int(ts_key), row, position)
+                if keyword not in self.keyword_first_seen or key < self.keyword_first_seen[keyword]:
+                    self.keyword_first_seen[keyword] = key
+
+        # 월별 평점 합계/개수 (행마다 문자열을 만들지 않고 월 단위 기간으로 묶은 뒤 그룹 키만 변환)
+        monthly = ratings.astype("float64").groupby(timestamps.dt.to_period('M')).agg(['sum', 'count'])
+        for period, row in monthly.iterrows():
+            month = period.strftime('%Y-%m')
+            self.monthly_sum[month] += row['sum']
+            self.monthly_count[month] += int(row['count'])
+
+        # 평점 통계
+        valid = ratings.dropna()
+        if len(valid):
+            self.rating_sum += float(valid.sum())
+            self.rating_count += len(valid)
+            self.rating_min = valid.min() if self.rating_min is None else min(self.rating_min, valid.min())
+            self.rating_max = valid.max() if self.rating_max is None else max(self.rating_max, valid.max())
+
+        # 워드클라우드 단어 빈도
+        self.terms.update(df["리뷰내용"])
+
+    def merge(self, other):
+        """다른 누적기의 집계값을 병합"""
+        self.keyword_counts.update(other.keyword_counts)
+        for keyword, key in other.keyword_first_seen.items():
+            if keyword not in self.keyword_first_seen or key < self.keyword_first_seen[keyword]:
+                self.keyword_first_seen[keyword] = key
+
+        for month, total in other.monthly_sum.items():
+            self.monthly_sum[month] += total
+        for month, count in other.monthly_count.items():
+            self.monthly_count[month] += count
+
+        self.rating_sum += other.rating_sum
+        self.rating_count += other.rating_count
+        for value in (other.rating_min, other.rating_max):
+            if value is not None:
+                self.rating_min = value if self.rating_min is None else min(self.rating_min, value)
+                self.rating_max = value if self.rating_max is None else max(self.rating_max, value)
+
+        self.terms.merge(other.terms)
+
+    def keyword_distribution(self):
+        """감정키워드별 빈도 (작성일시순 최초 등장 순서)"""
+        keywords = sorted(self.keyword_counts, key=self.keyword_first_seen.get)
+        return {keyword: self.keyword_counts[keyword] for keyword in keywords}
+
+    def rating_summary(self):
+        """월별 평점 추이와 전체 평점 통계"""
+        months = sorted(month for month, count in self.monthly_count.items() if count >= 1)
+        average = self.rating_sum / self.rating_count if self.rating_count else float("nan")
+
+        return {
+            'date_labels': months,
+            'rating_series': [float(np.round(self.monthly_sum[m] / self.monthly_count[m], 2)) for m in months],
+            'review_counts': [self.monthly_count[m] for m in months],
+            'average': average,
+            'mean': float(np.round(average, 2)),
+            'min': float(np.round(self.rating_min, 2)) if self.rating_min is not None else float("nan"),
+            'max': float(np.round(self.rating_max, 2)) if self.rating_max is not None else float("nan"),
+            'count': self.rating_count
+        }
+
+    def term_frequencies(self):
+        """워드클라우드 단어 빈도"""
+        return self.terms.frequencies()
@@ -0,0 +1,158 @@
+"""
+스크래퍼 API 응답 디스크 캐시
+
+요청 URL과 파라미터를 키로 API 응답 원문을 gzip으로 압축해 저장합니다.
+유효 기간(TTL)이 지난 응답은 다시 요청하고, 전체 크기가 한도를 넘으면 오래된 응답부터 삭제합니다.
+재생(replay) 모드에서는 네트워크 요청 없이 캐시된 응답만으로 CSV를 다시 만들 수 있습니다.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from urllib.parse import urlencode
+
+DEFAULT_RESPONSE_CACHE_DIR = "cache/responses"
+DEFAULT_TTL_HOURS = 24.0
+DEFAULT_MAX_MB = 1024
+
+
+class CacheMiss(Exception):
+    """재생 모드에서 캐시에 없는 응답을 요청한 경우"""
+
+
+def response_cache_key(url, params=None):
+    """URL과 파라미터(순서 무관)로 캐시 키 생성"""
+    query = urlencode(sorted((str(k), str(v)) for k, v in (params or {}).items()))
+    return hashlib.sha256(f"{url}?{query}".encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    gzip 압축 API 응답 캐시 (cache_dir/<키 앞 2자리>/<키>.gz)
+
+    Args:
+        cache_dir (str): 캐시 디렉토리
+        ttl_hours (float): 응답 유효 기간(시간). 0 이하이면 만료되지 않습니다.
+        max_mb (float): 캐시 최대 크기(MB). 초과하면 오래된 응답부터 삭제합니다.
+        replay (bool): True이면 만료와 관계없이 캐시된 응답만 사용하고 네트워크 요청을 하지 않습니다.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_RESPONSE_CACHE_DIR, ttl_hours=DEFAULT_TTL_HOURS,
+                 max_mb=DEFAULT_MAX_MB, replay=False):
+        self.cache_dir = cache_dir
+        self.ttl = ttl_hours * 3600
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.replay = replay
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self.total_bytes = sum(size for _, _, size in self._entries())
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.gz")
+
+    def _entries(self):
+        """(경로, 수정 시각, 크기) 목록"""
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith(".gz"):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    entries.append((path, stat.st_mtime, stat.st_size))
+        return entries
+
+    def get(self, url, params=None):
+        """
+        캐시된 응답 본문을 반환합니다.
+
+        Returns:
+            bytes: 응답 본문 (없거나 만료되었으면 None)
+        """
+        path = self._path(response_cache_key(url, params))
+        try:
+            mtime = os.path.getmtime(path)
+            if not self.replay and self.ttl > 0 and time.time() - mtime > self.ttl:
+                raise FileNotFoundError(path)
+            with gzip.open(path, "rb") as f:
+                content = f.read()
+        except (FileNotFoundError, OSError, EOFError):
+            with self.lock:
+                self.misses += 1
+            return None
+
+        with self.lock:
+            self.hits += 1
+        return content
+
+    def get_json(self, url, params=None):
+        """캐시된 응답을 JSON으로 파싱하여 반환 (없으면 None, 재생 모드에서는 CacheMiss)"""
+        content = self.get(url, params)
+        if content is None:
+            if self.replay:
+                raise CacheMiss(f"캐시에 없는 응답입니다: {url} {params or ''}")
+            return None
+        return json.loads(content)
+
+    def put(self, url, params, content):
+        """응답 본문 저장 (임시 파일에 쓴 뒤 교체)"""
+        path = self._path(response_cache_key(url, params))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with gzip.open(temp_path, "wb") as f:
+            f.write(content)
+
+        size = os.path.getsize(temp_path)
+        previous = os.path.getsize(path) if os.path.exists(path) else 0
+        os.replace(temp_path, path)
+
+        with self.lock:
+            self.total_bytes += size - previous
+            if self.total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """최대 크기의 90%가 될 때까지 오래된 응답부터 삭제 (lock을 잡은 상태에서 호출)"""
+        target = self.max_bytes * 0.9
+        entries = sorted(self._entries(), key=lambda entry: entry[1])
+        self.total_bytes = sum(size for _, _, size in entries)
+        for path, _, size in entries:
+            if self.total_bytes <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            self.total_bytes -= size
+            self.evictions += 1
+
+    def refreshing(self):
+        """캐시된 응답을 읽지 않고 새로 받은 응답만 저장하는 캐시 (재생 모드이면 그대로 반환)"""
+        return self if self.replay else _RefreshingCache(self)
+
+    def summary(self):
+        """이번 실행의 캐시 사용 현황 문자열"""
+        return (f"응답 캐시: 적중 {self.hits}건, 요청 {self.misses}건, 삭제 {self.evictions}건, "
+                f"크기 {self.total_bytes / 1024 / 1024:.2f}MB")
+
+
+class _RefreshingCache:
+    """ResponseCache를 읽지 않고 쓰기만 하는 래퍼 (항상 새 응답이 필요한 요청용, FetchEngine에 cache로 전달)"""
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    def get_json(self, url, params=None):
+        return None
+
+    def put(self, url, params, content):
+        self.cache.put(url, params, content)
@@ -0,0 +1,260 @@
+"""
+리포트 생성 실행 지표 수집
+
+단계별 실행 시간(load, model_init, encode, search, store, aggregate, wordcloud, html),
+인코딩 배치 지연 시간 히스토그램, 임베딩 캐시 적중률, 최대 메모리(RSS)를 모아
+JSON 파일이나 Prometheus textfile collector 형식(.prom)으로 저장합니다.
+지정한 한 단계는 cProfile로 프로파일링하여 .pstats 파일로 남길 수 있습니다.
+"""
+
+import cProfile
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# 리포트 생성 단계 (출력 순서)
+STAGES = ["download", "load", "model_init", "encode", "search", "store", "aggregate", "wordcloud", "html"]
+
+# 인코딩 배치 지연 시간 히스토그램 구간 (초)
+ENCODE_LATENCY_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+
+PROMETHEUS_PREFIX = "review_report"
+
+
+def peak_rss_bytes():
+    """현재 프로세스의 최대 RSS (바이트, 측정할 수 없으면 None)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux는 KB, macOS는 바이트 단위
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def timed(metrics, name):
+    """metrics가 있으면 해당 단계의 시간을 측정하는 컨텍스트 (없으면 아무것도 하지 않음)"""
+    return metrics.stage(name) if metrics is not None else nullcontext()
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    return sorted_values[min(int(q * len(sorted_values)), len(sorted_values) - 1)]
+
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class RunMetrics:
+    """
+    리포트 생성 1회 실행의 지표 누적기
+
+    같은 단계가 여러 번 실행되면(배치/청크 단위) 시간을 합산하고 호출 횟수를 셉니다.
+    """
+
+    def __init__(self, book_title=None, profile_stage=None):
+        self.book_title = book_title
+        self.started_at = datetime.now().isoformat(timespec="seconds")
+        self.start = time.perf_counter()
+        self.elapsed = None
+        self.stages = {}
+        self.encode_latencies = []
+        self.encoded_texts = 0
+        self.reviews = 0
+        self.dedup_rows = 0
+        self.dedup_unique = 0
+        self.cache = None
+        self.schedule = None
+        self.stream = None
+        self.profile_stage = profile_stage
+        self.profiler = cProfile.Profile() if profile_stage else None
+
+    @contextmanager
+    def stage(self, name):
+        """단계 실행 시간 측정 (profile_stage와 같으면 cProfile도 수행)"""
+        profiling = self.profiler is not None and name == self.profile_stage
+        if profiling:
+            self.profiler.enable()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            if profiling:
+                self.profiler.disable()
+            stage = self.stages.setdefault(name, {"seconds": 0.0, "calls": 0})
+            stage["seconds"] += elapsed
+            stage["calls"] += 1
+
+    def observe_encode(self, seconds, size):
+        """인코딩 배치 1회의 지연 시간 기록"""
+        self.encode_latencies.append(seconds)
+        self.encoded_texts += size
+
+    def record_dedup(self, rows, unique):
+        """중복 제거 전 행 수와 실제로 인코딩한 고유 텍스트 수 기록"""
+        self.dedup_rows += rows
+        self.dedup_unique += unique
+
+    def dedup_ratio(self):
+        """중복 제거로 줄어든 인코딩 비율"""
+        return 1 - self.dedup_unique / self.dedup_rows if self.dedup_rows else 0.0
+
+    def record_cache(self, cache):
+        """임베딩 캐시 적중/인코딩/제거 건수 기록"""
+        self.cache = {
+            "hits": cache.hits,
+            "misses": cache.misses,
+            "evictions": cache.evictions,
+            "hit_rate": round(cache.hit_rate(), 4)
+        }
+
+    def record_schedule(self, scheduler):
+        """토큰 배치 스케줄러의 패딩 효율과 긴 리뷰 분할 현황 기록"""
+        self.schedule = scheduler.to_dict()
+
+    def record_stream(self, stream):
+        """스트리밍 파이프라인의 다운로드/대기열/요청 현황 기록"""
+        self.stream = stream.to_dict()
+
+    def finish(self):
+        """전체 실행 시간 확정"""
+        self.elapsed = time.perf_counter() - self.start
+
+    def encode_histogram(self):
+        """인코딩 배치 지연 시간 누적 히스토그램 ({상한: 개수})"""
+        return {
+            bound: sum(1 for latency in self.encode_latencies if latency <= bound)
+            for bound in ENCODE_LATENCY_BUCKETS
+        }
+
+    def to_dict(self):
+        """JSON으로 저장할 지표"""
+        latencies = sorted(self.encode_latencies)
+        ordered = sorted(self.stages, key=lambda name: STAGES.index(name) if name in STAGES else len(STAGES))
+        rss = peak_rss_bytes()
+
+        return {
+            "book_title": self.book_title,
+            "started_at": self.started_at,
+            "total_seconds": round(self.elapsed if self.elapsed is not None else time.perf_counter() - self.start, 4),
+            "reviews": self.reviews,
+            "stages": {
+                name: {"seconds": round(self.stages[name]["seconds"], 4), "calls": self.stages[name]["calls"]}
+                for name in ordered
+            },
+            "encode_batches": {
+                "count": len(latencies),
+                "texts": self.encoded_texts,
+                "sum_seconds": round(sum(latencies), 4),
+                "p50_seconds": _percentile(latencies, 0.5),
+                "p95_seconds": _percentile(latencies, 0.95),
+                "max_seconds": latencies[-1] if latencies else None,
+                "buckets": {str(bound): count for bound, count in self.encode_histogram().items()}
+            },
+            "dedup": {
+                "rows": self.dedup_rows,
+                "unique_texts": self.dedup_unique,
+                "ratio": round(self.dedup_ratio(), 4)
+            } if self.dedup_rows else None,
+            "cache": self.cache,
+            "schedule": self.schedule,
+            "stream": self.stream,
+            "peak_rss_mb": round(rss / 1024 / 1024, 1) if rss is not None else None
+        }
+
+    def write_json(self, path):
+        """지표를 JSON 파일로 저장"""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+
+    def to_prometheus(self):
+        """Prometheus 텍스트 노출 형식으로 변환"""
+        data = self.to_dict()
+        book = f'book="{_escape_label(self.book_title or "")}"'
+        p = PROMETHEUS_PREFIX
+        lines = [
+            f"# HELP {p}_stage_seconds Wall time spent in each report stage.",
+            f"# TYPE {p}_stage_seconds gauge"
+        ]
+        for name, stage in data["stages"].items():
+            lines.append(f'{p}_stage_seconds{{{book},stage="{name}"}} {stage["seconds"]}')
+
+        lines += [
+            f"# HELP {p}_encode_batch_seconds Latency of each embedding batch.",
+            f"# TYPE {p}_encode_batch_seconds histogram"
+        ]
+        for bound, count in self.encode_histogram().items():
+            lines.append(f'{p}_encode_batch_seconds_bucket{{{book},le="{bound}"}} {count}')
+        lines.append(f'{p}_encode_batch_seconds_bucket{{{book},le="+Inf"}} {len(self.encode_latencies)}')
+        lines.append(f"{p}_encode_batch_seconds_sum{{{book}}} {sum(self.encode_latencies)}")
+        lines.append(f"{p}_encode_batch_seconds_count{{{book}}} {len(self.encode_latencies)}")
+
+        gauges = [
+            ("duration_seconds", "Total wall time of the report run.", data["total_seconds"]),
+            ("reviews", "Number of reviews analyzed.", data["reviews"]),
+            ("peak_rss_bytes", "Peak resident set size of the process.", peak_rss_bytes())
+        ]
+        if self.dedup_rows:
+            gauges.append(("dedup_ratio", "Share of review texts skipped by in-run deduplication.",
+                           round(self.dedup_ratio(), 4)))
+        if self.schedule is not None:
+            gauges += [
+                ("padding_efficiency", "Share of non-padding tokens in scheduled embedding batches.",
+                 self.schedule["padding_efficiency"]),
+                ("chunked_reviews", "Over-length reviews split into chunks instead of truncated.",
+                 self.schedule["chunked_reviews"])
+            ]
+        if self.cache is not None:
+            gauges += [
+                ("cache_hits", "Embedding cache hits.", self.cache["hits"]),
+                ("cache_misses", "Embedding cache misses (texts encoded).", self.cache["misses"]),
+                ("cache_hit_ratio", "Embedding cache hit ratio.", self.cache["hit_rate"])
+            ]
+        for name, help_text, value in gauges:
+            if value is None:
+                continue
+            lines += [f"# HELP {p}_{name} {help_text}", f"# TYPE {p}_{name} gauge", f"{p}_{name}{{{book}}} {value}"]
+
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        """
+        Prometheus textfile collector용 .prom 파일 저장
+        (collector가 쓰는 도중의 파일을 읽지 않도록 임시 파일에 쓴 뒤 교체)
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_path, path)
+
+    def dump_profile(self, path):
+        """프로파일링한 단계의 cProfile 결과를 .pstats 파일로 저장"""
+        if self.profiler is None:
+            return
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.profiler.dump_stats(path)
+
+    def print_summary(self):
+        """단계별 실행 시간 요약 출력"""
+        data = self.to_dict()
+        print(f"\n⏱ 단계별 실행 시간 (전체 {data['total_seconds']:.2f}초)")
+        for name, stage in data["stages"].items():
+            share = stage["seconds"] / data["total_seconds"] if data["total_seconds"] else 0
+            print(f"  {name:<11} {stage['seconds']:>9.3f}초 {share:>6.1%}  ({stage['calls']:,}회)")
+        batches = data["encode_batches"]
+        if batches["count"]:
+            print(f"  인코딩 배치 {batches['count']:,}회, p50 {batches['p50_seconds'] * 1000:.1f}ms, "
+                  f"p95 {batches['p95_seconds'] * 1000:.1f}ms")
+        if data["peak_rss_mb"] is not None:
+            print(f"  최대 메모리(RSS): {data['peak_rss_mb']:,.1f}MB")
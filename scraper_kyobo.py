@@ -2,23 +2,170 @@ import requests
 import json
 import csv
 import os
+import argparse
+import glob
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
+from requests.adapters import HTTPAdapter
 import pandas as pd
+from response_cache import ResponseCache, DEFAULT_RESPONSE_CACHE_DIR, DEFAULT_TTL_HOURS, DEFAULT_MAX_MB
+from fetch_engine import (FetchEngine, FetchStats, RateLimiter, DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT,
+                          DEFAULT_MAX_RETRIES)
 
-def scrap_category_book_list(sale_cmdt_clst_code, output_path=None):
+# 교보문고 API 호스트 (로컬 테스트 서버로 바꿔 실행할 수 있음)
+KYOBO_API_HOST = 'https://product.kyobobook.co.kr'
+
+# 리뷰 페이지 동시 요청 수 기본값
+DEFAULT_CONCURRENCY = 1
+
+# 일괄 수집 시 도서 동시 처리 수
+DEFAULT_BULK_WORKERS = 4
+
+# 전체 초당 요청 수 기본값 (429/5xx 응답을 받으면 자동으로 낮춤)
+DEFAULT_RATE_LIMIT = 5.0
+
+# 리뷰 정렬 기준 (001: 최신순). 증분 수집은 최신순 정렬을 전제로 합니다.
+REVIEW_SORT_NEWEST = '001'
+
+# 리뷰 CSV 컬럼
+REVIEW_FIELDNAMES = ['리뷰번호', '회원ID', '작성일시', '리뷰내용', '감정키워드', '평점']
+
+# 리뷰 저장 형식 (parquet은 pyarrow 필요)
+OUTPUT_FORMATS = ('csv', 'parquet')
+
+# 리뷰 작성일시 형식 (Parquet 저장 시 timestamp로 변환)
+REVIEW_DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+def create_session(pool_size=DEFAULT_CONCURRENCY):
     """
-    교보문고 카테고리별 도서 목록을 스크랩하여 CSV 파일로 저장합니다.
+    keep-alive 연결을 재사용하는 requests 세션을 생성합니다.
     
     Args:
-        sale_cmdt_clst_code (str): 교보문고 카테고리 코드
-        output_path (str, optional): 출력 파일 경로. 지정하지 않으면 현재 디렉토리에 생성됩니다.
+        pool_size (int): 호스트당 유지할 최대 연결 수
     
     Returns:
-        str: 처리 결과 메시지
+        requests.Session: 연결 풀이 설정된 세션
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(pool_size, 1))
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+def fetch_pages_in_order(fetch_page, concurrency=DEFAULT_CONCURRENCY, start_page=1):
     """
-    # 기본 URL과 헤더 설정
-    base_url = 'https://product.kyobobook.co.kr/api/gw/pdt/category/all'
-    headers = {
+    페이지를 최대 concurrency개까지 동시에 요청하고, 결과를 페이지 순서대로 반환합니다.
+    빈 페이지를 만나면 이후 페이지 결과는 버리고 종료합니다.
+    
+    Args:
+        fetch_page (callable): 페이지 번호를 받아 해당 페이지의 항목 리스트를 반환하는 함수
+        concurrency (int): 동시에 요청할 최대 페이지 수
+        start_page (int): 시작 페이지 번호
+    
+    Yields:
+        list: 페이지별 항목 리스트
+    """
+    concurrency = max(concurrency, 1)
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+    pending = deque()
+    next_page = start_page
+    
+    try:
+        while True:
+            # 요청 중인 페이지가 concurrency개가 되도록 다음 페이지를 미리 요청
+            while len(pending) < concurrency:
+                pending.append(executor.submit(fetch_page, next_page))
+                next_page += 1
+            
+            items = pending.popleft().result()
+            if not items:
+                break
+            yield items
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+def create_fetcher(pool_size=DEFAULT_CONCURRENCY, rate_limit=DEFAULT_RATE_LIMIT, cache=None, fetch_options=None):
+    """
+    타임아웃, 재시도, 적응형 속도 제한, 응답 캐시가 적용된 요청 엔진을 생성합니다.
+    
+    Args:
+        pool_size (int): 호스트당 유지할 최대 연결 수
+        rate_limit (float): 전체 초당 요청 수 (0 이하이면 제한하지 않음)
+        cache (ResponseCache, optional): API 응답 캐시
+        fetch_options (dict, optional): FetchEngine 설정 (connect_timeout, read_timeout, max_retries, stats 등)
+    
+    Returns:
+        FetchEngine: 요청 엔진 (사용 후 close() 호출)
+    """
+    return FetchEngine(create_session(pool_size), RateLimiter(rate_limit), cache, **(fetch_options or {}))
+
+def _review_headers(book_code):
+    """리뷰 API 요청 헤더"""
+    return {
+        'authority': 'product.kyobobook.co.kr',
+        'accept': '*/*',
+        'accept-language': 'ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7',
+        'cache-control': 'no-cache',
+        'pragma': 'no-cache',
+        'referer': f'https://product.kyobobook.co.kr/detail/{book_code}',
+        'sec-ch-ua': '"Google Chrome";v="131", "Chromium";v="131", "Not_A Brand";v="24"',
+        'sec-ch-ua-mobile': '?0',
+        'sec-ch-ua-platform': '"macOS"',
+        'user-agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36'
+    }
+
+def fetch_review_page(fetcher, book_code, page, api_host=KYOBO_API_HOST):
+    """
+    도서 리뷰 목록의 한 페이지를 조회합니다.
+    
+    Args:
+        fetcher (FetchEngine): 요청 엔진
+        book_code (str): 교보문고 상품 코드
+        page (int): 페이지 번호
+        api_host (str): API 호스트
+    
+    Returns:
+        list: 리뷰 목록 (마지막 페이지 이후에는 빈 리스트)
+    """
+    params = {
+        'page': page,
+        'pageLimit': 100,
+        'reviewSort': REVIEW_SORT_NEWEST,
+        'revwPatrCode': '002',
+        'saleCmdtid': book_code
+    }
+    data = fetcher.get_json(f'{api_host}/api/review/list', params, _review_headers(book_code))
+    return data['data']['reviewList']
+
+def review_to_row(review):
+    """리뷰 API 항목을 CSV 행으로 변환"""
+    return {
+        '리뷰번호': review.get('revwNum', ''),
+        '회원ID': review.get('mmbrId', ''),
+        '작성일시': review.get('cretDttm', ''),
+        '리뷰내용': review.get('revwCntt', ''),
+        '감정키워드': review.get('revwEmtnKywrName', ''),
+        '평점': review.get('revwRvgr', '')
+    }
+
+# 도서 목록 CSV 컬럼
+BOOK_FIELDNAMES = [
+    '상품ID', '상품명', '상품코드', '상품그룹구분코드', '상품구분코드',
+    '상품분류코드', '출판사명', '출시일', '내용소개', '가격',
+    '상품상태코드', '배송구분코드', '전체리뷰내용', '리뷰평균평점',
+    '베스트키워드명', '상품분류명', '문화공간', '기간', '전시상품구분코드',
+    '좋아요', '장바구니', '구매', '직접구매', '상세보기',
+    '스티키', '재입고여부', '출시여부', '배송코드', '배송텍스트',
+    '배송종류', '오늘의책', '오늘의책라벨', 'MD추천', '특별주문',
+    '교보전용', '한정판매', '사은품', '이벤트', '소득공제',
+    '고정가격', '제본', '할인가격'
+]
+
+def _category_headers():
+    """카테고리 도서 목록 API 요청 헤더"""
+    return {
         'authority': 'product.kyobobook.co.kr',
         'accept': '*/*',
         'accept-language': 'ko-KR,ko;q=0.9',
@@ -28,193 +175,346 @@ def scrap_category_book_list(sale_cmdt_clst_code, output_path=None):
         'sec-fetch-site': 'same-origin',
         'user-agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36'
     }
+
+def fetch_category_page(fetcher, sale_cmdt_clst_code, page, api_host=KYOBO_API_HOST):
+    """
+    카테고리 도서 목록의 한 페이지를 조회합니다.
     
-    page = 1
-    all_data = []
+    Args:
+        fetcher (FetchEngine): 요청 엔진
+        sale_cmdt_clst_code (str): 교보문고 카테고리 코드
+        page (int): 페이지 번호
+        api_host (str): API 호스트
     
-    # 데이터 수집
-    while True:
-        params = {
-            'page': page,
-            'per': 100,
-            'saleCmdtDvsnCode': 'KOR',
-            'saleCmdtClstCode': sale_cmdt_clst_code,
-            'isEvent': False,
-            'isPackage': False,
-            'isMDPicked': False,
-            'sort': 'new'
-        }
-        
-        try:
-            response = requests.get(base_url, params=params, headers=headers)
-            data = response.json()
-            
-            # 현재 페이지 데이터 추출
-            current_data = data['data']['tabContents']
+    Returns:
+        tuple: (도서 목록, 전체 도서 수)
+    """
+    params = {
+        'page': page,
+        'per': 100,
+        'saleCmdtDvsnCode': 'KOR',
+        'saleCmdtClstCode': sale_cmdt_clst_code,
+        'isEvent': False,
+        'isPackage': False,
+        'isMDPicked': False,
+        'sort': 'new'
+    }
+    data = fetcher.get_json(f'{api_host}/api/gw/pdt/category/all', params, _category_headers())
+    return data['data']['tabContents'], data['data']['totalCount']
+
+def _book_to_row(item):
+    """카테고리 도서 목록 API 항목을 CSV 행으로 변환"""
+    product_info = item.get('productInfo', {})
+    return {
+        '상품ID': item.get('saleCmdtId', ''),
+        '상품명': item.get('cmdtName', ''),
+        '상품코드': item.get('cmdtcode', ''),
+        '상품그룹구분코드': item.get('saleCmdtGrpDvsnCode', ''),
+        '상품구분코드': item.get('saleCmdtDvsnCode', ''),
+        '상품분류코드': item.get('saleCmdtClstCode', ''),
+        '출판사명': item.get('pbcmName', ''),
+        '출시일': item.get('rlseDate', ''),
+        '내용소개': item.get('inbukCntt', ''),
+        '가격': item.get('price', ''),
+        '상품상태코드': item.get('cmdtCdtnCode', ''),
+        '배송구분코드': item.get('bkbnShpCode', ''),
+        '전체리뷰내용': item.get('whlRevwCont', ''),
+        '리뷰평균평점': item.get('revwRvgrAvg', ''),
+        '베스트키워드명': item.get('bestEmtnKywrName', ''),
+        '상품분류명': item.get('saleCmdtClstName', ''),
+        '문화공간': item.get('clturPlce', ''),
+        '기간': item.get('period', ''),
+        '전시상품구분코드': item.get('enbsCmdtDvsnCode', ''),
+        '좋아요': product_info.get('like', ''),
+        '장바구니': product_info.get('basket', ''),
+        '구매': product_info.get('buy', ''),
+        '직접구매': product_info.get('direct', ''),
+        '상세보기': product_info.get('viewDetails', ''),
+        '스티키': product_info.get('sticky', ''),
+        '재입고여부': product_info.get('reStockOnOff', ''),
+        '출시여부': product_info.get('releaseOnOff', ''),
+        '배송코드': product_info.get('shippingCode', ''),
+        '배송텍스트': product_info.get('shippingText', ''),
+        '배송종류': product_info.get('shippingKind', ''),
+        '오늘의책': product_info.get('todayBook', ''),
+        '오늘의책라벨': product_info.get('todayBookLabel', ''),
+        'MD추천': product_info.get('mdChoice', ''),
+        '특별주문': product_info.get('specialOrder', ''),
+        '교보전용': product_info.get('onlyKyobo', ''),
+        '한정판매': product_info.get('limitSale', ''),
+        '사은품': product_info.get('gifts', ''),
+        '이벤트': product_info.get('event', ''),
+        '소득공제': product_info.get('incomeDeduction', ''),
+        '고정가격': product_info.get('fixPrice', ''),
+        '제본': product_info.get('bind', ''),
+        '할인가격': product_info.get('cutPrice', '')
+    }
+
+def _save_checkpoint(checkpoint_path, checkpoint):
+    """진행 상황 체크포인트를 원자적으로 저장"""
+    temp_path = f"{checkpoint_path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(checkpoint, f, ensure_ascii=False)
+    os.replace(temp_path, checkpoint_path)
+
+def scrap_category_book_list(sale_cmdt_clst_code, output_path=None, api_host=KYOBO_API_HOST, resume=False, cache=None,
+                             rate_limit=DEFAULT_RATE_LIMIT, fetch_options=None):
+    """
+    교보문고 카테고리별 도서 목록을 스크랩하여 CSV 파일로 저장합니다.
+    
+    페이지를 받을 때마다 CSV에 바로 기록하고 체크포인트에 진행 상황을 남기므로,
+    카테고리 크기와 관계없이 메모리 사용량이 일정하고 중단된 수집을 이어서 진행할 수 있습니다.
+    
+    Args:
+        sale_cmdt_clst_code (str): 교보문고 카테고리 코드
+        output_path (str, optional): 출력 파일 경로. 지정하지 않으면 현재 디렉토리에 생성됩니다.
+        api_host (str, optional): API 호스트. 로컬 테스트 서버 주소를 지정할 수 있습니다.
+        resume (bool, optional): 체크포인트가 있으면 마지막으로 완료한 페이지 다음부터 이어서 수집합니다.
+        cache (ResponseCache, optional): API 응답 캐시. 재생 모드이면 네트워크 없이 캐시된 페이지만 사용합니다.
+        rate_limit (float, optional): 초당 요청 수 (0 이하이면 제한하지 않음)
+        fetch_options (dict, optional): 요청 엔진 설정 (타임아웃, 재시도 횟수, 실행 지표)
+    
+    Returns:
+        str: 처리 결과 메시지
+    """
+    if output_path:
+        os.makedirs(output_path, exist_ok=True)
+    checkpoint_path = os.path.join(output_path or '.', f"카테고리{sale_cmdt_clst_code}_도서목록.checkpoint.json")
+    
+    checkpoint = None
+    if resume and os.path.exists(checkpoint_path):
+        with open(checkpoint_path, encoding='utf-8') as f:
+            checkpoint = json.load(f)
+    
+    if checkpoint:
+        filepath = checkpoint['filepath']
+        page = checkpoint['page'] + 1
+        written = checkpoint['written']
+        print(f"체크포인트에서 이어서 수집합니다: {page}페이지부터 ('{filepath}')")
+    else:
+        # 파일명 생성
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = f"카테고리{sale_cmdt_clst_code}_도서목록_{timestamp}.csv"
+        filepath = os.path.join(output_path, filename) if output_path else filename
+        page = 1
+        written = 0
+    
+    fetcher = create_fetcher(1, rate_limit, cache, fetch_options)
+    csvfile = None
+    interrupted = False
+    
+    # 데이터 수집 및 페이지 단위 기록
+    try:
+        while True:
+            current_data, total_count = fetch_category_page(fetcher, sale_cmdt_clst_code, page, api_host)
             
             # 데이터가 없으면 종료
-            if not current_data or len(current_data) == 0:
+            if not current_data:
                 break
-                
-            # 데이터 누적
-            all_data.extend(current_data)
+            
+            if csvfile is None:
+                if checkpoint:
+                    # 체크포인트 이후 기록된 불완전한 행 제거
+                    csvfile = open(filepath, 'r+', newline='', encoding='utf-8-sig')
+                    csvfile.seek(checkpoint['offset'])
+                    csvfile.truncate()
+                    writer = csv.DictWriter(csvfile, fieldnames=BOOK_FIELDNAMES)
+                else:
+                    csvfile = open(filepath, 'w', newline='', encoding='utf-8-sig')
+                    writer = csv.DictWriter(csvfile, fieldnames=BOOK_FIELDNAMES)
+                    writer.writeheader()
+            
+            writer.writerows(_book_to_row(item) for item in current_data)
+            csvfile.flush()
+            written += len(current_data)
+            
+            _save_checkpoint(checkpoint_path, {
+                'filepath': filepath,
+                'page': page,
+                'written': written,
+                'offset': csvfile.tell()
+            })
             
             # 전체 데이터 수 도달 시 종료
-            if len(all_data) >= data['data']['totalCount']:
+            if written >= total_count:
                 break
-                
-            page += 1
             
-        except Exception as e:
-            print(f'오류 발생: {str(e)}')
-            break
+            page += 1
     
-    # 데이터가 있는 경우 CSV 파일로 출력
-    if all_data:
-        # 파일명 생성
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"카테고리{sale_cmdt_clst_code}_도서목록_{timestamp}.csv"
-        
-        if output_path:
-            if not os.path.exists(output_path):
-                os.makedirs(output_path)
-            filepath = os.path.join(output_path, filename)
-        else:
-            filepath = filename
-        
-        # CSV 파일로 저장
-        with open(filepath, 'w', newline='', encoding='utf-8-sig') as csvfile:
-            # 컬럼 정의
-            fieldnames = [
-                '상품ID', '상품명', '상품코드', '상품그룹구분코드', '상품구분코드',
-                '상품분류코드', '출판사명', '출시일', '내용소개', '가격',
-                '상품상태코드', '배송구분코드', '전체리뷰내용', '리뷰평균평점',
-                '베스트키워드명', '상품분류명', '문화공간', '기간', '전시상품구분코드',
-                '좋아요', '장바구니', '구매', '직접구매', '상세보기',
-                '스티키', '재입고여부', '출시여부', '배송코드', '배송텍스트',
-                '배송종류', '오늘의책', '오늘의책라벨', 'MD추천', '특별주문',
-                '교보전용', '한정판매', '사은품', '이벤트', '소득공제',
-                '고정가격', '제본', '할인가격'
-            ]
-            
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            
-            # 데이터 가공 및 저장
-            for item in all_data:
-                product_info = item.get('productInfo', {})
-                row = {
-                    '상품ID': item.get('saleCmdtId', ''),
-                    '상품명': item.get('cmdtName', ''),
-                    '상품코드': item.get('cmdtcode', ''),
-                    '상품그룹구분코드': item.get('saleCmdtGrpDvsnCode', ''),
-                    '상품구분코드': item.get('saleCmdtDvsnCode', ''),
-                    '상품분류코드': item.get('saleCmdtClstCode', ''),
-                    '출판사명': item.get('pbcmName', ''),
-                    '출시일': item.get('rlseDate', ''),
-                    '내용소개': item.get('inbukCntt', ''),
-                    '가격': item.get('price', ''),
-                    '상품상태코드': item.get('cmdtCdtnCode', ''),
-                    '배송구분코드': item.get('bkbnShpCode', ''),
-                    '전체리뷰내용': item.get('whlRevwCont', ''),
-                    '리뷰평균평점': item.get('revwRvgrAvg', ''),
-                    '베스트키워드명': item.get('bestEmtnKywrName', ''),
-                    '상품분류명': item.get('saleCmdtClstName', ''),
-                    '문화공간': item.get('clturPlce', ''),
-                    '기간': item.get('period', ''),
-                    '전시상품구분코드': item.get('enbsCmdtDvsnCode', ''),
-                    '좋아요': product_info.get('like', ''),
-                    '장바구니': product_info.get('basket', ''),
-                    '구매': product_info.get('buy', ''),
-                    '직접구매': product_info.get('direct', ''),
-                    '상세보기': product_info.get('viewDetails', ''),
-                    '스티키': product_info.get('sticky', ''),
-                    '재입고여부': product_info.get('reStockOnOff', ''),
-                    '출시여부': product_info.get('releaseOnOff', ''),
-                    '배송코드': product_info.get('shippingCode', ''),
-                    '배송텍스트': product_info.get('shippingText', ''),
-                    '배송종류': product_info.get('shippingKind', ''),
-                    '오늘의책': product_info.get('todayBook', ''),
-                    '오늘의책라벨': product_info.get('todayBookLabel', ''),
-                    'MD추천': product_info.get('mdChoice', ''),
-                    '특별주문': product_info.get('specialOrder', ''),
-                    '교보전용': product_info.get('onlyKyobo', ''),
-                    '한정판매': product_info.get('limitSale', ''),
-                    '사은품': product_info.get('gifts', ''),
-                    '이벤트': product_info.get('event', ''),
-                    '소득공제': product_info.get('incomeDeduction', ''),
-                    '고정가격': product_info.get('fixPrice', ''),
-                    '제본': product_info.get('bind', ''),
-                    '할인가격': product_info.get('cutPrice', '')
-                }
-                writer.writerow(row)
-        
-        return f"총 {len(all_data)}개의 도서 정보가 '{filepath}' 파일에 저장되었습니다."
+    except Exception as e:
+        print(f'오류 발생: {str(e)}')
+        interrupted = True
+    finally:
+        if csvfile is not None:
+            csvfile.close()
+        fetcher.close()
+    
+    if interrupted and written:
+        return (f"{page}페이지에서 수집이 중단되었습니다. 지금까지 {written}개의 도서 정보가 '{filepath}' 파일에 저장되었으며, "
+                f"--resume 옵션으로 이어서 수집할 수 있습니다.")
+    
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    
+    if written:
+        return f"총 {written}개의 도서 정보가 '{filepath}' 파일에 저장되었습니다."
     else:
         return "데이터 수집에 실패했습니다."
 
-def scrap_review(book_code, output_path=None):
+def _import_pyarrow():
+    """pyarrow를 지연 로드 (Parquet 저장 시에만 필요)"""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Parquet 저장에는 pyarrow가 필요합니다: pip install pyarrow")
+    return pa, pq
+
+def review_parquet_schema(extra_fields=()):
+    """
+    리뷰 Parquet 파일의 고정 스키마를 반환합니다.
+    
+    Args:
+        extra_fields (tuple): 리뷰 컬럼 앞에 붙일 문자열 컬럼 (예: 일괄 수집의 '도서코드')
+    
+    Returns:
+        pyarrow.Schema: 정수 리뷰번호, timestamp 작성일시, float32 평점(소수 평점 보존), 사전 인코딩된 감정키워드 스키마
+    """
+    pa, _ = _import_pyarrow()
+    return pa.schema(
+        [(field, pa.dictionary(pa.int32(), pa.string())) for field in extra_fields] + [
+            ('리뷰번호', pa.int64()),
+            ('회원ID', pa.string()),
+            ('작성일시', pa.timestamp('s')),
+            ('리뷰내용', pa.string()),
+            ('감정키워드', pa.dictionary(pa.int32(), pa.string())),
+            ('평점', pa.float32())
+        ]
+    )
+
+def _to_int(value):
+    """정수 컬럼 값 변환 (빈 값은 None, 소수 부분이 있으면 잘라내지 않고 ValueError)"""
+    if value is None or value == '':
+        return None
+    if isinstance(value, str):
+        try:
+            return int(value)
+        except ValueError:
+            value = float(value)
+    if isinstance(value, float) and not value.is_integer():
+        raise ValueError(f"정수가 아닌 값입니다: {value}")
+    return int(value)
+
+def _to_float(value):
+    """실수 컬럼 값 변환 (빈 값은 None)"""
+    if value is None or value == '':
+        return None
+    return float(value)
+
+def _to_datetime(value):
+    """작성일시 문자열을 datetime으로 변환 (형식이 다르면 ISO 형식으로 재시도, 실패 시 None)"""
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, REVIEW_DATETIME_FORMAT)
+    except ValueError:
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            return None
+
+class _CsvReviewWriter:
+    """리뷰 행을 utf-8-sig CSV로 기록"""
+    
+    def __init__(self, filepath, extra_fields=()):
+        self.file = open(filepath, 'w', newline='', encoding='utf-8-sig')
+        self.writer = csv.DictWriter(self.file, fieldnames=list(extra_fields) + REVIEW_FIELDNAMES)
+        self.writer.writeheader()
+    
+    def write_rows(self, rows):
+        self.writer.writerows(rows)
+        self.file.flush()
+    
+    def close(self):
+        self.file.close()
+
+class _ParquetReviewWriter:
+    """리뷰 행을 고정 스키마 Parquet으로 기록 (write_rows 호출마다 row group 하나)"""
+    
+    def __init__(self, filepath, extra_fields=()):
+        self.pa, pq = _import_pyarrow()
+        self.schema = review_parquet_schema(extra_fields)
+        self.writer = pq.ParquetWriter(filepath, self.schema)
+    
+    def write_rows(self, rows):
+        rows = list(rows)
+        if not rows:
+            return
+        columns = {field: [row.get(field) for row in rows] for field in self.schema.names}
+        columns['리뷰번호'] = [_to_int(row.get('리뷰번호')) for row in rows]
+        columns['작성일시'] = [_to_datetime(row.get('작성일시')) for row in rows]
+        columns['평점'] = [_to_float(row.get('평점')) for row in rows]
+        self.writer.write_table(self.pa.Table.from_pydict(columns, schema=self.schema))
+    
+    def close(self):
+        self.writer.close()
+
+def open_review_writer(filepath, output_format='csv', extra_fields=()):
+    """
+    저장 형식에 맞는 리뷰 기록기를 엽니다.
+    
+    Args:
+        filepath (str): 출력 파일 경로
+        output_format (str): 'csv' 또는 'parquet'
+        extra_fields (tuple): 리뷰 컬럼 앞에 붙일 컬럼
+    
+    Returns:
+        write_rows(rows), close()를 제공하는 기록기
+    """
+    if output_format == 'parquet':
+        return _ParquetReviewWriter(filepath, extra_fields)
+    return _CsvReviewWriter(filepath, extra_fields)
+
+def scrap_review(book_code, output_path=None, concurrency=DEFAULT_CONCURRENCY, api_host=KYOBO_API_HOST, output_format='csv',
+                 cache=None, rate_limit=DEFAULT_RATE_LIMIT, fetch_options=None):
     """
     교보문고 도서 리뷰를 스크랩하여 CSV 파일로 저장합니다.
     
     Args:
         book_code (str): 교보문고 상품 코드
         output_path (str, optional): 출력 파일 경로. 지정하지 않으면 현재 디렉토리에 생성됩니다.
+        concurrency (int, optional): 동시에 요청할 최대 페이지 수. 기본값은 1(순차 요청)입니다.
+        api_host (str, optional): API 호스트. 로컬 테스트 서버 주소를 지정할 수 있습니다.
+        output_format (str, optional): 저장 형식 ('csv' 또는 'parquet')
+        cache (ResponseCache, optional): API 응답 캐시. 재생 모드이면 네트워크 없이 캐시된 페이지만 사용합니다.
+        rate_limit (float, optional): 초당 요청 수 (0 이하이면 제한하지 않음)
+        fetch_options (dict, optional): 요청 엔진 설정 (타임아웃, 재시도 횟수, 실행 지표)
     
     Returns:
         str: 처리 결과 메시지
     """
-    base_url = 'https://product.kyobobook.co.kr/api/review/list'
-    headers = {
-        'authority': 'product.kyobobook.co.kr',
-        'accept': '*/*',
-        'accept-language': 'ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7',
-        'cache-control': 'no-cache',
-        'pragma': 'no-cache',
-        'referer': f'https://product.kyobobook.co.kr/detail/{book_code}',
-        'sec-ch-ua': '"Google Chrome";v="131", "Chromium";v="131", "Not_A Brand";v="24"',
-        'sec-ch-ua-mobile': '?0',
-        'sec-ch-ua-platform': '"macOS"',
-        'user-agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36'
-    }
-    
-    page = 1
+    fetcher = create_fetcher(concurrency, rate_limit, cache, fetch_options)
     all_data = []
     
-    # 데이터 수집
-    while True:
-        params = {
-            'page': page,
-            'pageLimit': 100,
-            'reviewSort': '001',
-            'revwPatrCode': '002',
-            'saleCmdtid': book_code
-        }
-        
-        try:
-            response = requests.get(base_url, params=params, headers=headers)
-            data = response.json()
-            
-            # 리뷰 목록 추출
-            reviews = data['data']['reviewList']
-            
-            # 데이터가 없으면 종료
-            if not reviews or len(reviews) == 0:
-                break
-                
-            # 데이터 누적
+    # 데이터 수집 (페이지 순서대로 누적)
+    try:
+        pages = fetch_pages_in_order(
+            lambda page: fetch_review_page(fetcher, book_code, page, api_host),
+            concurrency
+        )
+        for reviews in pages:
             all_data.extend(reviews)
-            page += 1
-            
-        except Exception as e:
-            print(f'오류 발생: {str(e)}')
-            break
+    except Exception as e:
+        # 중간 페이지 이후가 빠진 리뷰를 완전한 수집 결과처럼 저장하지 않음
+        return f"오류 발생: {str(e)} (수집한 리뷰 {len(all_data)}개는 저장하지 않았습니다.)"
+    finally:
+        fetcher.close()
     
     # 데이터가 있는 경우 CSV 파일로 출력
     if all_data:
         # 파일명 생성
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"교보_{book_code}_리뷰_{timestamp}.csv"
+        filename = f"교보_{book_code}_리뷰_{timestamp}.{output_format}"
         
         if output_path:
             if not os.path.exists(output_path):
@@ -223,27 +523,270 @@ def scrap_review(book_code, output_path=None):
         else:
             filepath = filename
         
-        # CSV 파일로 저장
-        with open(filepath, 'w', newline='', encoding='utf-8-sig') as csvfile:
-            fieldnames = ['리뷰번호', '회원ID', '작성일시', '리뷰내용', '감정키워드', '평점']
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            
-            for review in all_data:
-                row = {
-                    '리뷰번호': review.get('revwNum', ''),
-                    '회원ID': review.get('mmbrId', ''),
-                    '작성일시': review.get('cretDttm', ''),
-                    '리뷰내용': review.get('revwCntt', ''),
-                    '감정키워드': review.get('revwEmtnKywrName', ''),
-                    '평점': review.get('revwRvgr', '')
-                }
-                writer.writerow(row)
+        # CSV 또는 Parquet 파일로 저장
+        writer = open_review_writer(filepath, output_format)
+        try:
+            writer.write_rows(review_to_row(review) for review in all_data)
+        finally:
+            writer.close()
         
         return f"총 {len(all_data)}개의 리뷰가 '{filepath}' 파일에 저장되었습니다."
     else:
         return "수집된 리뷰가 없습니다."
 
+def find_latest_review_csv(book_code, output_path=None):
+    """
+    도서 코드에 해당하는 가장 최근 리뷰 CSV 파일을 찾습니다.
+    
+    Args:
+        book_code (str): 교보문고 상품 코드
+        output_path (str, optional): 검색할 디렉토리. 지정하지 않으면 현재 디렉토리에서 찾습니다.
+    
+    Returns:
+        str: 가장 최근에 수정된 CSV 파일 경로 (없으면 None)
+    """
+    pattern = os.path.join(output_path or '.', f"교보_{book_code}_리뷰*.csv")
+    candidates = glob.glob(pattern)
+    if not candidates:
+        return None
+    return max(candidates, key=os.path.getmtime)
+
+def scrap_review_incremental(book_code, output_path=None, concurrency=DEFAULT_CONCURRENCY, api_host=KYOBO_API_HOST,
+                             cache=None, rate_limit=DEFAULT_RATE_LIMIT, fetch_options=None):
+    """
+    마지막으로 수집한 리뷰 이후의 신규 리뷰만 스크랩하여 도서별 누적 CSV 파일에 병합합니다.
+    
+    가장 최근 리뷰 CSV의 리뷰번호(revwNum)와 작성일시(cretDttm)를 기준점으로 삼고,
+    최신순으로 정렬된 페이지에서 이미 수집한 리뷰를 만나면 페이지 요청을 중단합니다.
+    
+    Args:
+        book_code (str): 교보문고 상품 코드
+        output_path (str, optional): 출력 파일 경로. 지정하지 않으면 현재 디렉토리에 생성됩니다.
+        concurrency (int, optional): 동시에 요청할 최대 페이지 수. 기본값은 1(순차 요청)입니다.
+        api_host (str, optional): API 호스트. 로컬 테스트 서버 주소를 지정할 수 있습니다.
+        cache (ResponseCache, optional): API 응답 캐시. 신규 리뷰를 확인해야 하므로 캐시된 페이지는 읽지 않고
+            새로 받은 페이지만 저장합니다. (재생 모드에서는 캐시된 페이지만 사용)
+        rate_limit (float, optional): 초당 요청 수 (0 이하이면 제한하지 않음)
+        fetch_options (dict, optional): 요청 엔진 설정 (타임아웃, 재시도 횟수, 실행 지표)
+    
+    Returns:
+        str: 처리 결과 메시지
+    """
+    # 유효 기간 안의 첫 페이지를 캐시에서 읽으면 이전 실행과 같은 리뷰만 보여 신규 리뷰를 찾지 못함
+    if cache is not None:
+        cache = cache.refreshing()
+    
+    # 기존 리뷰 로드 및 기준점 설정
+    existing_rows = []
+    latest_csv = find_latest_review_csv(book_code, output_path)
+    if latest_csv:
+        with open(latest_csv, newline='', encoding='utf-8-sig') as csvfile:
+            existing_rows = list(csv.DictReader(csvfile))
+    
+    known_ids = {str(row['리뷰번호']) for row in existing_rows}
+    latest_dttm = max((row['작성일시'] for row in existing_rows if row['작성일시']), default='')
+    
+    fetcher = create_fetcher(concurrency, rate_limit, cache, fetch_options)
+    new_rows = []
+    
+    # 신규 리뷰 수집 (이미 수집한 리뷰가 나오는 페이지에서 중단)
+    try:
+        pages = fetch_pages_in_order(
+            lambda page: fetch_review_page(fetcher, book_code, page, api_host),
+            concurrency
+        )
+        for reviews in pages:
+            reached_known = False
+            for review in reviews:
+                review_id = str(review.get('revwNum', ''))
+                created = review.get('cretDttm', '') or ''
+                if review_id in known_ids or (latest_dttm and created and created < latest_dttm):
+                    reached_known = True
+                    continue
+                known_ids.add(review_id)
+                new_rows.append(review_to_row(review))
+            if reached_known:
+                break
+    except Exception as e:
+        # 중간 페이지가 빠진 채로 병합하면 다음 실행에서 누락분을 다시 수집할 수 없으므로 병합하지 않음
+        return f"오류 발생: {str(e)} (기존 파일은 변경되지 않았습니다.)"
+    finally:
+        fetcher.close()
+    
+    # 도서별 누적 파일 경로
+    filename = f"교보_{book_code}_리뷰_전체.csv"
+    if output_path:
+        os.makedirs(output_path, exist_ok=True)
+        filepath = os.path.join(output_path, filename)
+    else:
+        filepath = filename
+    
+    if not new_rows and latest_csv and os.path.abspath(latest_csv) == os.path.abspath(filepath):
+        return f"새로 추가된 리뷰가 없습니다. ('{filepath}')"
+    
+    # 신규 리뷰(최신순) + 기존 리뷰를 리뷰번호 기준으로 중복 없이 병합
+    merged_rows = []
+    seen_ids = set()
+    for row in new_rows + existing_rows:
+        review_id = str(row['리뷰번호'])
+        if review_id in seen_ids:
+            continue
+        seen_ids.add(review_id)
+        merged_rows.append({field: row.get(field, '') for field in REVIEW_FIELDNAMES})
+    
+    if not merged_rows:
+        return "수집된 리뷰가 없습니다."
+    
+    # 임시 파일에 쓴 뒤 교체하여 중단 시에도 기존 파일이 손상되지 않도록 함
+    temp_path = f"{filepath}.tmp"
+    with open(temp_path, 'w', newline='', encoding='utf-8-sig') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=REVIEW_FIELDNAMES)
+        writer.writeheader()
+        writer.writerows(merged_rows)
+    os.replace(temp_path, filepath)
+    
+    return f"신규 리뷰 {len(new_rows)}개를 추가하여 총 {len(merged_rows)}개의 리뷰가 '{filepath}' 파일에 저장되었습니다."
+
+def iter_category_book_codes(fetcher, sale_cmdt_clst_code, api_host=KYOBO_API_HOST):
+    """
+    카테고리에 속한 도서의 상품 코드(saleCmdtId)를 페이지 순서대로 반환합니다.
+    
+    Args:
+        fetcher (FetchEngine): 요청 엔진
+        sale_cmdt_clst_code (str): 교보문고 카테고리 코드
+        api_host (str, optional): API 호스트
+    
+    Yields:
+        str: 도서 상품 코드
+    """
+    page = 1
+    listed = 0
+    while True:
+        books, total_count = fetch_category_page(fetcher, sale_cmdt_clst_code, page, api_host)
+        if not books:
+            break
+        
+        for book in books:
+            if book.get('saleCmdtId'):
+                yield book['saleCmdtId']
+        
+        listed += len(books)
+        if listed >= total_count:
+            break
+        page += 1
+
+def read_book_codes(codes_file):
+    """
+    도서 코드 목록 파일을 읽습니다. (한 줄에 하나, 빈 줄과 #으로 시작하는 줄은 무시)
+    
+    Args:
+        codes_file (str): 도서 코드 목록 파일 경로
+    
+    Returns:
+        list: 중복을 제거한 도서 코드 목록
+    """
+    codes = []
+    with open(codes_file, encoding='utf-8-sig') as f:
+        for line in f:
+            code = line.strip()
+            if code and not code.startswith('#') and code not in codes:
+                codes.append(code)
+    return codes
+
+def _collect_book_reviews(fetcher, book_code, api_host):
+    """한 도서의 리뷰를 모든 페이지에서 수집 (일괄 수집 작업 단위)"""
+    rows = []
+    page = 1
+    while True:
+        reviews = fetch_review_page(fetcher, book_code, page, api_host)
+        if not reviews:
+            break
+        rows.extend(review_to_row(review) for review in reviews)
+        page += 1
+    return rows
+
+def scrap_reviews_bulk(sale_cmdt_clst_code=None, codes_file=None, output_path=None,
+                       workers=DEFAULT_BULK_WORKERS, rate_limit=DEFAULT_RATE_LIMIT, api_host=KYOBO_API_HOST,
+                       output_format='csv', cache=None, fetch_options=None):
+    """
+    카테고리 전체 또는 도서 코드 목록 파일의 모든 도서 리뷰를 수집하여 하나의 CSV 파일로 저장합니다.
+    
+    도서들은 공유 작업자 풀에서 동시에 처리되며, 모든 요청은 하나의 요청 엔진(적응형 속도 제한기)을 거칩니다.
+    
+    Args:
+        sale_cmdt_clst_code (str, optional): 교보문고 카테고리 코드
+        codes_file (str, optional): 도서 코드 목록 파일 경로 (카테고리 코드 대신 사용)
+        output_path (str, optional): 출력 파일 경로. 지정하지 않으면 현재 디렉토리에 생성됩니다.
+        workers (int, optional): 동시에 처리할 도서 수
+        rate_limit (float, optional): 전체 초당 요청 수 (0 이하이면 제한하지 않음, 429/5xx 응답 시 자동으로 낮춤)
+        api_host (str, optional): API 호스트. 로컬 테스트 서버 주소를 지정할 수 있습니다.
+        output_format (str, optional): 저장 형식 ('csv' 또는 'parquet')
+        cache (ResponseCache, optional): API 응답 캐시. 캐시된 페이지는 속도 제한을 받지 않습니다.
+        fetch_options (dict, optional): 요청 엔진 설정 (타임아웃, 재시도 횟수, 실행 지표)
+    
+    Returns:
+        str: 처리 결과 메시지
+    """
+    fetcher = create_fetcher(workers, rate_limit, cache, fetch_options)
+    
+    # 대상 도서 목록
+    try:
+        if codes_file:
+            book_codes = read_book_codes(codes_file)
+            source_name = os.path.splitext(os.path.basename(codes_file))[0]
+        else:
+            book_codes = list(dict.fromkeys(iter_category_book_codes(fetcher, sale_cmdt_clst_code, api_host)))
+            source_name = f"카테고리{sale_cmdt_clst_code}"
+    except Exception as e:
+        fetcher.close()
+        return f"도서 목록 조회 실패: {str(e)}"
+    
+    if not book_codes:
+        fetcher.close()
+        return "수집할 도서가 없습니다."
+    
+    # 파일명 생성
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = f"{source_name}_리뷰_{timestamp}.{output_format}"
+    if output_path:
+        os.makedirs(output_path, exist_ok=True)
+        filepath = os.path.join(output_path, filename)
+    else:
+        filepath = filename
+    
+    started = time.monotonic()
+    total_reviews = 0
+    failed = []
+    
+    # 도서별 리뷰 수집 및 완료되는 순서대로 기록
+    writer = open_review_writer(filepath, output_format, extra_fields=('도서코드',))
+    try:
+        with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+            futures = {
+                executor.submit(_collect_book_reviews, fetcher, book_code, api_host): book_code
+                for book_code in book_codes
+            }
+            for done, future in enumerate(as_completed(futures), start=1):
+                book_code = futures[future]
+                try:
+                    rows = future.result()
+                except Exception as e:
+                    failed.append(book_code)
+                    print(f"[{done}/{len(book_codes)}] {book_code}: 오류 발생 - {str(e)}")
+                    continue
+                
+                writer.write_rows({'도서코드': book_code, **row} for row in rows)
+                total_reviews += len(rows)
+                print(f"[{done}/{len(book_codes)}] {book_code}: 리뷰 {len(rows)}개 (누적 {total_reviews}개, {time.monotonic() - started:.1f}초)")
+    finally:
+        writer.close()
+        fetcher.close()
+    
+    message = f"도서 {len(book_codes) - len(failed)}권의 리뷰 총 {total_reviews}개가 '{filepath}' 파일에 저장되었습니다."
+    if failed:
+        message += f" (실패 {len(failed)}권: {', '.join(failed)})"
+    return message
+
 def save_reviews(reviews, book_code):
     """리뷰 데이터를 CSV 파일로 저장"""
     if not reviews:
@@ -262,6 +805,132 @@ def save_reviews(reviews, book_code):
     df.to_csv(filename, index=False, encoding='utf-8')
     print(f"\n총 {len(reviews)}개의 리뷰가 '{filename}' 파일에 저장되었습니다.")
 
+def parse_arguments():
+    """명령행 인자 파싱"""
+    parser = argparse.ArgumentParser(description='교보문고 도서 목록/리뷰 스크랩')
+    parser.add_argument(
+        '--api-host',
+        default=KYOBO_API_HOST,
+        help=f'API 호스트 (기본값: {KYOBO_API_HOST})'
+    )
+    parser.add_argument(
+        '--cache',
+        action='store_true',
+        help='API 응답을 디스크에 gzip으로 캐시 (유효 기간 안의 페이지는 다시 요청하지 않음)'
+    )
+    parser.add_argument(
+        '--replay',
+        action='store_true',
+        help='네트워크 요청 없이 캐시된 응답만으로 파일 생성 (캐시에 없는 페이지는 오류)'
+    )
+    parser.add_argument(
+        '--cache-dir',
+        default=DEFAULT_RESPONSE_CACHE_DIR,
+        help=f'응답 캐시 디렉토리 (기본값: {DEFAULT_RESPONSE_CACHE_DIR})'
+    )
+    parser.add_argument(
+        '--cache-ttl',
+        type=float,
+        default=DEFAULT_TTL_HOURS,
+        help=f'응답 캐시 유효 기간(시간), 0이면 만료 없음 (기본값: {DEFAULT_TTL_HOURS})'
+    )
+    parser.add_argument(
+        '--cache-max-mb',
+        type=float,
+        default=DEFAULT_MAX_MB,
+        help=f'응답 캐시 최대 크기(MB), 초과 시 오래된 응답부터 삭제 (기본값: {DEFAULT_MAX_MB})'
+    )
+    parser.add_argument(
+        '--connect-timeout',
+        type=float,
+        default=DEFAULT_CONNECT_TIMEOUT,
+        help=f'연결 타임아웃(초) (기본값: {DEFAULT_CONNECT_TIMEOUT})'
+    )
+    parser.add_argument(
+        '--read-timeout',
+        type=float,
+        default=DEFAULT_READ_TIMEOUT,
+        help=f'응답 대기 타임아웃(초) (기본값: {DEFAULT_READ_TIMEOUT})'
+    )
+    parser.add_argument(
+        '--retries',
+        type=int,
+        default=DEFAULT_MAX_RETRIES,
+        help=f'요청 1건당 최대 재시도 횟수, 타임아웃/429/5xx 시 지수 백오프로 재시도 (기본값: {DEFAULT_MAX_RETRIES})'
+    )
+    parser.add_argument(
+        '--fetch-metrics-out',
+        help='요청 수, 재시도 수, 받은 바이트, 지연 시간 분위수 등 요청 지표를 저장할 JSON 파일 경로'
+    )
+    subparsers = parser.add_subparsers(dest='command', metavar='[book|review|bulk]', required=True)
+    
+    book_parser = subparsers.add_parser('book', help='카테고리별 도서 목록 스크랩')
+    book_parser.add_argument('code', help='카테고리 코드 (예: 118)')
+    book_parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='중단된 수집을 체크포인트의 마지막 완료 페이지 다음부터 이어서 진행'
+    )
+    book_parser.add_argument(
+        '--rate',
+        type=float,
+        default=DEFAULT_RATE_LIMIT,
+        help=f'초당 요청 수 제한, 0이면 제한 없음 (429/5xx 응답 시 자동으로 낮춤, 기본값: {DEFAULT_RATE_LIMIT})'
+    )
+    
+    review_parser = subparsers.add_parser('review', help='도서 리뷰 스크랩')
+    review_parser.add_argument('code', help='도서 코드 (예: S000061818273)')
+    review_parser.add_argument(
+        '--concurrency',
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help=f'동시에 요청할 최대 페이지 수 (기본값: {DEFAULT_CONCURRENCY})'
+    )
+    review_parser.add_argument(
+        '--rate',
+        type=float,
+        default=DEFAULT_RATE_LIMIT,
+        help=f'초당 요청 수 제한, 0이면 제한 없음 (429/5xx 응답 시 자동으로 낮춤, 기본값: {DEFAULT_RATE_LIMIT})'
+    )
+    review_parser.add_argument(
+        '--format',
+        choices=OUTPUT_FORMATS,
+        default='csv',
+        help='저장 형식 (기본값: csv, parquet은 pyarrow 필요)'
+    )
+    review_parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='가장 최근 리뷰 CSV 이후의 신규 리뷰만 수집하여 교보_<도서코드>_리뷰_전체.csv에 병합'
+    )
+    
+    bulk_parser = subparsers.add_parser('bulk', help='카테고리 또는 도서 코드 목록의 리뷰 일괄 수집')
+    bulk_parser.add_argument('code', nargs='?', help='카테고리 코드 (예: 118)')
+    bulk_parser.add_argument('--codes-file', help='도서 코드 목록 파일 (한 줄에 하나, 카테고리 코드 대신 사용)')
+    bulk_parser.add_argument(
+        '--workers',
+        type=int,
+        default=DEFAULT_BULK_WORKERS,
+        help=f'동시에 처리할 도서 수 (기본값: {DEFAULT_BULK_WORKERS})'
+    )
+    bulk_parser.add_argument(
+        '--rate',
+        type=float,
+        default=DEFAULT_RATE_LIMIT,
+        help=f'전체 초당 요청 수 제한, 0이면 제한 없음 (429/5xx 응답 시 자동으로 낮춤, 기본값: {DEFAULT_RATE_LIMIT})'
+    )
+    bulk_parser.add_argument(
+        '--format',
+        choices=OUTPUT_FORMATS,
+        default='csv',
+        help='저장 형식 (기본값: csv, parquet은 pyarrow 필요)'
+    )
+    
+    args = parser.parse_args()
+    if args.command == 'bulk' and not (args.code or args.codes_file):
+        bulk_parser.error('카테고리 코드 또는 --codes-file 중 하나를 지정하세요.')
+    return args
+
 if __name__ == "__main__":
     # 사용 예시
     # 인문 카테고리(118) 도서 목록 스크랩
@@ -271,21 +940,37 @@ if __name__ == "__main__":
     # print(scrap_review("S000061818273"))
     
     # 명령줄에서 실행 시
-    import sys
-    if len(sys.argv) > 1:
-        if sys.argv[1] == "book":
-            if len(sys.argv) > 2:
-                result = scrap_category_book_list(sys.argv[2])
-                print(result)
-            else:
-                print("카테고리 코드를 입력하세요. 예: python script.py book 118")
-        elif sys.argv[1] == "review":
-            if len(sys.argv) > 2:
-                result = scrap_review(sys.argv[2])
-                print(result)
-            else:
-                print("도서 코드를 입력하세요. 예: python script.py review S000061818273")
-        else:
-            print("사용법: python script.py [book|review] [코드]")
-    else:
-        print("사용법: python script.py [book|review] [코드]")
\ No newline at end of file
+    args = parse_arguments()
+    cache = None
+    if args.cache or args.replay:
+        cache = ResponseCache(args.cache_dir, args.cache_ttl, args.cache_max_mb, replay=args.replay)
+    
+    stats = FetchStats()
+    fetch_options = {
+        'stats': stats,
+        'connect_timeout': args.connect_timeout,
+        'read_timeout': args.read_timeout,
+        'max_retries': args.retries
+    }
+    
+    if args.command == "book":
+        print(scrap_category_book_list(args.code, api_host=args.api_host, resume=args.resume, cache=cache,
+                                       rate_limit=args.rate, fetch_options=fetch_options))
+    elif args.command == "review" and args.incremental and args.format != 'csv':
+        print("증분 수집(--incremental)은 CSV 형식만 지원합니다.")
+    elif args.command == "review" and args.incremental:
+        print(scrap_review_incremental(args.code, concurrency=args.concurrency, api_host=args.api_host, cache=cache,
+                                       rate_limit=args.rate, fetch_options=fetch_options))
+    elif args.command == "review":
+        print(scrap_review(args.code, concurrency=args.concurrency, api_host=args.api_host,
+                           output_format=args.format, cache=cache, rate_limit=args.rate, fetch_options=fetch_options))
+    elif args.command == "bulk":
+        print(scrap_reviews_bulk(args.code, args.codes_file, workers=args.workers,
+                                 rate_limit=args.rate, api_host=args.api_host, output_format=args.format,
+                                 cache=cache, fetch_options=fetch_options))
+    
+    print(stats.summary())
+    if args.fetch_metrics_out:
+        stats.write_json(args.fetch_metrics_out)
+    if cache is not None:
+        print(cache.summary())
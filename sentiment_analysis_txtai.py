@@ -1,17 +1,82 @@
 # pip install pandas matplotlib wordcloud txtai
 
+# txtai(torch), pandas, wordcloud, matplotlib은 가져오는 데 수 초가 걸리므로
+# 실제로 사용하는 단계의 함수 안에서 import함 (--help, --check는 이 모듈들을 읽지 않음)
 import os
-import pandas as pd
-from wordcloud import WordCloud
-import matplotlib.pyplot as plt
-from collections import Counter
+import re
+import sys
+import csv
+import unicodedata
 from datetime import datetime
-from txtai.embeddings import Embeddings
 import numpy as np
 import argparse
+import hashlib
+import importlib.util
+import json
+import threading
+import time
+from embedding_cache import EmbeddingCache, cache_key, clear_cache, DEFAULT_CACHE_DIR, DEFAULT_MAX_ENTRIES
+from run_metrics import RunMetrics, STAGES, timed
+from knn_classifier import DEFAULT_KNN_INDEX_DIR, DEFAULT_K
+from vector_store import DEFAULT_VECTOR_STORE_DIR, QUANTIZATIONS, DEFAULT_QUANTIZATION
+from encoder_backends import EncoderModel, BACKENDS, DEFAULT_BACKEND, DEFAULT_MODEL, DEFAULT_MODEL_DIR
+from batch_scheduler import DEFAULT_TOKEN_BUDGET, DEFAULT_MAX_SEQ_TOKENS
+from stream_pipeline import (ReviewStream, StreamError, DEFAULT_QUEUE_PAGES, DEFAULT_SCRAPE_CONCURRENCY,
+                             DEFAULT_SCRAPE_RATE)
 
-def parse_arguments():
-    """명령행 인자 파싱"""
+# 감성 분석에 사용하는 임베딩 모델 (실행 백엔드는 --encoder-backend로 선택)
+MODEL_PATH = DEFAULT_MODEL
+
+# 감정 기준 샘플 문장 (레이블, 문장)
+SENTIMENT_SAMPLES = [
+    ("positive", "이 책은 정말 유익하고 감동적이었어요."),
+    ("positive", "내용이 흥미롭고 유용했어요."),
+    ("positive", "재미있고 다시 읽고 싶어요."),
+    ("negative", "별로 도움이 안 됐어요."),
+    ("negative", "실망스럽고 지루했어요."),
+    ("negative", "읽기 힘들고 후회돼요.")
+]
+
+# 한 번에 임베딩할 리뷰 수
+DEFAULT_BATCH_SIZE = 256
+
+# 리뷰 데이터 필수 컬럼 (CSV)과 분석에 실제로 사용하는 컬럼 (Parquet은 이 컬럼만 읽음)
+REQUIRED_COLUMNS = ['리뷰번호', '회원ID', '작성일시', '리뷰내용', '감정키워드', '평점']
+ANALYSIS_COLUMNS = ['작성일시', '리뷰내용', '감정키워드', '평점']
+
+# 리뷰 작성일시 형식 (스크래퍼가 저장하는 형식, 다르면 형식 추론으로 다시 파싱)
+REVIEW_DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# 저장된 기준 샘플 인덱스 디렉토리와 형식 버전 (저장 형식이 바뀌면 버전을 올림)
+PROTOTYPE_INDEX_VERSION = 1
+DEFAULT_INDEX_DIR = "cache/prototype_index"
+
+# 워드클라우드 설정과 렌더러 (direct: 800px PNG 직접 저장, matplotlib: 기존 dpi=400 그림)
+WORDCLOUD_OPTIONS = {
+    "width": 800,
+    "height": 800,  # 가로 세로 동일한 크기로 변경
+    "background_color": "white",
+    "colormap": "viridis",
+    "prefer_horizontal": 0.7,
+    "min_font_size": 10,
+    "max_font_size": 100,
+    "relative_scaling": 0.5,
+    "random_state": 42,  # 일관된 색상을 위한 시드 설정
+    "collocations": True,
+    "regexp": r"\w[\w']+",
+}
+WORDCLOUD_RENDERERS = ("direct", "matplotlib")
+DEFAULT_WORDCLOUD_RENDERER = "direct"
+
+# pyplot은 스레드 안전하지 않으므로 분석 서버에서 여러 작업이 동시에 그리지 않도록 잠금
+_PYPLOT_LOCK = threading.Lock()
+
+
+class AnalysisError(Exception):
+    """리포트 생성 단계 실패 (메시지에 실패한 단계를 포함)"""
+
+def parse_arguments(argv=None):
+    """명령행 인자 파싱 (argv를 지정하면 sys.argv 대신 사용)"""
     parser = argparse.ArgumentParser(
         description='도서 리뷰 감성 분석 및 리포트 생성',
         formatter_class=argparse.RawTextHelpFormatter
@@ -19,16 +84,62 @@ def parse_arguments():
     
     parser.add_argument(
         '-t', '--title',
-        required=True,
-        help='도서 제목 (예: "세이노의 가르침")'
+        help='도서 제목 (예: "세이노의 가르침", --check가 아니면 필수)'
     )
     
-    parser.add_argument(
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument(
         '-f', '--file',
-        required=True,
-        help='리뷰 데이터 CSV 파일 경로\n' + 
-             '(예: data/reviews.csv)\n' +
-             '필수 컬럼: 리뷰번호,회원ID,작성일시,리뷰내용,감정키워드,평점'
+        help='리뷰 데이터 CSV 또는 Parquet 파일 경로\n' + 
+             '(예: data/reviews.csv, data/reviews.parquet)\n' +
+             '필수 컬럼: 리뷰번호,회원ID,작성일시,리뷰내용,감정키워드,평점\n' +
+             '(Parquet은 작성일시,리뷰내용,감정키워드,평점만 읽음)'
+    )
+    
+    source.add_argument(
+        '--scrape',
+        metavar='BOOK_CODE',
+        help='리뷰 파일 대신 교보문고 리뷰 API에서 이 도서의 리뷰를 받으면서 바로 분석 (중간 CSV 없음)\n' +
+             '(예: S000061818273, 다운로드와 인코딩이 동시에 진행됨)'
+    )
+    
+    parser.add_argument(
+        '--api-host',
+        help='--scrape에서 사용할 API 호스트 (기본값: 교보문고, 로컬 목업 서버 주소 지정 가능)'
+    )
+    
+    parser.add_argument(
+        '--scrape-concurrency',
+        type=int,
+        default=DEFAULT_SCRAPE_CONCURRENCY,
+        help=f'--scrape에서 동시에 요청할 최대 페이지 수 (기본값: {DEFAULT_SCRAPE_CONCURRENCY})'
+    )
+    
+    parser.add_argument(
+        '--scrape-rate',
+        type=float,
+        default=DEFAULT_SCRAPE_RATE,
+        help=f'--scrape의 초당 요청 수 제한, 0이면 제한 없음 (429/5xx 응답 시 자동으로 낮춤, 기본값: {DEFAULT_SCRAPE_RATE})'
+    )
+    
+    parser.add_argument(
+        '--queue-pages',
+        type=int,
+        default=DEFAULT_QUEUE_PAGES,
+        help='--scrape에서 분석을 기다리는 페이지를 최대 몇 개까지 쌓아 둘지 (가득 차면 다운로드가 기다림,\n' +
+             f'기본값: {DEFAULT_QUEUE_PAGES})'
+    )
+    
+    parser.add_argument(
+        '--save-raw',
+        metavar='PATH',
+        help='--scrape로 받은 원본 리뷰를 스크래퍼와 같은 형식으로 함께 저장 (.parquet이면 Parquet, 그 밖에는 CSV)'
+    )
+    
+    parser.add_argument(
+        '--check',
+        action='store_true',
+        help='리뷰 데이터 파일의 필수 컬럼만 검증하고 종료 (모델을 로드하지 않음)'
     )
     
     parser.add_argument(
@@ -37,7 +148,198 @@ def parse_arguments():
              '지정하지 않으면 output/도서제목_report.html로 저장'
     )
     
-    return parser.parse_args()
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help=f'감성 분석 시 한 번에 임베딩할 리뷰 수 (기본값: {DEFAULT_BATCH_SIZE})'
+    )
+    
+    parser.add_argument(
+        '--chunksize',
+        type=int,
+        help='지정하면 리뷰 데이터를 이 행 수만큼씩 읽어 분석/집계 (메모리 사용량 일정)\n' +
+             '지정하지 않으면 전체를 한 번에 읽어 분석'
+    )
+    
+    parser.add_argument(
+        '--no-dedup',
+        action='store_true',
+        help='정규화한 텍스트가 같은 리뷰도 각각 인코딩 (기본은 고유 텍스트만 한 번씩 인코딩)'
+    )
+    
+    parser.add_argument(
+        '--token-budget',
+        type=int,
+        nargs='?',
+        const=DEFAULT_TOKEN_BUDGET,
+        help='리뷰를 토큰 길이순으로 정렬해 (배치 크기 × 최대 토큰 길이)가 이 값 이하가 되도록 배치를 구성하고\n' +
+             f'모델 최대 길이를 넘는 리뷰는 조각으로 나눠 전체를 분석 (값을 생략하면 {DEFAULT_TOKEN_BUDGET})'
+    )
+    
+    parser.add_argument(
+        '--max-seq-tokens',
+        type=int,
+        default=DEFAULT_MAX_SEQ_TOKENS,
+        help=f'--token-budget 사용 시 리뷰를 나누는 기준인 모델 최대 입력 토큰 수 (기본값: {DEFAULT_MAX_SEQ_TOKENS})'
+    )
+    
+    parser.add_argument(
+        '--encoder-backend',
+        choices=BACKENDS,
+        default=DEFAULT_BACKEND,
+        help='임베딩 모델 실행 방식 (기본값: pytorch)\n' +
+             'onnx: ONNX Runtime, onnx-int8: 동적 int8 양자화 ONNX (encoder_backends.py export로 먼저 생성)'
+    )
+    
+    parser.add_argument(
+        '--model-dir',
+        default=DEFAULT_MODEL_DIR,
+        help=f'로컬 모델 디렉토리, 있으면 네트워크 접속 없이 로드 (기본값: {DEFAULT_MODEL_DIR})'
+    )
+    
+    parser.add_argument(
+        '--encode-workers',
+        type=int,
+        default=0,
+        help='지정하면 리뷰 인코딩을 이 수만큼의 프로세스로 나누어 병렬 수행 (CPU 전용 환경용)\n' +
+             '워커마다 모델을 따로 로드하며, 배치 크기는 --batch-size × 워커 수가 됨'
+    )
+    
+    parser.add_argument(
+        '--encode-threads',
+        type=int,
+        help='병렬 인코딩 워커당 torch 스레드 수 (기본값: CPU 코어 수 ÷ 워커 수)'
+    )
+    
+    parser.add_argument(
+        '--classifier',
+        choices=['prototype', 'knn'],
+        default='prototype',
+        help='감정 분류 방식 (기본값: prototype)\n' +
+             'prototype: 기준 샘플 문장 6개 중 가장 유사한 문장의 레이블\n' +
+             'knn: 평점으로 레이블을 붙인 리뷰 인덱스에서 k-NN 가중 투표 (knn_classifier.py로 생성)'
+    )
+    
+    parser.add_argument(
+        '--knn-index',
+        default=DEFAULT_KNN_INDEX_DIR,
+        help=f'k-NN 분류 인덱스 경로 (기본값: {DEFAULT_KNN_INDEX_DIR})'
+    )
+    
+    parser.add_argument(
+        '--knn-k',
+        type=int,
+        default=DEFAULT_K,
+        help=f'k-NN 투표에 사용할 이웃 수 (기본값: {DEFAULT_K})'
+    )
+    
+    parser.add_argument(
+        '--vector-store',
+        nargs='?',
+        const=DEFAULT_VECTOR_STORE_DIR,
+        help='리뷰 임베딩을 양자화하여 벡터 저장소에 도서별로 저장 (vector_store.py로 유사 리뷰 검색)\n' +
+             f'경로를 생략하면 {DEFAULT_VECTOR_STORE_DIR}'
+    )
+    
+    parser.add_argument(
+        '--vector-quantization',
+        choices=QUANTIZATIONS,
+        default=DEFAULT_QUANTIZATION,
+        help=f'벡터 저장소 양자화 방식 (기본값: {DEFAULT_QUANTIZATION})'
+    )
+    
+    parser.add_argument(
+        '--book-code',
+        help='벡터 저장소에 기록할 도서 코드 (기본값: 도서코드 컬럼, 없으면 교보_<도서코드>_리뷰 파일명에서 추출)'
+    )
+    
+    parser.add_argument(
+        '--index-dir',
+        default=DEFAULT_INDEX_DIR,
+        help=f'미리 생성한 기준 샘플 인덱스 저장 경로 (기본값: {DEFAULT_INDEX_DIR})'
+    )
+    
+    parser.add_argument(
+        '--rebuild-index',
+        action='store_true',
+        help='저장된 기준 샘플 인덱스를 무시하고 새로 생성'
+    )
+    
+    parser.add_argument(
+        '--cache-dir',
+        default=DEFAULT_CACHE_DIR,
+        help=f'리뷰 임베딩 캐시 디렉토리 (기본값: {DEFAULT_CACHE_DIR})'
+    )
+    
+    parser.add_argument(
+        '--cache-max-entries',
+        type=int,
+        default=DEFAULT_MAX_ENTRIES,
+        help=f'임베딩 캐시 최대 항목 수, 초과 시 오래 사용하지 않은 항목부터 삭제 (기본값: {DEFAULT_MAX_ENTRIES})'
+    )
+    
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='임베딩 캐시를 사용하지 않고 모든 리뷰를 새로 인코딩'
+    )
+    
+    parser.add_argument(
+        '--clear-cache',
+        action='store_true',
+        help='실행 전에 임베딩 캐시를 비움'
+    )
+    
+    parser.add_argument(
+        '--wordcloud-renderer',
+        choices=WORDCLOUD_RENDERERS,
+        default=DEFAULT_WORDCLOUD_RENDERER,
+        help='워드클라우드 렌더링 방식 (기본값: direct)\n' +
+             'direct: 800px PNG로 바로 저장, matplotlib: 기존 방식(dpi=400 그림)으로 저장'
+    )
+    
+    parser.add_argument(
+        '--no-wordcloud-cache',
+        action='store_true',
+        help='단어 빈도가 이전 실행과 같아도 워드클라우드를 다시 렌더링'
+    )
+    
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='단계별 실행 시간, 인코딩 배치 지연 시간, 최대 메모리 요약 출력'
+    )
+    
+    parser.add_argument(
+        '--metrics-out',
+        help='실행 지표를 저장할 JSON 파일 경로 (예: output/metrics.json)'
+    )
+    
+    parser.add_argument(
+        '--prometheus-out',
+        help='실행 지표를 Prometheus textfile collector 형식으로 저장할 경로\n' +
+             '(예: /var/lib/node_exporter/textfile/review_report.prom)'
+    )
+    
+    parser.add_argument(
+        '--cprofile',
+        choices=STAGES,
+        metavar='STAGE',
+        help='지정한 단계를 cProfile로 프로파일링하여 출력 디렉토리에 .pstats로 저장\n' +
+             f'({", ".join(STAGES)})'
+    )
+    
+    args = parser.parse_args(argv)
+    if not args.check and not args.title:
+        parser.error("-t/--title 인자가 필요합니다")
+    if args.check and not args.file:
+        parser.error("--check에는 -f/--file 인자가 필요합니다")
+    if args.save_raw and not args.scrape:
+        parser.error("--save-raw는 --scrape와 함께 사용해야 합니다")
+    if args.scrape and args.chunksize:
+        parser.error("--scrape는 받은 페이지 단위로 분석하므로 --chunksize와 함께 사용할 수 없습니다")
+    return args
 
 # 📁 경로 설정
 def setup_paths(args):
@@ -63,26 +365,239 @@ def setup_paths(args):
         'font_path': "data/NanumGothic.ttf"
     }
 
+# 📥 리뷰 데이터 컬럼 목록
+def review_file_columns(path):
+    """
+    리뷰 데이터 파일의 헤더(스키마)만 읽어 컬럼 목록 반환
+    """
+    if path.endswith('.parquet'):
+        import pyarrow.parquet as pq
+        return pq.read_schema(path).names
+
+    # CSV는 pandas 없이 헤더 한 줄만 읽음 (BOM 포함 UTF-8도 처리)
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        return next(csv.reader(f), [])
+
+# 📥 리뷰 데이터 컬럼 검증
+def check_review_columns(path):
+    """
+    리뷰 데이터 파일의 헤더(스키마)만 읽어 필수 컬럼이 있는지 검증
+    """
+    columns = review_file_columns(path)
+    if path.endswith('.parquet'):
+        missing_columns = [col for col in ANALYSIS_COLUMNS if col not in columns]
+        if missing_columns:
+            raise ValueError(f"Parquet 파일에 필수 컬럼이 없습니다: {', '.join(missing_columns)}")
+        return
+
+    missing_columns = [col for col in REQUIRED_COLUMNS if col not in columns]
+    if missing_columns:
+        raise ValueError(f"CSV 파일에 필수 컬럼이 없습니다: {', '.join(missing_columns)}")
+
+# 📥 리뷰 데이터 타입 지정
+def review_csv_dtypes():
+    """
+    리뷰 CSV를 읽을 때 사용할 컬럼별 타입
+    (텍스트는 pyarrow가 있으면 Arrow 문자열, 감정키워드는 범주형, 평점은 float32로 읽은 뒤 정수로 변환)
+    """
+    text_dtype = "string[pyarrow]" if importlib.util.find_spec("pyarrow") else object
+    return {'작성일시': text_dtype, '리뷰내용': text_dtype, '감정키워드': "category", '평점': "float32",
+            '도서코드': "category"}
+
+def parse_review_datetimes(values):
+    """
+    작성일시를 고정 형식으로 파싱 (형식이 다른 값만 형식 추론으로 다시 파싱, 실패하면 NaT)
+    """
+    import pandas as pd
+
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    parsed = pd.to_datetime(values, format=REVIEW_DATETIME_FORMAT, errors="coerce")
+    retry = parsed.isna() & values.notna()
+    if retry.any():
+        parsed[retry] = pd.to_datetime(values[retry].astype(object), format="mixed", errors="coerce")
+    return parsed
+
+def apply_review_schema(df, extra_columns=()):
+    """
+    분석에 사용하는 컬럼(과 extra_columns)만 남기고 컬럼 타입을 고정
+    (작성일시: datetime64, 리뷰내용: 문자열, 감정키워드: 범주형, 평점: Int8 - 소수 평점이 있으면 float32 유지,
+     리뷰번호: Int64, 도서코드: 범주형)
+    """
+    import pandas as pd
+
+    df = df[ANALYSIS_COLUMNS + list(extra_columns)]
+    if '리뷰번호' in df:
+        df = df.assign(리뷰번호=pd.to_numeric(df['리뷰번호'], errors="coerce").astype("Int64"))
+    if '도서코드' in df:
+        df = df.assign(도서코드=df['도서코드'].astype(str).astype("category"))
+    dtypes = review_csv_dtypes()
+    ratings = pd.to_numeric(df['평점'], errors="coerce").astype("float32")
+    valid = ratings.dropna()
+    integral = bool(((valid % 1 == 0) & valid.between(-128, 127)).all())
+    return df.assign(
+        작성일시=parse_review_datetimes(df['작성일시']),
+        리뷰내용=df['리뷰내용'].astype(dtypes['리뷰내용']),
+        감정키워드=df['감정키워드'].astype("category"),
+        평점=ratings.astype("Int8") if integral else ratings
+    )
+
+# 📥 리뷰 데이터 로드
+def load_reviews(path, extra_columns=()):
+    """
+    리뷰 데이터를 로드하고 필수 컬럼을 검증
+    (분석에 필요한 컬럼과 extra_columns만 고정 타입으로 읽음)
+    """
+    check_review_columns(path)
+
+    import pandas as pd
+    columns = ANALYSIS_COLUMNS + list(extra_columns)
+    if path.endswith('.parquet'):
+        return apply_review_schema(pd.read_parquet(path, columns=columns), extra_columns)
+    return apply_review_schema(pd.read_csv(path, usecols=columns, dtype=review_csv_dtypes()), extra_columns)
+
+# 📥 수집한 리뷰 행 변환
+def reviews_from_rows(rows, start=0, extra_columns=()):
+    """
+    스크래퍼 리뷰 행(dict) 목록을 load_reviews와 같은 스키마의 DataFrame으로 변환
+    (빈 값은 CSV를 읽었을 때처럼 결측값, 인덱스는 start부터 이어지는 행 번호)
+    """
+    import pandas as pd
+
+    columns = ANALYSIS_COLUMNS + list(extra_columns)
+    records = [[None if row.get(col) in ('', None) else row[col] for col in columns] for row in rows]
+    df = pd.DataFrame(records, columns=columns, index=pd.RangeIndex(start, start + len(rows)), dtype=object)
+    return apply_review_schema(df, extra_columns)
+
+# 📥 리뷰 데이터 청크 단위 로드
+def iter_review_chunks(path, chunksize, extra_columns=()):
+    """
+    리뷰 데이터를 chunksize 행씩 읽어 반환 (인덱스는 원본 파일의 행 번호로 이어짐)
+    """
+    check_review_columns(path)
+
+    import pandas as pd
+    columns = ANALYSIS_COLUMNS + list(extra_columns)
+    if path.endswith('.parquet'):
+        import pyarrow.parquet as pq
+        offset = 0
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize, columns=columns):
+            chunk = apply_review_schema(batch.to_pandas(), extra_columns)
+            chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+            offset += len(chunk)
+            yield chunk
+        return
+
+    for chunk in pd.read_csv(path, chunksize=chunksize, usecols=columns, dtype=review_csv_dtypes()):
+        yield apply_review_schema(chunk, extra_columns)
+
 # 🧠 txtai 인덱스 생성
-def build_txtai_index():
+def build_txtai_index(model=None):
     """
     txtai 임베딩 인덱스를 생성하고 감정 기준 샘플 문장을 인덱싱함
+    (model: EncoderModel, 기본값은 PyTorch 모델)
     """
-    index = Embeddings({"path": "sentence-transformers/all-MiniLM-L6-v2"})
+    from txtai.embeddings import Embeddings
 
-    samples = [
-        ("positive", "이 책은 정말 유익하고 감동적이었어요."),
-        ("positive", "내용이 흥미롭고 유용했어요."),
-        ("positive", "재미있고 다시 읽고 싶어요."),
-        ("negative", "별로 도움이 안 됐어요."),
-        ("negative", "실망스럽고 지루했어요."),
-        ("negative", "읽기 힘들고 후회돼요.")
-    ]
+    model = model or EncoderModel()
+    index = Embeddings(model.config())
 
-    documents = [(i, text, {"label": label}) for i, (label, text) in enumerate(samples)]
+    documents = [(i, text, {"label": label}) for i, (label, text) in enumerate(SENTIMENT_SAMPLES)]
     index.index(documents)
     return index
 
+# 🧠 감정 기준 샘플 문장의 프로토타입 벡터 생성
+def build_prototype_vectors(txtai_index):
+    """
+    감정 기준 샘플 문장을 임베딩하여 (프로토타입 벡터 행렬, 레이블 배열)을 반환
+    """
+    vectors = txtai_index.batchtransform([text for _, text in SENTIMENT_SAMPLES])
+    labels = np.array([label for label, _ in SENTIMENT_SAMPLES], dtype=object)
+    return vectors, labels
+
+# 🧠 기준 샘플 인덱스 메타데이터
+def prototype_manifest(model=None):
+    """
+    저장된 인덱스가 현재 모델/백엔드/샘플과 일치하는지 검증하기 위한 메타데이터
+    """
+    samples_json = json.dumps(SENTIMENT_SAMPLES, ensure_ascii=False)
+    return {
+        "version": PROTOTYPE_INDEX_VERSION,
+        "model": (model or EncoderModel()).id,
+        "samples": hashlib.sha256(samples_json.encode("utf-8")).hexdigest(),
+        "labels": [label for label, _ in SENTIMENT_SAMPLES]
+    }
+
+# 🧠 기준 샘플 인덱스 디렉토리
+def prototype_index_path(index_dir, model=None):
+    """
+    버전별 인덱스 디렉토리 (PyTorch 외 백엔드는 백엔드별로 따로 저장, 예: v1-onnx-int8)
+    """
+    model = model or EncoderModel()
+    suffix = "" if model.backend == DEFAULT_BACKEND else f"-{model.backend}"
+    return os.path.join(index_dir, f"v{PROTOTYPE_INDEX_VERSION}{suffix}")
+
+# 🧠 기준 샘플 인덱스 저장
+def save_txtai_index(txtai_index, prototypes, index_dir=DEFAULT_INDEX_DIR, model=None):
+    """
+    txtai 인덱스와 프로토타입 벡터를 버전별 디렉토리에 저장
+    """
+    path = prototype_index_path(index_dir, model)
+    os.makedirs(path, exist_ok=True)
+
+    txtai_index.save(os.path.join(path, "index"))
+    np.save(os.path.join(path, "prototypes.npy"), prototypes[0])
+
+    # 매니페스트는 마지막에 기록하여 저장 도중 중단되면 다음 실행에서 다시 생성되도록 함
+    with open(os.path.join(path, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(prototype_manifest(model), f, ensure_ascii=False, indent=2)
+
+# 🧠 저장된 기준 샘플 인덱스 로드
+def load_txtai_index(index_dir=DEFAULT_INDEX_DIR, model=None):
+    """
+    저장된 txtai 인덱스와 프로토타입 벡터를 로드 (없거나 모델/샘플이 바뀌었으면 None)
+    """
+    path = prototype_index_path(index_dir, model)
+    manifest_path = os.path.join(path, "manifest.json")
+    if not os.path.exists(manifest_path):
+        return None
+
+    try:
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest != prototype_manifest(model):
+            return None
+
+        vectors = np.load(os.path.join(path, "prototypes.npy"))
+        if vectors.shape[0] != len(SENTIMENT_SAMPLES):
+            return None
+
+        from txtai.embeddings import Embeddings
+
+        # 저장된 설정의 모델 경로 대신 현재 로컬 모델 디렉토리를 사용 (네트워크 접속 없이 로드)
+        index = Embeddings()
+        index.load(os.path.join(path, "index"), config=(model or EncoderModel()).config())
+    except Exception as e:
+        print(f"저장된 인덱스 로드 실패, 새로 생성합니다: {e}")
+        return None
+
+    labels = np.array(manifest["labels"], dtype=object)
+    return index, (vectors, labels)
+
+# 🧠 기준 샘플 인덱스 로드 또는 생성
+def load_or_build_txtai_index(index_dir=DEFAULT_INDEX_DIR, rebuild=False, model=None):
+    """
+    저장된 인덱스를 재사용하고, 없거나 오래된 경우에만 새로 생성하여 저장
+    """
+    loaded = None if rebuild else load_txtai_index(index_dir, model)
+    if loaded:
+        return loaded
+
+    index = build_txtai_index(model)
+    prototypes = build_prototype_vectors(index)
+    save_txtai_index(index, prototypes, index_dir, model)
+    return index, prototypes
+
 # 🧠 리뷰 텍스트에 대한 감성 예측
 def predict_sentiment(txtai_index, text):
     """
@@ -98,7 +613,83 @@ def predict_sentiment(txtai_index, text):
         else:
             return "negative"
     return "neutral"
-    
+
+# 🧠 리뷰 텍스트 배치 임베딩
+def encode_batch(txtai_index, texts, cache=None):
+    """
+    리뷰 텍스트 배치를 임베딩 (캐시가 있으면 캐시에 없는 텍스트만 인코딩)
+    """
+    if cache is None:
+        return txtai_index.batchtransform(texts)
+
+    keys = [cache_key(text, cache.model_id) for text in texts]
+    found, missing = cache.get_many(keys)
+
+    if missing:
+        missing_keys = set(missing)
+        miss_texts = {key: text for key, text in zip(keys, texts) if key in missing_keys}
+        encoded = txtai_index.batchtransform(list(miss_texts.values()))
+        cache.put_many(list(miss_texts.keys()), encoded)
+        found.update(zip(miss_texts.keys(), encoded))
+
+    return np.stack([found[key] for key in keys])
+
+# 🧠 리뷰 텍스트 배치에 대한 감성 예측
+def predict_sentiments_batch(txtai_index, texts, prototypes, batch_size=DEFAULT_BATCH_SIZE, cache=None,
+                             metrics=None, embeddings_out=None, scheduler=None):
+    """
+    리뷰 텍스트를 배치 단위로 임베딩하고 프로토타입 벡터와의 행렬곱으로 감정 레이블을 추론
+    (가장 유사한 기준 문장의 레이블을 사용하므로 predict_sentiment와 결과가 같음)
+    prototypes 대신 predict()가 있는 분류기(KnnSentimentClassifier)를 넘기면 그 결과를 사용
+    embeddings_out 리스트를 넘기면 배치별 임베딩을 순서대로 추가 (벡터 저장소용)
+    scheduler(BatchScheduler)를 넘기면 토큰 길이순 배치로 인코딩하고 긴 리뷰는 조각 임베딩을 합쳐 사용
+    """
+    classifier = prototypes if hasattr(prototypes, "predict") else None
+    if classifier is None:
+        vectors, labels = prototypes
+    predictions = np.empty(len(texts), dtype=object)
+    if scheduler is not None:
+        # 패딩 통계는 캐시에 없어 실제로 모델에 넘긴 텍스트로 셈
+        txtai_index = scheduler.measure(txtai_index)
+
+    def encode(batch):
+        batch_start = time.perf_counter()
+        with timed(metrics, "encode"):
+            embeddings = encode_batch(txtai_index, batch, cache)
+        if metrics is not None:
+            metrics.observe_encode(time.perf_counter() - batch_start, len(batch))
+        return embeddings
+
+    step = scheduler.window if scheduler is not None else batch_size
+    for start in range(0, len(texts), step):
+        batch = texts[start:start + step]
+        embeddings = scheduler.encode(encode, batch, metrics) if scheduler is not None else encode(batch)
+        if embeddings_out is not None:
+            embeddings_out.append(embeddings)
+        with timed(metrics, "search"):
+            if classifier is not None:
+                predictions[start:start + len(batch)] = classifier.predict(embeddings)
+            else:
+                scores = embeddings @ vectors.T
+                predictions[start:start + len(batch)] = labels[scores.argmax(axis=1)]
+
+    return predictions
+
+# 🧠 중복 제거용 리뷰 텍스트 정규화
+_REPEATED_PUNCTUATION = re.compile(r"([^\w\s])\1+")
+# NFKC는 "ㅎㅎ", "ㅠㅠ" 같은 호환용 한글 자모를 조합용 자모로 바꾸므로 이 구간은 그대로 둠
+_COMPATIBILITY_JAMO = re.compile(r"([\u3131-\u318e]+)")
+
+def normalize_review_text(text):
+    """
+    표기만 다른 같은 리뷰를 한 번만 인코딩하도록 텍스트를 정규화
+    (NFKC 정규화, 공백 정리, 같은 문장부호 반복을 하나로 축약: "좋아요!!!" → "좋아요!")
+    """
+    if not unicodedata.is_normalized("NFKC", text):
+        parts = _COMPATIBILITY_JAMO.split(text)
+        text = "".join(part if i % 2 else unicodedata.normalize("NFKC", part) for i, part in enumerate(parts))
+    text = _REPEATED_PUNCTUATION.sub(r"\1", text)
+    return " ".join(text.split())
 
 # 🧠 감정 레이블을 감성 점수(0~1)로 변환
 def label_to_score(label):
@@ -108,76 +699,218 @@ def label_to_score(label):
     return {"positive": 1.0, "negative": 0.0}.get(label, 0.5)
 
 # 🧠 시계열용 감성 데이터 생성
-def analyze_sentiments(df, txtai_index):
+def analyze_sentiments(df, txtai_index, batch_size=DEFAULT_BATCH_SIZE, cache=None, prototypes=None, verbose=True,
+                       metrics=None, dedup=True, vector_sink=None, scheduler=None):
     """
-    리뷰내용에 대한 감정 분석을 수행하고 감성 점수를 추가
+    리뷰내용에 대한 감정 분석을 배치 단위로 수행하고 감성 점수를 추가
+    (dedup이면 정규화한 텍스트가 같은 리뷰끼리 묶어 각 묶음의 첫 리뷰 원문만 인코딩하고 결과를 모든 행에 적용)
+    vector_sink(df, embeddings)를 넘기면 행별 임베딩과 함께 호출 (벡터 저장소 기록용)
+    scheduler(BatchScheduler)를 넘기면 고정 개수 배치 대신 토큰 예산 기반 배치로 인코딩
     """
-    df["예측감정"] = df["리뷰내용"].apply(lambda x: predict_sentiment(txtai_index, x))
-    df["감성점수"] = df["예측감정"].apply(label_to_score)
-    df["작성일시"] = pd.to_datetime(df["작성일시"])
-    return df.sort_values("작성일시")
+    import pandas as pd
 
-# 📊 감정키워드 분포 계산
-def extract_emotion_keywords(df):
+    texts = df["리뷰내용"].fillna("").astype(str).tolist()
+    if prototypes is None:
+        prototypes = build_prototype_vectors(txtai_index)
+
+    embeddings = [] if vector_sink is not None else None
+    start = time.perf_counter()
+    if dedup:
+        # 정규화한 텍스트는 묶음 키로만 쓰고, 인코딩은 원문으로 하여 dedup 여부에 따라 임베딩이 달라지지 않도록 함
+        codes, unique_texts = pd.factorize(pd.Series([normalize_review_text(text) for text in texts], dtype=object))
+        _, first_rows = np.unique(codes, return_index=True)
+        predictions = predict_sentiments_batch(txtai_index, [texts[i] for i in first_rows], prototypes, batch_size,
+                                               cache, metrics, embeddings, scheduler)
+        df["예측감정"] = pd.Categorical(predictions).take(codes)
+        if metrics is not None:
+            metrics.record_dedup(len(texts), len(unique_texts))
+    else:
+        df["예측감정"] = pd.Categorical(predict_sentiments_batch(txtai_index, texts, prototypes, batch_size, cache, metrics,
+                                                             embeddings, scheduler))
+    elapsed = time.perf_counter() - start
+    if verbose:
+        print(f"🧠 감성 분석 완료: {len(texts):,}건, {len(texts) / max(elapsed, 1e-9):,.1f}건/초")
+        if dedup and texts:
+            print(f"🔁 중복 제거: {len(texts):,}건 → 고유 텍스트 {len(unique_texts):,}건 "
+                  f"(인코딩 {1 - len(unique_texts) / len(texts):.1%} 감소)")
+        if scheduler is not None:
+            print(f"📏 {scheduler.summary()}")
+        if cache is not None:
+            print(f"💾 임베딩 캐시 적중률: {cache.hit_rate():.1%} (적중 {cache.hits:,}건, 인코딩 {cache.misses:,}건)")
+
+    if metrics is not None:
+        metrics.reviews += len(texts)
+
+    if vector_sink is not None and texts:
+        with timed(metrics, "store"):
+            embeddings = np.concatenate(embeddings)
+            vector_sink(df, embeddings[codes] if dedup else embeddings)
+
+    with timed(metrics, "aggregate"):
+        df["감성점수"] = df["예측감정"].map(label_to_score).astype("float32")
+        df["작성일시"] = parse_review_datetimes(df["작성일시"])
+        return df.sort_values("작성일시", kind="stable")
+
+# 🧠 청크 단위 감성 분석 및 리포트 집계
+def analyze_in_chunks(path, txtai_index, chunksize, batch_size=DEFAULT_BATCH_SIZE, cache=None, prototypes=None,
+                      metrics=None, dedup=True, vector_sink=None, extra_columns=(), scheduler=None):
     """
-    감정키워드 문자열을 분해하여 분포 집계
+    리뷰 데이터를 청크 단위로 읽어 감성 분석과 리포트 집계를 수행 (전체 데이터를 메모리에 올리지 않음)
     """
-    all_keywords = []
-    for entry in df["감정키워드"].dropna():
-        all_keywords.extend([kw.strip() for kw in entry.split(",")])
-    return dict(Counter(all_keywords))
+    from report_aggregates import ReportAccumulator
+
+    if prototypes is None:
+        prototypes = build_prototype_vectors(txtai_index)
+
+    accumulator = ReportAccumulator()
+    total = 0
+    start = time.perf_counter()
+
+    chunks = iter_review_chunks(path, chunksize, extra_columns)
+    while True:
+        # 청크 읽기 시간은 load 단계로 측정
+        with timed(metrics, "load"):
+            chunk = next(chunks, None)
+        if chunk is None:
+            break
+
+        chunk = analyze_sentiments(chunk, txtai_index, batch_size, cache, prototypes, verbose=False,
+                                   metrics=metrics, dedup=dedup, vector_sink=vector_sink, scheduler=scheduler)
+        with timed(metrics, "aggregate"):
+            accumulator.update(chunk)
+        total += len(chunk)
+        print(f"  - {total:,}건 처리")
+
+    print_chunked_summary(total, time.perf_counter() - start, metrics, dedup, cache, scheduler)
+    return accumulator
+
+# 🧠 스트리밍 감성 분석 및 리포트 집계
+def analyze_stream(stream, txtai_index, batch_size=DEFAULT_BATCH_SIZE, cache=None, prototypes=None,
+                   metrics=None, dedup=True, vector_sink=None, extra_columns=(), scheduler=None):
+    """
+    리뷰 스트림(ReviewStream)에서 받은 페이지를 다운로드와 동시에 감성 분석하고 리포트 집계
+    (분석이 밀려 대기열에 쌓인 페이지는 batch_size건 이상이 되도록 모아서 한 번에 분석)
+    """
+    from report_aggregates import ReportAccumulator
+
+    if prototypes is None:
+        prototypes = build_prototype_vectors(txtai_index)
+
+    accumulator = ReportAccumulator()
+    total = 0
+    start = time.perf_counter()
+
+    batches = stream.batches(batch_size)
+    while True:
+        # 페이지를 기다린 시간과 DataFrame 변환은 load 단계로 측정
+        with timed(metrics, "load"):
+            rows = next(batches, None)
+            chunk = reviews_from_rows(rows, total, extra_columns) if rows is not None else None
+        if chunk is None:
+            break
+
+        chunk = analyze_sentiments(chunk, txtai_index, batch_size, cache, prototypes, verbose=False,
+                                   metrics=metrics, dedup=dedup, vector_sink=vector_sink, scheduler=scheduler)
+        with timed(metrics, "aggregate"):
+            accumulator.update(chunk)
+        total += len(chunk)
+        print(f"  - {total:,}건 처리 (다운로드 {stream.pages:,}페이지, {stream.reviews:,}건)")
+
+    print_chunked_summary(total, time.perf_counter() - start, metrics, dedup, cache, scheduler)
+    print(f"📥 {stream.summary()}")
+    return accumulator
+
+# 🧠 청크 단위 분석 결과 요약 출력
+def print_chunked_summary(total, elapsed, metrics=None, dedup=True, cache=None, scheduler=None):
+    """
+    청크/스트리밍 분석의 처리 속도, 중복 제거, 토큰 배치, 캐시 현황 출력
+    """
+    print(f"🧠 감성 분석 완료: {total:,}건, {total / max(elapsed, 1e-9):,.1f}건/초")
+    if dedup and metrics is not None and metrics.dedup_rows:
+        # 청크 안에서만 중복을 제거하므로 청크 사이의 중복은 임베딩 캐시로 처리됨
+        print(f"🔁 중복 제거: {metrics.dedup_rows:,}건 → 고유 텍스트 {metrics.dedup_unique:,}건 "
+              f"(인코딩 {metrics.dedup_ratio():.1%} 감소)")
+    if scheduler is not None:
+        print(f"📏 {scheduler.summary()}")
+    if cache is not None:
+        print(f"💾 임베딩 캐시 적중률: {cache.hit_rate():.1%} (적중 {cache.hits:,}건, 인코딩 {cache.misses:,}건)")
+
+# 🌥 워드클라우드 렌더링 캐시 키
+def wordcloud_fingerprint(frequencies, font_path, renderer):
+    """
+    단어 빈도표와 렌더링 설정의 해시 (같으면 이전에 만든 이미지를 재사용)
+    """
+    font_stat = os.stat(font_path) if font_path and os.path.exists(font_path) else None
+    payload = json.dumps({
+        "frequencies": sorted(frequencies.items()),
+        "options": WORDCLOUD_OPTIONS,
+        "font": [font_path, font_stat.st_size if font_stat else None, font_stat.st_mtime if font_stat else None],
+        "renderer": renderer
+    }, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
 
 # 🌥 워드클라우드 이미지 생성
-def generate_wordcloud(texts, font_path, output_path):
+def generate_wordcloud(frequencies, font_path, output_path, renderer=DEFAULT_WORDCLOUD_RENDERER, use_cache=True):
     """
-    리뷰 내용을 기반으로 컬러풀한 사각형 워드클라우드 생성 및 저장
+    리뷰 단어 빈도를 기반으로 컬러풀한 사각형 워드클라우드 생성 및 저장
+    (단어 빈도는 ReportAccumulator.term_frequencies()로 계산)
+
+    renderer가 "direct"이면 800px 이미지를 바로 PNG로 저장하고, "matplotlib"이면
+    기존처럼 matplotlib 그림(dpi=400)으로 저장합니다. 빈도표와 설정이 이전 실행과 같으면
+    사이드카 파일(<이미지>.hash)의 해시를 확인하여 렌더링을 생략합니다.
+
+    Returns:
+        bool: 새로 렌더링했으면 True, 캐시된 이미지를 재사용했으면 False
     """
-    text = " ".join(texts.dropna())
-    
-    wc = WordCloud(
-        font_path=font_path,
-        width=800,
-        height=800,  # 가로 세로 동일한 크기로 변경
-        background_color="white",
-        colormap='viridis',
-        prefer_horizontal=0.7,
-        min_font_size=10,
-        max_font_size=100,
-        relative_scaling=0.5,
-        random_state=42,  # 일관된 색상을 위한 시드 설정
-        collocations=True,
-        regexp=r"\w[\w']+",
-    )
+    fingerprint = wordcloud_fingerprint(frequencies, font_path, renderer)
+    hash_path = f"{output_path}.hash"
+    if use_cache and os.path.exists(output_path) and os.path.exists(hash_path):
+        with open(hash_path, encoding="utf-8") as f:
+            if f.read().strip() == fingerprint:
+                print("🌥 워드클라우드 변경 없음, 이전 이미지를 재사용합니다.")
+                return False
+
+    from wordcloud import WordCloud
+
+    wc = WordCloud(font_path=font_path, **WORDCLOUD_OPTIONS)
     
     try:
-        wc.generate(text)
-        plt.figure(figsize=(10, 10))  # 정사각형 크기로 설정
-        plt.imshow(wc, interpolation='bilinear')
-        plt.axis('off')
-        plt.tight_layout(pad=0)
-        plt.savefig(output_path, dpi=400, bbox_inches='tight')
-        plt.close()
+        wc.generate_from_frequencies(frequencies)
+        if renderer == "matplotlib":
+            import matplotlib.pyplot as plt
+
+            with _PYPLOT_LOCK:
+                plt.figure(figsize=(10, 10))  # 정사각형 크기로 설정
+                plt.imshow(wc, interpolation='bilinear')
+                plt.axis('off')
+                plt.tight_layout(pad=0)
+                plt.savefig(output_path, dpi=400, bbox_inches='tight')
+                plt.close()
+        else:
+            wc.to_file(output_path)
     except Exception as e:
         print(f"워드클라우드 생성 중 오류 발생: {e}")
+        return True
+
+    with open(hash_path, "w", encoding="utf-8") as f:
+        f.write(fingerprint)
+    return True
 
 # 📄 HTML 보고서 생성
-def generate_html_report(keyword_dist, df_sorted, wordcloud_path, output_path, book_title):
+def generate_html_report(keyword_dist, rating_summary, wordcloud_path, output_path, book_title):
     """
     Tailwind CSS를 적용한 모던한 HTML 보고서 생성
+    (rating_summary는 ReportAccumulator.rating_summary()의 월별/전체 평점 집계)
     """
     keyword_labels = list(keyword_dist.keys())
     keyword_counts = list(keyword_dist.values())
 
-    # 월별 평점 데이터 집계
-    df_sorted['월'] = df_sorted['작성일시'].dt.strftime('%Y-%m')
-    monthly_ratings = df_sorted.groupby('월')['평점'].agg(['mean', 'count']).round(2)
-    monthly_ratings = monthly_ratings[monthly_ratings['count'] >= 1]  # 최소 1개 이상의 데이터가 있는 월만 선택
-    
-    date_labels = monthly_ratings.index.tolist()
-    rating_series = monthly_ratings['mean'].tolist()
-    review_counts = monthly_ratings['count'].tolist()
+    # 월별 평점 데이터 (평점이 1개 이상 있는 월만 포함)
+    date_labels = rating_summary['date_labels']
+    rating_series = rating_summary['rating_series']
+    review_counts = rating_summary['review_counts']
 
-    avg_rating = df_sorted['평점'].mean()
+    avg_rating = rating_summary['average']
     summary = "전반적으로 높은 평점입니다." if avg_rating > 4.0 else "개선이 필요한 부분이 있습니다."
 
     insights = [
@@ -193,7 +926,7 @@ def generate_html_report(keyword_dist, df_sorted, wordcloud_path, output_path, b
     top_keyword_text = ", ".join([f"{kw}({count}회)" for kw, count in top_keywords])
 
     # 평점 통계
-    rating_stats = df_sorted['평점'].agg(['mean', 'min', 'max', 'count']).round(2)
+    rating_stats = rating_summary
 
     with open(output_path, "w", encoding="utf-8") as f:
         f.write(f"""
@@ -389,48 +1122,219 @@ new Chart(ctx2, {{
 </html>
 """)
 
-# ✅ 메인 실행 함수
-def main():
-    """메인 함수"""
-    # 명령행 인자 파싱
-    args = parse_arguments()
-    
+# ✅ 리포트 1건 생성
+def run_analysis(args, txtai_index=None, prototypes=None, cache=None):
+    """
+    리뷰 데이터 1건에 대해 감성 분석, 워드클라우드, HTML 리포트를 생성
+    (txtai_index/prototypes를 넘기면 모델을 다시 로드하지 않음,
+    cache를 넘기면 작업별로 새로 열지 않고 공유 임베딩 캐시를 사용, 분석 서버에서 재사용)
+
+    Returns:
+        dict: 워드클라우드/리포트 경로와 실행 지표
+    Raises:
+        AnalysisError: 데이터 읽기, 분석, 워드클라우드, 리포트 생성 중 실패한 경우
+    """
     # 경로 설정
     paths = setup_paths(args)
     
-    # CSV 파일 읽기
+    # 실행 지표 수집
+    metrics = RunMetrics(args.title, args.cprofile)
+    
+    # 벡터 저장소에 기록할 때는 리뷰번호(와 일괄 수집 파일의 도서코드)도 읽음
+    extra_columns = []
+    if args.vector_store and args.scrape:
+        extra_columns = ['리뷰번호']
+    elif args.vector_store:
+        try:
+            columns = review_file_columns(paths['input_csv'])
+        except Exception as e:
+            raise AnalysisError(f"리뷰 데이터 읽기 오류: {str(e)}") from e
+        extra_columns = [col for col in ('리뷰번호', '도서코드') if col in columns]
+    
+    # 리뷰 데이터 읽기 (청크 모드에서는 컬럼만 검증하고 분석하면서 청크 단위로 읽음,
+    # 스트리밍 모드에서는 다운로드 스레드를 먼저 시작하여 모델을 로드하는 동안에도 페이지를 받음)
+    stream = None
     try:
-        df = pd.read_csv(paths['input_csv'])
-        required_columns = ['리뷰번호', '회원ID', '작성일시', '리뷰내용', '감정키워드', '평점']
-        missing_columns = [col for col in required_columns if col not in df.columns]
-        if missing_columns:
-            raise ValueError(f"CSV 파일에 필수 컬럼이 없습니다: {', '.join(missing_columns)}")
+        with metrics.stage("load"):
+            if args.scrape:
+                stream = ReviewStream(args.scrape, args.api_host, args.scrape_concurrency, args.scrape_rate,
+                                      args.queue_pages, args.save_raw, metrics).start()
+            elif args.chunksize:
+                check_review_columns(paths['input_csv'])
+            else:
+                df = load_reviews(paths['input_csv'], extra_columns)
     except Exception as e:
-        print(f"CSV 파일 읽기 오류: {str(e)}")
-        return
+        raise AnalysisError(f"리뷰 데이터 읽기 오류: {str(e)}") from e
+    
+    # 임베딩 모델 (캐시, 인덱스, 벡터 저장소는 백엔드별 모델 ID로 구분)
+    # txtai가 배치를 기본값 32개씩 다시 나누지 않도록 모델 배치 크기를 분석 배치 크기에 맞춤
+    model = EncoderModel(args.encoder_backend, args.model_dir, encodebatch=args.batch_size)
+    # 임베딩 캐시 준비 (공유 캐시가 있으면 이 실행의 적중 건수만 따로 세는 세션으로 사용)
+    shared_cache = cache
+    if args.no_cache:
+        cache = None
+    elif shared_cache is not None:
+        cache = shared_cache.session()
+    else:
+        if args.clear_cache:
+            clear_cache(args.cache_dir)
+        cache = EmbeddingCache(model.id, args.cache_dir, args.cache_max_entries)
     
-    # 데이터 전처리
-    df_sorted = analyze_sentiments(df, build_txtai_index())
+    # 감성 분석 및 리포트 집계
+    encoder = None
+    scheduler = None
+    vector_writer = None
+    vector_sink = None
+    try:
+        if args.vector_store:
+            from vector_store import VectorStore, book_code_from_path, store_reviews
+            vector_writer = VectorStore(args.vector_store, model.id, args.vector_quantization).writer()
+            book_code = args.book_code or args.scrape or book_code_from_path(paths['input_csv'])
+            vector_sink = lambda df, embeddings: store_reviews(vector_writer, df, embeddings, book_code)
+        
+        if txtai_index is None:
+            with metrics.stage("model_init"):
+                txtai_index, prototypes = load_or_build_txtai_index(args.index_dir, args.rebuild_index, model)
+        if args.classifier == 'knn':
+            from knn_classifier import KnnSentimentClassifier
+            with metrics.stage("model_init"):
+                prototypes = KnnSentimentClassifier.load(args.knn_index, model.id, args.knn_k)
+        
+        # 병렬 인코딩: 프로토타입 벡터는 로드한 인덱스의 것을 그대로 사용하고 리뷰 인코딩만 워커에 분배
+        encoder, batch_size = txtai_index, args.batch_size
+        if args.encode_workers:
+            from parallel_encoder import ParallelEncoder
+            with metrics.stage("model_init"):
+                encoder = ParallelEncoder(model.config(), args.encode_workers, args.encode_threads)
+                encoder.warmup()
+            batch_size = args.batch_size * encoder.workers
+        
+        # 토큰 예산 기반 배치 (병렬 인코딩이면 워커 수만큼 예산을 늘림)
+        if args.token_budget:
+            from batch_scheduler import BatchScheduler
+            with metrics.stage("model_init"):
+                workers = encoder.workers if args.encode_workers else 1
+                scheduler = BatchScheduler(args.token_budget * workers, args.max_seq_tokens, batch_size,
+                                           model.tokenizer())
+        
+        if stream is not None:
+            accumulator = analyze_stream(stream, encoder, batch_size, cache, prototypes, metrics,
+                                         not args.no_dedup, vector_sink, extra_columns, scheduler)
+        elif args.chunksize:
+            accumulator = analyze_in_chunks(paths['input_csv'], encoder, args.chunksize,
+                                            batch_size, cache, prototypes, metrics, not args.no_dedup,
+                                            vector_sink, extra_columns, scheduler)
+        else:
+            df_sorted = analyze_sentiments(df, encoder, batch_size, cache, prototypes,
+                                           metrics=metrics, dedup=not args.no_dedup, vector_sink=vector_sink,
+                                           scheduler=scheduler)
+            with metrics.stage("aggregate"):
+                from report_aggregates import ReportAccumulator
+                accumulator = ReportAccumulator()
+                accumulator.update(df_sorted)
+        if vector_writer is not None:
+            with metrics.stage("store"):
+                vector_writer.commit()
+    except Exception as e:
+        if vector_writer is not None:
+            vector_writer.abort()
+        if isinstance(e, StreamError):
+            raise AnalysisError(f"리뷰 수집 오류: {str(e)}") from e
+        raise AnalysisError(f"감성 분석 오류: {str(e)}") from e
+    finally:
+        if stream is not None:
+            stream.close()
+            metrics.record_stream(stream)
+        if encoder is not None and encoder is not txtai_index:
+            encoder.close()
+        if scheduler is not None:
+            metrics.record_schedule(scheduler)
+        if cache is not None:
+            metrics.record_cache(cache)
+            cache.close()
     
-    # 감정 키워드 분포 계산
-    keyword_dist = extract_emotion_keywords(df_sorted)
+    # 감정 키워드 분포, 워드클라우드 단어 빈도, 평점 통계 계산
+    with metrics.stage("aggregate"):
+        keyword_dist = accumulator.keyword_distribution()
+        frequencies = accumulator.term_frequencies()
+        rating_summary = accumulator.rating_summary()
     
     # 워드클라우드 생성
     try:
-        generate_wordcloud(df_sorted["리뷰내용"], paths['font_path'], paths['wordcloud_path'])
+        with metrics.stage("wordcloud"):
+            generate_wordcloud(frequencies, paths['font_path'], paths['wordcloud_path'],
+                               args.wordcloud_renderer, not args.no_wordcloud_cache)
     except Exception as e:
-        print(f"워드클라우드 생성 오류: {str(e)}")
-        return
+        raise AnalysisError(f"워드클라우드 생성 오류: {str(e)}") from e
     
     # HTML 리포트 생성
     try:
-        generate_html_report(keyword_dist, df_sorted, paths['wordcloud_path'], paths['report_html_path'], args.title)
-        print(f"\n✨ 분석 완료! 결과물 위치:")
-        print(f"- 워드클라우드: {paths['wordcloud_path']}")
-        print(f"- HTML 리포트: {paths['report_html_path']}")
+        with metrics.stage("html"):
+            generate_html_report(keyword_dist, rating_summary, paths['wordcloud_path'],
+                                 paths['report_html_path'], args.title)
     except Exception as e:
-        print(f"리포트 생성 오류: {str(e)}")
+        raise AnalysisError(f"리포트 생성 오류: {str(e)}") from e
+    
+    # 실행 지표 저장
+    metrics.finish()
+    result = {
+        'wordcloud_path': paths['wordcloud_path'],
+        'report_html_path': paths['report_html_path'],
+        'metrics': metrics
+    }
+    if args.metrics_out:
+        metrics.write_json(args.metrics_out)
+        result['metrics_path'] = args.metrics_out
+    if args.prometheus_out:
+        metrics.write_prometheus(args.prometheus_out)
+        result['prometheus_path'] = args.prometheus_out
+    if args.vector_store:
+        result['vector_store_path'] = args.vector_store
+    if args.save_raw:
+        result['raw_path'] = args.save_raw
+    if args.cprofile:
+        report_name = os.path.splitext(os.path.basename(paths['report_html_path']))[0]
+        result['profile_path'] = os.path.join(paths['output_dir'], f"{report_name}_{args.cprofile}.pstats")
+        metrics.dump_profile(result['profile_path'])
+    return result
+
+# ✅ 메인 실행 함수
+def main():
+    """메인 함수"""
+    # 명령행 인자 파싱
+    args = parse_arguments()
+    
+    # 컬럼 검증만 수행 (pandas/txtai를 읽지 않음)
+    if args.check:
+        try:
+            check_review_columns(args.file)
+        except Exception as e:
+            print(f"리뷰 데이터 검증 오류: {str(e)}")
+            sys.exit(1)
+        print(f"✅ 리뷰 데이터 컬럼 검증 통과: {args.file}")
         return
+    
+    try:
+        result = run_analysis(args)
+    except AnalysisError as e:
+        print(str(e))
+        return
+    
+    print(f"\n✨ 분석 완료! 결과물 위치:")
+    print(f"- 워드클라우드: {result['wordcloud_path']}")
+    print(f"- HTML 리포트: {result['report_html_path']}")
+    if args.profile:
+        result['metrics'].print_summary()
+    if args.metrics_out:
+        print(f"- 실행 지표: {result['metrics_path']}")
+    if args.prometheus_out:
+        print(f"- Prometheus 지표: {result['prometheus_path']}")
+    if args.cprofile:
+        print(f"- cProfile 결과 ({args.cprofile}): {result['profile_path']}")
+    if args.vector_store:
+        print(f"- 벡터 저장소: {result['vector_store_path']}")
+    if args.save_raw:
+        print(f"- 원본 리뷰: {result['raw_path']}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
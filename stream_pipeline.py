@@ -0,0 +1,204 @@
+"""
+리뷰 수집-분석 스트리밍 파이프라인
+
+scraper_kyobo.py로 CSV를 저장한 뒤 sentiment_analysis_txtai.py로 다시 읽는 대신,
+백그라운드 스레드가 리뷰 API 페이지를 받는 대로 크기가 제한된 대기열에 넣고
+분석 쪽은 대기열에서 페이지를 꺼내 바로 인코딩/집계합니다. (중간 CSV 없음)
+
+대기열이 가득 차면 다운로드 스레드가 기다리므로(백프레셔) 분석이 느려도 메모리 사용량은 일정하며,
+다운로드와 인코딩이 겹쳐 실행되므로 전체 시간은 두 시간의 합이 아니라 더 긴 쪽에 가까워집니다.
+모델 로드도 첫 페이지를 받는 동안 진행됩니다.
+원본 리뷰는 원하면 다운로드 스레드에서 스크래퍼와 같은 형식의 CSV/Parquet으로 함께 저장합니다.
+
+사용 예:
+    python sentiment_analysis_txtai.py -t "도서명" --scrape S000061818273 --save-raw data/교보_S000061818273_리뷰.csv
+    python sentiment_analysis_txtai.py -t "도서명" --scrape S000001 --api-host http://127.0.0.1:8765
+"""
+
+import os
+import queue
+import threading
+import time
+
+from run_metrics import timed
+
+# 대기열에 담아 둘 최대 페이지 수 (리뷰 API 한 페이지 = 최대 100건)
+DEFAULT_QUEUE_PAGES = 8
+
+# 동시에 요청할 페이지 수와 초당 요청 수 (scraper_kyobo.py review의 --concurrency, --rate)
+DEFAULT_SCRAPE_CONCURRENCY = 2
+DEFAULT_SCRAPE_RATE = 5.0
+
+# 대기열 종료 표시
+_DONE = object()
+
+
+class StreamError(Exception):
+    """다운로드 스레드에서 리뷰 수집이 실패한 경우 (원인 예외는 __cause__)"""
+
+
+class ReviewStream:
+    """
+    백그라운드 스레드에서 도서 리뷰 페이지를 받아 크기가 제한된 대기열로 전달하는 생산자
+
+    Args:
+        book_code (str): 교보문고 상품 코드
+        api_host (str, optional): API 호스트 (로컬 목업 서버 주소 지정 가능)
+        concurrency (int): 동시에 요청할 최대 페이지 수
+        rate_limit (float): 초당 요청 수 (0 이하이면 제한하지 않음)
+        queue_pages (int): 대기열에 담아 둘 최대 페이지 수
+        raw_path (str, optional): 원본 리뷰를 함께 저장할 경로 (.parquet이면 Parquet, 그 밖에는 CSV)
+        metrics (RunMetrics, optional): 다운로드 단계 시간을 기록할 실행 지표
+        fetch_options (dict, optional): 요청 엔진 설정 (타임아웃, 재시도 횟수)
+    """
+
+    def __init__(self, book_code, api_host=None, concurrency=DEFAULT_SCRAPE_CONCURRENCY, rate_limit=DEFAULT_SCRAPE_RATE,
+                 queue_pages=DEFAULT_QUEUE_PAGES, raw_path=None, metrics=None, fetch_options=None):
+        from fetch_engine import FetchStats
+
+        self.book_code = book_code
+        self.api_host = api_host
+        self.concurrency = concurrency
+        self.rate_limit = rate_limit
+        self.raw_path = raw_path
+        self.metrics = metrics
+        self.fetch_stats = FetchStats()
+        self.fetch_options = {**(fetch_options or {}), "stats": self.fetch_stats}
+        self.queue = queue.Queue(maxsize=max(1, queue_pages))
+        self.stopping = threading.Event()
+        self.thread = threading.Thread(target=self._run, name=f"review-stream-{book_code}", daemon=True)
+
+        self.pages = 0
+        self.reviews = 0
+        self.download_seconds = None
+        self.blocked_seconds = 0.0  # 대기열이 가득 차 다운로드가 기다린 시간 (분석이 병목)
+        self.starved_seconds = 0.0  # 대기열이 비어 분석이 기다린 시간 (다운로드가 병목)
+        self.max_queued = 0
+
+    def start(self):
+        """다운로드 스레드 시작"""
+        self.thread.start()
+        return self
+
+    def _put(self, item):
+        """대기열에 넣기 (가득 차 있으면 기다리며, 분석 쪽이 중단하면 포기)"""
+        start = time.perf_counter()
+        while not self.stopping.is_set():
+            try:
+                self.queue.put(item, timeout=0.1)
+            except queue.Full:
+                continue
+            self.blocked_seconds += time.perf_counter() - start
+            self.max_queued = max(self.max_queued, self.queue.qsize())
+            return True
+        return False
+
+    def _run(self):
+        with timed(self.metrics, "download"):
+            self._download()
+
+    def _download(self):
+        import scraper_kyobo as scraper
+
+        api_host = self.api_host or scraper.KYOBO_API_HOST
+        fetcher = scraper.create_fetcher(self.concurrency, self.rate_limit, fetch_options=self.fetch_options)
+        writer = None
+        temp_path = None
+        start = time.perf_counter()
+        try:
+            if self.raw_path:
+                os.makedirs(os.path.dirname(self.raw_path) or ".", exist_ok=True)
+                output_format = "parquet" if self.raw_path.endswith(".parquet") else "csv"
+                temp_path = f"{self.raw_path}.part"
+                writer = scraper.open_review_writer(temp_path, output_format)
+
+            pages = scraper.fetch_pages_in_order(
+                lambda page: scraper.fetch_review_page(fetcher, self.book_code, page, api_host),
+                self.concurrency
+            )
+            try:
+                for reviews in pages:
+                    rows = [scraper.review_to_row(review) for review in reviews]
+                    if writer is not None:
+                        writer.write_rows(rows)
+                    self.pages += 1
+                    self.reviews += len(rows)
+                    if not self._put(rows):
+                        break
+            finally:
+                pages.close()
+
+            if writer is not None:
+                writer.close()
+                writer = None
+                if self.stopping.is_set():
+                    os.remove(temp_path)
+                else:
+                    os.replace(temp_path, self.raw_path)
+            self.download_seconds = time.perf_counter() - start
+            self._put(_DONE)
+        except BaseException as e:
+            # 일부 페이지만 받은 원본은 완전한 수집 결과처럼 남기지 않음
+            if writer is not None:
+                writer.close()
+            if temp_path and os.path.exists(temp_path):
+                os.remove(temp_path)
+            self.download_seconds = time.perf_counter() - start
+            self._put(e)
+        finally:
+            fetcher.close()
+
+    def batches(self, min_rows=1):
+        """
+        받은 리뷰 행을 순서대로 반환 (대기열에 쌓인 페이지는 min_rows건이 될 때까지 한 번에 꺼냄)
+
+        Raises:
+            StreamError: 다운로드 스레드에서 리뷰 수집이 실패한 경우 (FetchError 등)
+        """
+        done = False
+        while not done:
+            start = time.perf_counter()
+            item = self.queue.get()
+            self.starved_seconds += time.perf_counter() - start
+
+            rows = []
+            while True:
+                if item is _DONE:
+                    done = True
+                    break
+                if isinstance(item, BaseException):
+                    raise StreamError(f"{self.pages}페이지까지 받은 뒤 실패: {item}") from item
+                rows.extend(item)
+                if len(rows) >= min_rows:
+                    break
+                try:
+                    item = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+            if rows:
+                yield rows
+
+    def close(self):
+        """다운로드 중단 후 스레드 종료 대기 (정상 종료 후 호출해도 됨)"""
+        self.stopping.set()
+        self.thread.join()
+
+    def to_dict(self):
+        """실행 지표에 기록할 스트리밍 통계"""
+        return {
+            "book_code": self.book_code,
+            "pages": self.pages,
+            "reviews": self.reviews,
+            "download_seconds": round(self.download_seconds, 4) if self.download_seconds is not None else None,
+            "download_blocked_seconds": round(self.blocked_seconds, 4),
+            "analysis_starved_seconds": round(self.starved_seconds, 4),
+            "max_queued_pages": self.max_queued,
+            "raw_path": self.raw_path,
+            "fetch": self.fetch_stats.to_dict()
+        }
+
+    def summary(self):
+        """이번 실행의 다운로드/대기열 현황 문자열"""
+        text = (f"리뷰 스트림: {self.pages:,}페이지 {self.reviews:,}건, 다운로드 {self.download_seconds or 0:.2f}초, "
+                f"대기열 가득 참 {self.blocked_seconds:.2f}초, 분석 대기 {self.starved_seconds:.2f}초")
+        return f"{text}\n  {self.fetch_stats.summary()}"
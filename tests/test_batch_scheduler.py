@@ -0,0 +1,51 @@
+import numpy as np
+
+from batch_scheduler import BatchScheduler
+from encoder_backends import EncoderModel
+
+
+class FakeEncoder:
+    def __init__(self, config):
+        self.config = config
+        self.calls = []
+
+    def batchtransform(self, documents, category=None, index=None):
+        self.calls.append(list(documents))
+        return np.ones((len(documents), 4), dtype=np.float32)
+
+
+def test_encoder_config_sets_encodebatch():
+    assert EncoderModel(encodebatch=256).config()["encodebatch"] == 256
+    assert "encodebatch" not in EncoderModel().config()
+
+
+def test_padding_is_measured_on_encoded_texts_only():
+    texts = ["가 " * n for n in (1, 2, 3, 10)]
+    cached = set(texts[:2])
+    scheduler = BatchScheduler(token_budget=1024, max_batch=4)
+    measured = scheduler.measure(FakeEncoder({"encodebatch": 4}))
+
+    def encode(batch):
+        # 캐시에 있는 텍스트는 모델에 넘기지 않음
+        missing = [text for text in batch if text not in cached]
+        encoded = iter(measured.batchtransform(missing))
+        return np.stack([np.ones(4, dtype=np.float32) if text in cached else next(encoded) for text in batch])
+
+    scheduler.encode(encode, texts)
+    lengths = scheduler.count_tokens(texts[2:]).tolist()
+    assert scheduler.batches == 1
+    assert scheduler.tokens == sum(lengths)
+    assert scheduler.padded_tokens == 2 * max(lengths)
+
+
+def test_padding_follows_the_encoder_batch_size():
+    texts = ["가 " * n for n in (1, 2, 3, 10)]
+    scheduler = BatchScheduler(token_budget=1024, max_batch=4)
+    encoder = FakeEncoder({"encodebatch": 2})
+    scheduler.encode(scheduler.measure(encoder).batchtransform, texts)
+
+    # 스케줄한 배치 하나를 모델이 encodebatch개씩 나눠 인코딩하고, 나눈 배치마다 가장 긴 텍스트까지 패딩
+    lengths = sorted(scheduler.count_tokens(texts).tolist(), reverse=True)
+    assert len(encoder.calls) == 1
+    assert scheduler.batches == 2
+    assert scheduler.padded_tokens == 2 * lengths[0] + 2 * lengths[2]
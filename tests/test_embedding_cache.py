@@ -0,0 +1,50 @@
+import numpy as np
+
+from embedding_cache import EmbeddingCache
+
+
+def vector(value, dim=4):
+    return np.full(dim, value, dtype=np.float32)
+
+
+def test_rewritten_key_is_not_evicted_into_new_key_slot(tmp_path):
+    cache = EmbeddingCache("model", str(tmp_path), max_entries=2)
+    cache.put_many(["A"], [vector(1)])
+    cache.put_many(["B"], [vector(2)])
+    cache.put_many(["A", "C"], [vector(1), vector(3)])
+
+    found, missing = cache.get_many(["A", "B", "C"])
+    assert missing == ["B"]
+    assert (found["A"] == vector(1)).all()
+    assert (found["C"] == vector(3)).all()
+    cache.close()
+
+
+def test_two_writers_do_not_share_slots(tmp_path):
+    first = EmbeddingCache("model", str(tmp_path))
+    second = EmbeddingCache("model", str(tmp_path))
+    first.put_many(["ka"], [vector(1)])
+    second.put_many(["kb"], [vector(2)])
+    # second가 벡터 파일을 늘린 뒤에도 first에서 조회 가능
+    second.put_many([f"x{i}" for i in range(3000)], np.arange(3000, dtype=np.float32)[:, None].repeat(4, axis=1))
+
+    found, missing = first.get_many(["ka", "kb", "x2999"])
+    assert not missing
+    assert (found["ka"] == vector(1)).all()
+    assert (found["kb"] == vector(2)).all()
+    assert (found["x2999"] == vector(2999)).all()
+    first.close()
+    second.close()
+
+
+def test_lowering_max_entries_reuses_freed_slots(tmp_path):
+    cache = EmbeddingCache("model", str(tmp_path))
+    cache.put_many([f"k{i}" for i in range(50)], [vector(i) for i in range(50)])
+    cache.close()
+
+    cache = EmbeddingCache("model", str(tmp_path), max_entries=10)
+    for round_ in range(5):
+        cache.put_many([f"n{round_}-{i}" for i in range(5)], [vector(i) for i in range(5)])
+    assert cache.db.execute("SELECT COUNT(*) FROM entries").fetchone()[0] == 10
+    assert cache._meta_int("next_slot") == 50
+    cache.close()
@@ -0,0 +1,43 @@
+import sys
+
+import numpy as np
+import pytest
+
+from knn_classifier import KnnSentimentClassifier
+
+MODEL_ID = "test-model"
+
+
+def make_data(n=200, dim=16, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = {"positive": rng.normal(size=dim), "negative": rng.normal(size=dim)}
+    labels = ["positive" if i % 2 else "negative" for i in range(n)]
+    vectors = np.stack([centers[label] + 0.3 * rng.normal(size=dim) for label in labels]) * 5
+    return vectors.astype(np.float32), labels, centers
+
+
+@pytest.mark.parametrize("backend", ["hnsw", "numpy"])
+def test_saved_index_loads_as_memmap_and_predicts_the_same(tmp_path, backend):
+    vectors, labels, centers = make_data()
+    classifier = KnnSentimentClassifier(vectors, labels, MODEL_ID, k=5, backend=backend)
+    classifier.save(str(tmp_path))
+
+    loaded = KnnSentimentClassifier.load(str(tmp_path), MODEL_ID, k=5)
+    # 저장된 벡터는 이미 정규화되어 있으므로 메모리로 복사하지 않음
+    assert isinstance(loaded.vectors, np.memmap)
+    assert loaded.backend == backend
+    np.testing.assert_allclose(np.linalg.norm(loaded.vectors, axis=1), 1.0, rtol=1e-5)
+
+    queries = np.stack([centers["positive"], centers["negative"]])
+    assert list(loaded.predict(queries)) == ["positive", "negative"]
+    assert list(loaded.predict(queries)) == list(classifier.predict(queries))
+
+
+def test_hnsw_backend_requires_hnswlib(monkeypatch):
+    vectors, labels, _ = make_data(n=10)
+    monkeypatch.setitem(sys.modules, "hnswlib", None)
+
+    with pytest.raises(ImportError, match="hnswlib"):
+        KnnSentimentClassifier(vectors, labels, MODEL_ID)
+    # numpy 백엔드는 명시적으로 선택했을 때만 사용
+    assert KnnSentimentClassifier(vectors, labels, MODEL_ID, backend="numpy").backend == "numpy"
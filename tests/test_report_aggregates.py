@@ -0,0 +1,32 @@
+import pytest
+
+from report_aggregates import WORDCLOUD_REGEXP, TermFrequencyAccumulator
+
+wordcloud = pytest.importorskip("wordcloud")
+
+
+@pytest.mark.parametrize("text", [
+    "Great books great book reading books great books great book",
+    "The dogs bark, the dog barks. Dogs bark loudly 123",
+    "정말 좋은 책 좋은 책 정말 좋은 책이에요",
+    # 복수형이 섞인 연어: 바이그램도 복수형을 병합해야 'great book' 하나로 집계됨
+    "great books " * 6 + "great book " * 5 + " ".join(f"filler{i}" for i in range(200)),
+])
+def test_term_frequencies_match_wordcloud_process_text(text):
+    accumulator = TermFrequencyAccumulator()
+    accumulator.update([text])
+    # 리포트와 같은 토큰 정규식 (한 글자 단어 제외)
+    assert accumulator.frequencies() == wordcloud.WordCloud(regexp=WORDCLOUD_REGEXP).process_text(text)
+
+
+def test_merged_accumulators_equal_single_pass():
+    texts = ["great books great book", "dogs bark dog barks", None, "great books again"]
+    merged = TermFrequencyAccumulator()
+    merged.update(texts[:2])
+    other = TermFrequencyAccumulator()
+    other.update(texts[2:])
+    merged.merge(other)
+
+    single = TermFrequencyAccumulator()
+    single.update(texts)
+    assert merged.frequencies() == single.frequencies()
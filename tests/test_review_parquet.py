@@ -0,0 +1,33 @@
+import pytest
+
+from scraper_kyobo import _to_int, open_review_writer
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+def test_parquet_keeps_fractional_ratings_and_falsy_values(tmp_path):
+    path = str(tmp_path / "reviews.parquet")
+    writer = open_review_writer(path, "parquet")
+    writer.write_rows([
+        {"리뷰번호": "123456789012345", "회원ID": "", "작성일시": "2024-01-02 03:04:05",
+         "리뷰내용": "0", "감정키워드": "", "평점": "4.5"},
+        {"리뷰번호": 2, "회원ID": "user", "작성일시": "", "리뷰내용": "좋아요", "감정키워드": None, "평점": 0}
+    ])
+    writer.close()
+
+    table = pq.read_table(path).to_pydict()
+    assert table["리뷰번호"] == [123456789012345, 2]
+    assert table["평점"] == [4.5, 0.0]
+    assert table["회원ID"] == ["", "user"]
+    assert table["리뷰내용"] == ["0", "좋아요"]
+    assert table["감정키워드"] == ["", None]
+
+
+def test_to_int_rejects_fractional_values():
+    assert _to_int("7") == 7
+    assert _to_int("7.0") == 7
+    assert _to_int(None) is None
+    with pytest.raises(ValueError):
+        _to_int("4.5")
+    with pytest.raises(ValueError):
+        _to_int(4.5)
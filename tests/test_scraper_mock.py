@@ -0,0 +1,183 @@
+import csv
+import glob
+import os
+
+import pytest
+
+import scraper_kyobo as scraper
+from fetch_engine import RECOVERY_STEP, FetchStats, RateLimiter
+from mock_kyobo_server import MockKyoboServer, generate_review
+from response_cache import ResponseCache
+from stream_pipeline import ReviewStream, StreamError
+
+BOOK_CODE = "S000000000001"
+
+# 테스트에서는 재시도 대기를 짧게
+FETCH_OPTIONS = {"backoff_base": 0.01, "backoff_max": 0.05}
+
+
+@pytest.fixture
+def mock_server():
+    """빈 포트에 목업 서버를 띄우는 팩토리 (테스트가 끝나면 종료)"""
+    servers = []
+
+    def start(**options):
+        server = MockKyoboServer(port=0, **options).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.stop()
+
+
+def read_csv(path):
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        return list(csv.DictReader(f))
+
+
+def expected_review_numbers(total):
+    return [str(generate_review(BOOK_CODE, i, total)["revwNum"]) for i in range(total)]
+
+
+def test_concurrent_review_pages_are_saved_in_page_order(mock_server, tmp_path):
+    # 응답 지연을 흔들어 페이지가 요청 순서와 다르게 도착하도록 함
+    server = mock_server(reviews=450, jitter=0.03)
+    message = scraper.scrap_review(BOOK_CODE, str(tmp_path), concurrency=4, api_host=server.url, rate_limit=0,
+                                   fetch_options=FETCH_OPTIONS)
+
+    (path,) = glob.glob(str(tmp_path / "*.csv"))
+    rows = read_csv(path)
+    assert "450개" in message
+    assert [row["리뷰번호"] for row in rows] == expected_review_numbers(450)
+
+
+def test_injected_429_and_500_are_retried(mock_server, tmp_path):
+    # 시드 0의 3번째 요청은 500, 4번째 요청은 429
+    server = mock_server(reviews=250, throttle_rate=0.3, error_rate=0.2, retry_after=0, seed=0)
+    stats = FetchStats()
+    scraper.scrap_review(BOOK_CODE, str(tmp_path), api_host=server.url, rate_limit=0,
+                         fetch_options={**FETCH_OPTIONS, "stats": stats})
+
+    (path,) = glob.glob(str(tmp_path / "*.csv"))
+    assert [row["리뷰번호"] for row in read_csv(path)] == expected_review_numbers(250)
+    statuses = server.stats()["statuses"]
+    assert statuses.get("429") and statuses.get("500")
+    assert stats.retries == statuses["429"] + statuses["500"]
+
+
+def test_failing_page_saves_nothing(mock_server, tmp_path):
+    server = mock_server(reviews=450, fail_pages=[3])
+    message = scraper.scrap_review(BOOK_CODE, str(tmp_path), api_host=server.url, rate_limit=0,
+                                   fetch_options={**FETCH_OPTIONS, "max_retries": 1})
+
+    assert message.startswith("오류 발생")
+    assert not os.listdir(tmp_path)
+
+
+def test_category_list_stops_at_total_count(mock_server, tmp_path):
+    server = mock_server(books=250)
+    scraper.scrap_category_book_list("0101", str(tmp_path), api_host=server.url, rate_limit=0,
+                                     fetch_options=FETCH_OPTIONS)
+
+    (path,) = glob.glob(str(tmp_path / "*.csv"))
+    rows = read_csv(path)
+    assert len(rows) == 250
+    assert rows[0]["상품명"] == "목업 도서 0101-1"
+    # 마지막 페이지(50건)를 받은 뒤 빈 페이지를 요청하지 않음
+    assert server.stats()["requests"] == 3
+
+
+def test_review_stream_yields_pages_in_order_and_saves_raw(mock_server, tmp_path):
+    server = mock_server(reviews=450, jitter=0.02)
+    raw_path = str(tmp_path / "raw.csv")
+    stream = ReviewStream(BOOK_CODE, server.url, concurrency=4, rate_limit=0, raw_path=raw_path,
+                          fetch_options=FETCH_OPTIONS).start()
+    try:
+        rows = [row for batch in stream.batches() for row in batch]
+    finally:
+        stream.close()
+
+    expected = expected_review_numbers(450)
+    assert [str(row["리뷰번호"]) for row in rows] == expected
+    assert [row["리뷰번호"] for row in read_csv(raw_path)] == expected
+    assert not os.path.exists(raw_path + ".part")
+    assert stream.pages == 5
+
+
+def test_review_stream_failure_raises_and_leaves_no_raw_file(mock_server, tmp_path):
+    server = mock_server(reviews=450, fail_pages=[3])
+    raw_path = str(tmp_path / "raw.csv")
+    stream = ReviewStream(BOOK_CODE, server.url, concurrency=1, rate_limit=0, raw_path=raw_path,
+                          fetch_options={**FETCH_OPTIONS, "max_retries": 1}).start()
+    received = []
+    try:
+        with pytest.raises(StreamError) as error:
+            for batch in stream.batches():
+                received.extend(batch)
+    finally:
+        stream.close()
+
+    assert error.value.__cause__ is not None
+    assert len(received) == 200
+    assert os.listdir(tmp_path) == []
+
+
+def test_review_stream_applies_backpressure(mock_server, tmp_path):
+    server = mock_server(reviews=1000)
+    stream = ReviewStream(BOOK_CODE, server.url, concurrency=2, rate_limit=0, queue_pages=1,
+                          fetch_options=FETCH_OPTIONS).start()
+    received = 0
+    try:
+        for batch in stream.batches():
+            received += len(batch)
+            # 느린 분석 쪽을 흉내 내어 다운로드 스레드가 대기열 앞에서 기다리게 함
+            stream.stopping.wait(0.05)
+    finally:
+        stream.close()
+
+    assert received == 1000
+    assert stream.max_queued <= 1
+    assert stream.blocked_seconds > 0
+
+
+def test_closing_stream_early_removes_partial_raw_file(mock_server, tmp_path):
+    server = mock_server(reviews=2000)
+    raw_path = str(tmp_path / "raw.csv")
+    stream = ReviewStream(BOOK_CODE, server.url, concurrency=1, rate_limit=0, queue_pages=1, raw_path=raw_path,
+                          fetch_options=FETCH_OPTIONS).start()
+    next(stream.batches())
+    stream.close()
+
+    assert os.listdir(tmp_path) == []
+
+
+def test_incremental_scrape_ignores_cached_pages(mock_server, tmp_path):
+    server = mock_server(reviews=250)
+    cache = ResponseCache(str(tmp_path / "cache"))
+    output = str(tmp_path / "out")
+    first = scraper.scrap_review_incremental(BOOK_CODE, output, api_host=server.url, cache=cache, rate_limit=0,
+                                             fetch_options=FETCH_OPTIONS)
+    assert "신규 리뷰 250개" in first
+
+    # 유효 기간 안에 신규 리뷰 50건이 추가됨
+    server.reviews = 300
+    second = scraper.scrap_review_incremental(BOOK_CODE, output, api_host=server.url, cache=cache, rate_limit=0,
+                                              fetch_options=FETCH_OPTIONS)
+    assert "신규 리뷰 50개" in second
+
+    rows = read_csv(os.path.join(output, f"교보_{BOOK_CODE}_리뷰_전체.csv"))
+    assert [row["리뷰번호"] for row in rows] == expected_review_numbers(300)
+
+
+def test_rate_limiter_recovers_by_fixed_step_up_to_max_rate():
+    limiter = RateLimiter(2.0)
+    for _ in range(3):
+        limiter.throttle()
+    assert limiter.rate == pytest.approx(0.25)
+
+    limiter.recover()
+    assert limiter.rate == pytest.approx(0.25 + RECOVERY_STEP)
+    for _ in range(100):
+        limiter.recover()
+    assert limiter.rate == 2.0
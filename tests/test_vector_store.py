@@ -0,0 +1,48 @@
+import numpy as np
+
+from vector_store import VectorStore
+
+MODEL_ID = "test-model"
+
+
+def append_chunks(writer, book, vectors, chunk):
+    for start in range(0, len(vectors), chunk):
+        rows = np.arange(start, min(start + chunk, len(vectors)))
+        writer.append(book, vectors[rows], rows, np.full(len(rows), "NaT", dtype="datetime64[s]"),
+                      np.full(len(rows), 5.0), [f"리뷰 {i}" for i in rows])
+
+
+def test_small_chunks_are_buffered_into_full_shards(tmp_path):
+    vectors = np.random.default_rng(0).normal(size=(250, 8)).astype(np.float32)
+    store = VectorStore(str(tmp_path), MODEL_ID, shard_rows=100)
+    with store.writer() as writer:
+        append_chunks(writer, "B1", vectors, chunk=7)
+        # 샤드 최대 행 수가 찰 때만 샤드 파일을 만듦
+        assert [shard["rows"] for shard in writer.shards] == [100, 100]
+
+    assert [shard["rows"] for shard in store.manifest["shards"]] == [100, 100, 50]
+    assert len(store) == 250
+    hits = store.search(vectors[[3, 123, 249]], k=1)
+    assert [result[0]["review_id"] for result in hits] == [3, 123, 249]
+    assert hits[2][0]["text"] == "리뷰 249"
+
+
+def test_aborted_writer_leaves_no_shards(tmp_path):
+    vectors = np.ones((30, 4), dtype=np.float32)
+    store = VectorStore(str(tmp_path), MODEL_ID, shard_rows=10)
+    writer = store.writer()
+    append_chunks(writer, "B1", vectors, chunk=4)
+    writer.abort()
+
+    assert not writer.pending
+    assert not (tmp_path / "shards").exists() or not list((tmp_path / "shards").iterdir())
+
+
+def test_search_with_non_positive_k_returns_no_hits(tmp_path):
+    vectors = np.eye(4, dtype=np.float32)
+    store = VectorStore(str(tmp_path), MODEL_ID)
+    with store.writer() as writer:
+        append_chunks(writer, "B1", vectors, chunk=4)
+
+    assert store.search(vectors[:2], k=0) == [[], []]
+    assert store.search(vectors[0], k=-1) == [[]]
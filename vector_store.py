@@ -0,0 +1,431 @@
+"""
+리뷰 임베딩 벡터 저장소
+
+감성 분석 중에 계산한 리뷰 임베딩을 도서별 샤드 파일로 저장해 두고,
+다시 인코딩하지 않고도 전체 도서에서 비슷한 리뷰를 찾을 수 있게 합니다.
+
+벡터는 정규화한 뒤 int8(행별 스케일) 또는 float16으로 양자화하여 .npy 샤드에 저장하고,
+검색 시에는 샤드를 메모리에 올리지 않고 memory-map으로 열어 블록 단위 행렬곱으로 훑습니다.
+샤드마다 리뷰번호, 작성일시, 평점 메타데이터와 리뷰 원문(검색 결과 표시용)을 함께 저장하며,
+같은 도서를 다시 저장하면 이전 샤드를 새 샤드로 교체합니다. (manifest.json을 마지막에 교체)
+
+사용 예:
+    python sentiment_analysis_txtai.py -t "도서명" -f data/교보_S000001_리뷰_전체.csv --vector-store cache/vector_store
+    python vector_store.py search "배송이 늦고 책이 찢어져 왔어요" -k 10
+    python vector_store.py info
+"""
+
+import argparse
+import json
+import os
+import re
+import threading
+import uuid
+from datetime import datetime
+
+import numpy as np
+
+from encoder_backends import DEFAULT_MODEL_DIR, EncoderModel
+
+DEFAULT_VECTOR_STORE_DIR = "cache/vector_store"
+VECTOR_STORE_VERSION = 1
+QUANTIZATIONS = ("int8", "float16")
+DEFAULT_QUANTIZATION = "int8"
+
+# 샤드 하나에 저장할 최대 리뷰 수
+DEFAULT_SHARD_ROWS = 100000
+
+# 검색 시 한 번에 행렬곱할 샤드 행 수
+SEARCH_BLOCK_ROWS = 16384
+
+# 샤드 메타데이터 (작성일시는 epoch 초, 값이 없으면 리뷰번호 -1 / 작성일시 MISSING_TIME / 평점 NaN)
+META_DTYPE = np.dtype([("review_id", "i8"), ("created", "i8"), ("rating", "f4")])
+MISSING_TIME = np.iinfo(np.int64).min
+
+# 분석 서버에서 여러 작업이 같은 저장소에 동시에 commit하지 않도록 잠금
+_COMMIT_LOCK = threading.Lock()
+
+# 스크래퍼가 저장하는 리뷰 파일명 (교보_<도서코드>_리뷰_...)
+_BOOK_FILENAME = re.compile(r"교보_([^_]+)_리뷰")
+
+
+def book_code_from_path(path):
+    """리뷰 파일명에서 도서 코드 추출 (스크래퍼 파일명 형식이 아니면 파일명)"""
+    name = os.path.splitext(os.path.basename(path))[0]
+    match = _BOOK_FILENAME.search(name)
+    return match.group(1) if match else name
+
+
+def _normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def quantize(vectors, quantization):
+    """
+    정규화한 벡터 양자화
+
+    Returns:
+        tuple: (양자화 벡터, 행별 스케일 - int8일 때만, float16이면 None)
+    """
+    vectors = _normalize(vectors)
+    if quantization == "float16":
+        return vectors.astype(np.float16), None
+
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    quantized = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+    return quantized, scales.astype(np.float32)
+
+
+def _safe_name(book):
+    return re.sub(r"[^\w-]", "_", str(book))[:64] or "book"
+
+
+class VectorStoreWriter:
+    """
+    벡터 저장소에 도서별 샤드를 추가하는 쓰기 세션
+
+    청크 단위로 추가한 리뷰는 양자화하여 도서별로 모아 두었다가 샤드 최대 행 수가 찰 때마다 샤드로 저장하고,
+    남은 리뷰는 commit()에서 저장합니다. (작은 청크마다 샤드 파일이 생기지 않도록 함)
+    commit() 전까지는 새 샤드 파일만 만들고, commit()에서 이번 세션에 추가한 도서의
+    이전 샤드를 manifest에서 빼고 새 샤드로 교체합니다. 예외로 끝나면 새 샤드를 지웁니다.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.shards = []
+        self.books = set()
+        # 도서별로 아직 샤드로 저장하지 않은 (양자화 벡터, 스케일, 리뷰번호, 작성일시, 평점, 원문) 조각
+        self.pending = {}
+
+    def append(self, book, vectors, review_ids, created, ratings, texts):
+        """
+        한 도서의 리뷰 임베딩과 메타데이터를 추가 (샤드 최대 행 수만큼 모이면 샤드로 저장)
+
+        Args:
+            book (str): 도서 코드
+            vectors (np.ndarray): 리뷰 임베딩 (리뷰 수 × 차원)
+            review_ids (array-like): 리뷰번호 (없으면 -1)
+            created (array-like): 작성일시 (datetime64, 없으면 NaT)
+            ratings (array-like): 평점 (없으면 NaN)
+            texts (list): 리뷰 원문
+        """
+        book = str(book)
+        self.books.add(book)
+        if len(vectors) == 0:
+            return
+
+        review_ids = np.asarray(review_ids, dtype=np.int64)
+        created = np.asarray(created, dtype="datetime64[s]")
+        created = np.where(np.isnat(created), MISSING_TIME, created.astype(np.int64))
+        ratings = np.asarray(ratings, dtype=np.float32)
+
+        quantized, scales = quantize(vectors, self.store.quantization)
+        pending = self.pending.setdefault(book, [])
+        pending.append((quantized, scales, review_ids, created, ratings, list(texts)))
+        if sum(len(piece[0]) for piece in pending) >= self.store.shard_rows:
+            self._flush(book)
+
+    def _flush(self, book, final=False):
+        """모아 둔 리뷰를 샤드 최대 행 수 단위로 저장 (final이 아니면 다 차지 않은 나머지는 계속 모아 둠)"""
+        pieces = self.pending.pop(book, [])
+        if not pieces:
+            return
+        quantized = np.concatenate([piece[0] for piece in pieces])
+        scales = np.concatenate([piece[1] for piece in pieces]) if pieces[0][1] is not None else None
+        review_ids, created, ratings = (np.concatenate([piece[i] for piece in pieces]) for i in (2, 3, 4))
+        texts = [text for piece in pieces for text in piece[5]]
+
+        shard_rows = self.store.shard_rows
+        for start in range(0, len(quantized), shard_rows):
+            end = start + shard_rows
+            if end > len(quantized) and not final:
+                self.pending[book] = [(quantized[start:], None if scales is None else scales[start:],
+                                       review_ids[start:], created[start:], ratings[start:], texts[start:])]
+                break
+            self.shards.append(self._write_shard(
+                book, quantized[start:end], None if scales is None else scales[start:end],
+                review_ids[start:end], created[start:end], ratings[start:end], texts[start:end]
+            ))
+
+    def _write_shard(self, book, quantized, scales, review_ids, created, ratings, texts):
+        quantization = self.store.quantization
+        name = f"{_safe_name(book)}-{uuid.uuid4().hex[:12]}"
+        prefix = os.path.join(self.store.shard_dir, name)
+        os.makedirs(self.store.shard_dir, exist_ok=True)
+
+        np.save(f"{prefix}.vec.npy", quantized)
+        if scales is not None:
+            np.save(f"{prefix}.scale.npy", scales)
+
+        meta = np.empty(len(quantized), dtype=META_DTYPE)
+        meta["review_id"] = review_ids
+        meta["created"] = created
+        meta["rating"] = ratings
+        np.save(f"{prefix}.meta.npy", meta)
+
+        # 리뷰 원문은 UTF-8로 이어 붙이고 오프셋으로 검색 결과 행만 읽음
+        offsets = np.zeros(len(texts) + 1, dtype=np.int64)
+        with open(f"{prefix}.text.bin", "wb") as f:
+            for i, text in enumerate(texts):
+                encoded = str(text).encode("utf-8")
+                f.write(encoded)
+                offsets[i + 1] = offsets[i] + len(encoded)
+        np.save(f"{prefix}.offsets.npy", offsets)
+
+        return {"name": name, "book": book, "rows": len(quantized), "quantization": quantization,
+                "dim": int(quantized.shape[1])}
+
+    def commit(self):
+        """남은 리뷰를 샤드로 저장하고 manifest 교체 후 교체된 이전 샤드 파일 삭제"""
+        store = self.store
+        for book in list(self.pending):
+            self._flush(book, final=True)
+        with _COMMIT_LOCK:
+            # 다른 작업이 그사이 commit했을 수 있으므로 최신 manifest에 반영
+            store._load_manifest()
+            replaced = [shard for shard in store.manifest["shards"] if shard["book"] in self.books]
+            store.manifest["shards"] = [shard for shard in store.manifest["shards"] if shard["book"] not in self.books]
+            store.manifest["shards"] += self.shards
+            if self.shards:
+                store.manifest["dim"] = self.shards[0]["dim"]
+            store._write_manifest()
+        for shard in replaced:
+            store._remove_shard_files(shard["name"])
+        self.shards = []
+
+    def abort(self):
+        """이번 세션에서 만든 샤드 파일 삭제"""
+        self.pending = {}
+        for shard in self.shards:
+            self.store._remove_shard_files(shard["name"])
+        self.shards = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.abort()
+
+
+class VectorStore:
+    """
+    도서별 샤드로 나뉜 양자화 리뷰 임베딩 저장소
+
+    Args:
+        path (str): 저장소 디렉토리
+        model_id (str): 임베딩 모델 ID (저장된 모델과 다르면 ValueError)
+        quantization (str): 새로 저장할 샤드의 양자화 방식 ('int8' 또는 'float16')
+        shard_rows (int): 샤드 하나의 최대 리뷰 수
+    """
+
+    def __init__(self, path=DEFAULT_VECTOR_STORE_DIR, model_id=None, quantization=DEFAULT_QUANTIZATION,
+                 shard_rows=DEFAULT_SHARD_ROWS):
+        if quantization not in QUANTIZATIONS:
+            raise ValueError(f"지원하지 않는 양자화 방식입니다: {quantization}")
+        self.path = path
+        self.shard_dir = os.path.join(path, "shards")
+        self.quantization = quantization
+        self.shard_rows = shard_rows
+        self.model_id = model_id
+        self._load_manifest()
+
+    def _load_manifest(self):
+        """manifest.json 읽기 (없으면 빈 저장소, 모델이나 형식 버전이 다르면 ValueError)"""
+        manifest_path = os.path.join(self.path, "manifest.json")
+        if os.path.exists(manifest_path):
+            with open(manifest_path, encoding="utf-8") as f:
+                self.manifest = json.load(f)
+            if self.manifest.get("version") != VECTOR_STORE_VERSION:
+                raise ValueError(f"벡터 저장소 형식 버전이 다릅니다: {self.manifest.get('version')}")
+            if self.model_id is not None and self.manifest["model"] != self.model_id:
+                raise ValueError(f"벡터 저장소의 모델({self.manifest['model']})이 현재 모델({self.model_id})과 다릅니다")
+        else:
+            if self.model_id is None:
+                raise FileNotFoundError(f"벡터 저장소가 없습니다: {self.path}")
+            self.manifest = {"version": VECTOR_STORE_VERSION, "model": self.model_id, "dim": None, "shards": []}
+        self.model_id = self.manifest["model"]
+
+    def _write_manifest(self):
+        os.makedirs(self.path, exist_ok=True)
+        self.manifest["updated_at"] = datetime.now().isoformat(timespec="seconds")
+        manifest_path = os.path.join(self.path, "manifest.json")
+        temp_path = f"{manifest_path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, manifest_path)
+
+    def _remove_shard_files(self, name):
+        for suffix in (".vec.npy", ".scale.npy", ".meta.npy", ".text.bin", ".offsets.npy"):
+            try:
+                os.remove(os.path.join(self.shard_dir, name + suffix))
+            except FileNotFoundError:
+                pass
+
+    def writer(self):
+        """샤드 추가용 쓰기 세션 (with 블록이 정상 종료되면 commit)"""
+        return VectorStoreWriter(self)
+
+    def books(self):
+        """도서별 저장된 리뷰 수"""
+        counts = {}
+        for shard in self.manifest["shards"]:
+            counts[shard["book"]] = counts.get(shard["book"], 0) + shard["rows"]
+        return counts
+
+    def __len__(self):
+        return sum(shard["rows"] for shard in self.manifest["shards"])
+
+    def _open_shard(self, shard):
+        """샤드 벡터/스케일을 memory-map으로 열기"""
+        prefix = os.path.join(self.shard_dir, shard["name"])
+        vectors = np.load(f"{prefix}.vec.npy", mmap_mode="r")
+        scales = np.load(f"{prefix}.scale.npy", mmap_mode="r") if shard["quantization"] == "int8" else None
+        return vectors, scales
+
+    def search(self, queries, k=10, books=None):
+        """
+        질의 벡터별로 코사인 유사도가 가장 높은 리뷰 k개 검색
+
+        Args:
+            queries (np.ndarray): 질의 임베딩 (질의 수 × 차원, 1차원이면 질의 1개)
+            k (int): 질의별 결과 수
+            books (iterable, optional): 검색할 도서 코드 (지정하지 않으면 전체)
+
+        Returns:
+            list: 질의별 결과 목록 [{score, book, review_id, created, rating, text}, ...]
+        """
+        queries = _normalize(np.atleast_2d(queries))
+        if k <= 0:
+            return [[] for _ in queries]
+        books = set(map(str, books)) if books else None
+        shards = [shard for shard in self.manifest["shards"] if books is None or shard["book"] in books]
+
+        best_scores = np.full((len(queries), 0), -np.inf, dtype=np.float32)
+        best_ids = np.empty((len(queries), 0), dtype=np.int64)
+
+        for shard_index, shard in enumerate(shards):
+            vectors, scales = self._open_shard(shard)
+            for start in range(0, len(vectors), SEARCH_BLOCK_ROWS):
+                block = np.asarray(vectors[start:start + SEARCH_BLOCK_ROWS], dtype=np.float32)
+                scores = queries @ block.T
+                if scales is not None:
+                    scores *= scales[start:start + len(block)]
+
+                # 블록 내 상위 k개와 지금까지의 상위 k개를 합쳐 다시 상위 k개 선택
+                top = min(k, scores.shape[1])
+                candidates = np.argpartition(-scores, top - 1, axis=1)[:, :top]
+                ids = (shard_index << 40) | (start + candidates)
+                best_scores = np.concatenate([best_scores, np.take_along_axis(scores, candidates, axis=1)], axis=1)
+                best_ids = np.concatenate([best_ids, ids], axis=1)
+                if best_scores.shape[1] > k:
+                    keep = np.argpartition(-best_scores, k - 1, axis=1)[:, :k]
+                    best_scores = np.take_along_axis(best_scores, keep, axis=1)
+                    best_ids = np.take_along_axis(best_ids, keep, axis=1)
+
+        results = []
+        for scores, ids in zip(best_scores, best_ids):
+            order = np.argsort(-scores, kind="stable")
+            results.append([self._hit(shards[int(ids[i]) >> 40], int(ids[i]) & ((1 << 40) - 1), float(scores[i]))
+                            for i in order])
+        return results
+
+    def _hit(self, shard, row, score):
+        """검색 결과 1건의 메타데이터와 리뷰 원문 읽기"""
+        prefix = os.path.join(self.shard_dir, shard["name"])
+        meta = np.load(f"{prefix}.meta.npy", mmap_mode="r")[row]
+        offsets = np.load(f"{prefix}.offsets.npy", mmap_mode="r")
+        with open(f"{prefix}.text.bin", "rb") as f:
+            f.seek(int(offsets[row]))
+            text = f.read(int(offsets[row + 1] - offsets[row])).decode("utf-8")
+
+        created = int(meta["created"])
+        rating = float(meta["rating"])
+        return {
+            "score": round(score, 4),
+            "book": shard["book"],
+            "review_id": int(meta["review_id"]) if meta["review_id"] >= 0 else None,
+            "created": str(np.datetime64(created, "s")).replace("T", " ") if created != MISSING_TIME else None,
+            "rating": None if np.isnan(rating) else rating,
+            "text": text
+        }
+
+
+def store_reviews(writer, df, embeddings, book_code):
+    """
+    분석한 리뷰 DataFrame과 행별 임베딩을 저장소 쓰기 세션에 추가
+    (도서코드 컬럼이 있으면 도서별로 나누어 저장, 내용이 빈 리뷰는 제외)
+    """
+    import pandas as pd
+
+    texts = df["리뷰내용"].fillna("").astype(str).to_numpy(dtype=object)
+    keep = np.array([bool(text.strip()) for text in texts], dtype=bool)
+
+    if "리뷰번호" in df:
+        review_ids = pd.to_numeric(df["리뷰번호"], errors="coerce").to_numpy(dtype=np.float64, na_value=-1).astype(np.int64)
+    else:
+        review_ids = np.full(len(df), -1, dtype=np.int64)
+    created = df["작성일시"].to_numpy(dtype="datetime64[s]")
+    ratings = pd.to_numeric(df["평점"], errors="coerce").to_numpy(dtype=np.float32, na_value=np.nan)
+    books = df["도서코드"].astype(str).to_numpy(dtype=object) if "도서코드" in df else np.full(len(df), book_code, dtype=object)
+
+    for book in dict.fromkeys(books[keep]):
+        rows = np.flatnonzero(keep & (books == book))
+        writer.append(book, embeddings[rows], review_ids[rows], created[rows], ratings[rows], texts[rows].tolist())
+
+
+def parse_arguments():
+    """명령행 인자 파싱"""
+    parser = argparse.ArgumentParser(description="리뷰 임베딩 벡터 저장소 검색")
+    parser.add_argument("--store", default=DEFAULT_VECTOR_STORE_DIR,
+                        help=f"벡터 저장소 경로 (기본값: {DEFAULT_VECTOR_STORE_DIR})")
+    subparsers = parser.add_subparsers(dest="command", metavar="[search|info]", required=True)
+
+    search_parser = subparsers.add_parser("search", help="문장과 비슷한 리뷰 검색")
+    search_parser.add_argument("query", help="검색할 문장 (예: \"배송이 늦고 책이 찢어져 왔어요\")")
+    search_parser.add_argument("-k", type=int, default=10, help="결과 수 (기본값: 10)")
+    search_parser.add_argument("--book", action="append", help="검색할 도서 코드 (여러 번 지정 가능, 기본값: 전체)")
+    search_parser.add_argument("--json", action="store_true", help="결과를 JSON으로 출력")
+    search_parser.add_argument("--model-dir", default=DEFAULT_MODEL_DIR,
+                               help=f"로컬 모델 디렉토리 (기본값: {DEFAULT_MODEL_DIR})")
+
+    subparsers.add_parser("info", help="저장된 도서와 리뷰 수 출력")
+    return parser.parse_args()
+
+
+def main():
+    """메인 함수"""
+    args = parse_arguments()
+    store = VectorStore(args.store)
+
+    if args.command == "info":
+        print(f"📦 {args.store}: 모델 {store.model_id}, 리뷰 {len(store):,}건, "
+              f"샤드 {len(store.manifest['shards'])}개, 차원 {store.manifest['dim']}")
+        for book, rows in sorted(store.books().items()):
+            print(f"  {book}: {rows:,}건")
+        return
+
+    # 검색어는 저장소를 만들 때와 같은 모델/백엔드로 인코딩
+    import sentiment_analysis_txtai as analysis
+    model = EncoderModel.from_id(store.model_id, args.model_dir)
+    txtai_index, _ = analysis.load_or_build_txtai_index(model=model)
+    query = analysis.encode_batch(txtai_index, [args.query])
+
+    hits = store.search(query, args.k, args.book)[0]
+    if args.json:
+        print(json.dumps(hits, ensure_ascii=False, indent=2))
+        return
+    for rank, hit in enumerate(hits, start=1):
+        rating = f"{hit['rating']:g}점" if hit["rating"] is not None else "-"
+        print(f"{rank:>3}. [{hit['score']:.3f}] {hit['book']} #{hit['review_id']} {hit['created'] or ''} {rating}")
+        print(f"     {hit['text']}")
+
+
+if __name__ == "__main__":
+    main()